@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from feature_binning import CustomBinningStrategy, assign_bin
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+from config import get_binning_config
+
+
+def best_of(func, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(n_rows=1_000_000):
+    bins = get_binning_config()['credit_score_bins']
+    rng = np.random.default_rng(42)
+
+    # Integer scores across and beyond the valid range, every bin edge, and a
+    # few fractional values and NaNs so all boundary cases are exercised.
+    edges = np.array(sorted({edge for bin_range in bins.values() for edge in bin_range} | {850}), dtype=np.float64)
+    values = np.concatenate([
+        rng.integers(250, 900, n_rows).astype(np.float64),
+        edges, edges - 0.5, edges + 0.5,
+        [np.nan, 299.999, 850.001]
+    ])
+    series = pd.Series(values)
+    strategy = CustomBinningStrategy(bins)
+
+    legacy_time, legacy = best_of(lambda: series.apply(lambda value: assign_bin(value, bins)).to_numpy())
+    compiled_time, compiled = best_of(lambda: strategy.compiled_bins.transform(values))
+
+    assert (legacy == compiled).all(), "Compiled binning diverged from the reference implementation"
+
+    sample = values[:10_000].tolist()
+    scalar_legacy_time, scalar_legacy = best_of(lambda: [assign_bin(value, bins) for value in sample])
+    scalar_time, scalar = best_of(lambda: [strategy.bin_value(value) for value in sample])
+    assert scalar_legacy == scalar, "Scalar binning diverged from the reference implementation"
+
+    print(f"Rows binned: {len(values):,}")
+    print(f"Series.apply (reference): {legacy_time * 1000:10.2f} ms")
+    print(f"Compiled searchsorted   : {compiled_time * 1000:10.2f} ms  ({legacy_time / compiled_time:.1f}x)")
+    print(f"Scalar reference (10k)  : {scalar_legacy_time * 1e6 / len(sample):10.3f} us/value")
+    print(f"Scalar compiled (10k)   : {scalar_time * 1e6 / len(sample):10.3f} us/value")
+
+
+if __name__ == "__main__":
+    main()
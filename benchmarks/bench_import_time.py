@@ -0,0 +1,77 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SEARCH_PATHS = [os.path.join(ROOT, 'src'), os.path.join(ROOT, 'utils'), os.path.join(ROOT, 'pipelines')]
+
+# Entry point -> cold-start budget in seconds. Pipeline modules no longer load
+# the model on import; unpickling the XGBoost model (and with it xgboost and
+# scikit-learn) now happens when `cli.py infer` or `cli.py serve` starts.
+ENTRY_POINTS = {
+    'cli': 0.5,
+    'model_inference': 1.0,
+    'streaming_inference_pipeline': 1.0,
+    'handling_missing_values': 1.0,
+    'data_splitter': 1.0,
+    'model_evaluation': 2.0,
+}
+HEAVY_MODULES = ('pyspark', 'groq', 'pydantic', 'prompt_toolkit', 'matplotlib', 'seaborn', 'mlflow')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(module):
+    # Fresh interpreter per entry point so nothing is already in sys.modules.
+    code = f"import sys; sys.path[:0] = {SEARCH_PATHS!r}; import {module}"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # importtime prints children before their parent, indented two spaces
+    # deeper, so the direct imports of the entry point are the depth-1 lines
+    # collected since the previous top-level import.
+    imports, block, children, total_us = [], [], [], 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        imports.append(name)
+        if depth == 0:
+            if name == module:
+                total_us, children = int(cumulative_us), block
+            block = []
+        elif depth == 1:
+            block.append((name, int(cumulative_us)))
+
+    heaviest = sorted(children, key=lambda item: item[1], reverse=True)[:5]
+    loaded_heavy = sorted({name.split('.')[0] for name in imports if name.split('.')[0] in HEAVY_MODULES})
+    return total_us / 1e6, heaviest, loaded_heavy
+
+
+def main():
+    failures = []
+    for module, budget in ENTRY_POINTS.items():
+        seconds, heaviest, loaded_heavy = measure(module)
+        status = 'OK' if seconds <= budget and not loaded_heavy else 'OVER'
+        print(f"{module:32s} {seconds:6.3f}s  (budget {budget:.1f}s)  {status}")
+        for name, cumulative_us in heaviest:
+            print(f"    {name:28s} {cumulative_us / 1e6:6.3f}s")
+        if loaded_heavy:
+            print(f"    heavy optional imports loaded: {', '.join(loaded_heavy)}")
+        if status != 'OK':
+            failures.append(module)
+
+    if failures:
+        print(f"\nCold-start budget exceeded for: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
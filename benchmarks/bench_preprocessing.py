@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from model_inference import ModelInference
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+from config import get_data_path
+
+
+def per_record_us(func, records):
+    start = time.perf_counter()
+    for record in records:
+        func(record)
+    return (time.perf_counter() - start) * 1e6 / len(records)
+
+
+def load_records():
+    raw = pd.read_csv(get_data_path()['raw_data']).drop(columns=['Exited'])
+    return [
+        {key: (None if isinstance(value, float) and np.isnan(value) else value) for key, value in record.items()}
+        for record in raw.to_dict(orient='records')
+    ]
+
+
+def check_parity(inference, records):
+    # Parity: the compiled plan must match the pandas path on every record,
+    # including rows with missing Age/Gender and out-of-range credit scores.
+    columns = inference.plan.feature_columns
+    pandas_rows = pd.concat([inference.preprocess_input(record) for record in records], ignore_index=True)
+    expected = pandas_rows[columns].to_numpy(dtype=np.float32)
+    compiled = inference.plan.transform(records)
+    np.testing.assert_array_equal(compiled, expected)
+    print(f"Parity OK on {len(records):,} records x {len(columns)} features")
+
+
+def main(model_path="artifacts/models/churn_analysis_model.joblib", parity_only=False):
+    inference = ModelInference(model_path=model_path)
+    records = load_records()
+    check_parity(inference, records)
+    if parity_only:
+        return
+
+    sample = records[:500]
+    pandas_us = per_record_us(inference.preprocess_input, sample)
+    plan_us = per_record_us(inference.plan.transform, sample)
+
+    start = time.perf_counter()
+    inference.plan.transform(records)
+    batch_us = (time.perf_counter() - start) * 1e6 / len(records)
+
+    print(f"pandas preprocess_input : {pandas_us:10.1f} us/record")
+    print(f"compiled plan (single)  : {plan_us:10.1f} us/record  ({pandas_us / plan_us:.0f}x)")
+    print(f"compiled plan (batch)   : {batch_us:10.1f} us/record")
+
+
+if __name__ == "__main__":
+    main(parity_only='--parity-only' in sys.argv[1:])
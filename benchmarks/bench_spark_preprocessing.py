@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from data_ingestion import DataIngestorCSV
+from handling_missing_values import DropMissingValuesStrategy, MissingValueImputer
+from outlier_detection import OutlierDetector, create_outlier_strategy
+from feature_binning import CustomBinningStrategy
+from feature_encoding import NominalEncodingStrategy, OrdinalEncodingStrategy
+from feature_scaling import create_scaling_strategy
+from data_splitter import create_split_strategy
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+from config import (get_data_path, get_columns, get_missing_value_config, get_outlier_config, get_binning_config,
+                    get_encoding_config, get_scaling_config, get_split_config)
+
+KEY = 'CustomerId'
+
+
+def pandas_engine(csv_path, columns_config, methods, outlier_config, bins, encoding_config, scaling_config):
+    df = DataIngestorCSV(dtypes=columns_config.get('dtypes')).ingest_data(csv_path)
+    df = DropMissingValuesStrategy(critical_columns=columns_config['critical_columns']).handle_missing_values(df)
+    df = MissingValueImputer.from_config(methods).fit(df).transform(df)
+    df = OutlierDetector(create_outlier_strategy(outlier_config), outlier_config.get('min_outlier_columns', 2)) \
+        .handle_outliers(df, columns_config['outlier_columns'])
+    df = CustomBinningStrategy(bins).bin_feature(df, 'CreditScore')
+    df = NominalEncodingStrategy(encoding_config['nominal_columns']).encode(df)
+    df = OrdinalEncodingStrategy(encoding_config['ordinal_mappings']).encode(df)
+    return create_scaling_strategy(scaling_config).scale(df, scaling_config['columns_to_scale'])
+
+
+def spark_engine(spark, csv_path, columns_config, methods, outlier_config, bins, encoding_config, scaling_config):
+    from spark_session import read_spark_data
+    from spark_preprocessing import (SparkMissingValueImputer, SparkOutlierDetector, SparkBinningStrategy,
+                                     SparkNominalEncodingStrategy, SparkOrdinalEncodingStrategy,
+                                     create_spark_outlier_strategy, create_spark_scaling_strategy)
+
+    df = read_spark_data(spark, csv_path, columns_config.get('dtypes'), with_row_order=True)
+    # Shuffle the rows as a join would, so the nominal codes only match
+    # pandas if they follow the row order taken at the scan.
+    df = df.repartition(4)
+    df = DropMissingValuesStrategy(critical_columns=columns_config['critical_columns']).handle_missing_values(df).cache()
+    df = SparkMissingValueImputer.from_config(methods, relative_error=0.0).fit(df).transform(df)
+    df = SparkOutlierDetector(create_spark_outlier_strategy(outlier_config), outlier_config.get('min_outlier_columns', 2)) \
+        .handle_outliers(df, columns_config['outlier_columns'])
+    df = SparkBinningStrategy(bins).bin_feature(df, 'CreditScore')
+    df = SparkNominalEncodingStrategy(encoding_config['nominal_columns']).encode(df)
+    df = SparkOrdinalEncodingStrategy(encoding_config['ordinal_mappings']).encode(df)
+    return create_spark_scaling_strategy(scaling_config).scale(df, scaling_config['columns_to_scale']).cache()
+
+
+def check_split_parity(spark_df, pandas_df, target_column, split_config):
+    # Spark splits by seeded random keys rather than sklearn's permutation, so
+    # the rows differ; sizes and per-class test fractions must still agree.
+    from spark_preprocessing import create_spark_split_strategy
+
+    train, test = create_spark_split_strategy(split_config).split_data(spark_df, target_column)
+    _, pandas_test, _, pandas_y_test = create_split_strategy(split_config).split_data(pandas_df, target_column)
+    spark_counts = test.groupBy(target_column).count().toPandas().set_index(target_column)['count']
+    totals = pandas_df[target_column].value_counts()
+    for label, total in totals.items():
+        spark_fraction = spark_counts.get(label, 0) / total
+        pandas_fraction = (pandas_y_test == label).sum() / total
+        assert abs(spark_fraction - pandas_fraction) <= 0.05, \
+            f"Class {label}: Spark test fraction {spark_fraction:.3f}, pandas {pandas_fraction:.3f}"
+    assert train.count() + test.count() == len(pandas_df), "Spark split lost or duplicated rows"
+    print(f"Split parity OK: test fractions per class {dict((spark_counts / totals).round(3))}")
+
+
+def main(n_rows=2000, parity_only=False):
+    from spark_session import get_or_create_spark_session
+
+    columns_config = get_columns()
+    methods = get_missing_value_config()['methods']
+    outlier_config = {**get_outlier_config(), 'relative_error': 0.0}
+    config = (columns_config, methods, outlier_config, get_binning_config()['credit_score_bins'],
+              get_encoding_config(), get_scaling_config())
+    target_column = 'Exited'
+
+    spark = get_or_create_spark_session({'master': 'local[*]', 'app_name': 'spark_parity', 'config': {
+        'spark.sql.shuffle.partitions': 4,
+        # Several input splits even for the small sample
+        'spark.sql.files.maxPartitionBytes': 32 * 1024
+    }})
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # A small sample keeps the check quick; exact quantiles (relative_error=0)
+        # make medians and IQR bounds comparable with pandas.
+        csv_path = os.path.join(tmp_dir, 'sample.csv')
+        # Lines are copied verbatim so both engines parse the same text
+        with open(get_data_path()['raw_data'], 'r') as source, open(csv_path, 'w') as sample:
+            for _, line in zip(range(n_rows + 1), source):
+                sample.write(line)
+
+        start = time.perf_counter()
+        expected = pandas_engine(csv_path, *config)
+        pandas_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        spark_df = spark_engine(spark, csv_path, *config)
+        actual = spark_df.toPandas()
+        spark_seconds = time.perf_counter() - start
+
+    expected = expected.sort_values(KEY).reset_index(drop=True)
+    actual = actual.sort_values(KEY).reset_index(drop=True)[list(expected.columns)]
+    assert len(actual) == len(expected), f"Spark kept {len(actual)} rows, pandas {len(expected)}"
+    for col in expected.columns:
+        if pd.api.types.is_numeric_dtype(expected[col]):
+            np.testing.assert_allclose(actual[col].to_numpy(dtype=np.float64), expected[col].to_numpy(dtype=np.float64),
+                                       rtol=1e-4, atol=1e-6, err_msg=col)
+        else:
+            assert (actual[col].astype(str) == expected[col].astype(str)).all(), f"Column {col} differs"
+    print(f"Preprocessing parity OK on {len(expected):,} rows x {len(expected.columns)} columns")
+
+    check_split_parity(spark_df, expected, target_column, get_split_config())
+    if not parity_only:
+        print(f"pandas steps 01-05 : {pandas_seconds:8.2f} s")
+        print(f"Spark steps 01-05  : {spark_seconds:8.2f} s (local[*], includes collecting the result)")
+
+
+if __name__ == "__main__":
+    main(parity_only='--parity-only' in sys.argv[1:])
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from data_splitter import KFoldSplitter, SimpleDataSplitStrategy, take_rows
+
+
+def best_of(func, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(n_rows=1_000_000, n_features=12):
+    rng = np.random.default_rng(42)
+    X = rng.standard_normal((n_rows, n_features)).astype(np.float32)
+    y = rng.integers(0, 2, n_rows).astype(np.int8)
+    frame = pd.DataFrame(X)
+
+    # Only sorted contiguous runs are views. A shuffled train/test split and
+    # shuffled K-fold training indices are gathers, so they copy their rows.
+    contiguous = np.arange(n_rows // 5, n_rows, dtype=np.intp)
+    train_idx, _ = SimpleDataSplitStrategy(test_size=0.2).split_indices(y)
+    fold_train_idx, _ = KFoldSplitter(n_splits=5).split_indices(y)[0]
+
+    print(f"Rows: {n_rows:,} x {n_features} float32 ({X.nbytes / 2 ** 20:.0f} MiB)")
+    for label, indices in (('contiguous run', contiguous), ('shuffled split', train_idx), ('k-fold train', fold_train_idx)):
+        array_time, rows = best_of(lambda: take_rows(X, indices))
+        frame_time, _ = best_of(lambda: take_rows(frame, indices))
+        copied = 0 if np.shares_memory(rows, X) else rows.nbytes
+        print(
+            f"{label:15s}: ndarray {array_time * 1000:8.2f} ms, DataFrame {frame_time * 1000:8.2f} ms, "
+            f"{'view' if not copied else f'copy of {copied / 2 ** 20:.0f} MiB'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import argparse
+import logging
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Pipeline modules are imported inside each command, so `--help` and commands
+# that do not need pandas, MLflow or the model never load them.
+
+
+class Resources:
+    # Expensive shared objects, each built on first use and then reused by
+    # every stage of the same command.
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self._mlflow_tracker = None
+        self._inference = None
+
+    @property
+    def mlflow_tracker(self):
+        if self._mlflow_tracker is None:
+            from mlflow_utils import MLflowTracker
+            self._mlflow_tracker = MLflowTracker()
+        return self._mlflow_tracker
+
+    @property
+    def inference(self):
+        if self._inference is None:
+            from streaming_inference_pipeline import load_inference
+            self._inference = load_inference(self.model_path)
+        return self._inference
+
+
+def run_data(args, resources: Resources):
+    from data_pipeline import data_pipeline, incremental_data_pipeline
+    if args.incremental:
+        incremental_data_pipeline(args.data_path, mlflow_tracker=resources.mlflow_tracker)
+    else:
+        data_pipeline(args.data_path, force_build=args.force, mlflow_tracker=resources.mlflow_tracker)
+
+
+def run_train(args, resources: Resources):
+    from training_pipeline import training_pipeline, incremental_training_pipeline
+    from config import get_model_config
+    if args.incremental:
+        incremental_training_pipeline(model_path=args.model_path, mlflow_tracker=resources.mlflow_tracker)
+        return
+    training_pipeline(
+        data_path=args.data_path,
+        model_params=get_model_config()['model_params'],
+        model_path=args.model_path,
+        mlflow_tracker=resources.mlflow_tracker
+    )
+
+
+def run_infer(args, resources: Resources):
+    from streaming_inference_pipeline import SAMPLE_RECORD, streaming_inference
+    if args.input == '-':
+        payload = json.load(sys.stdin)
+    elif args.input:
+        with open(args.input, 'r') as file:
+            payload = json.load(file)
+    else:
+        payload = SAMPLE_RECORD
+
+    if isinstance(payload, list):
+        result = resources.inference.predict_batch(payload)
+    else:
+        result = streaming_inference(resources.inference, payload)
+    print(json.dumps(result, indent=2))
+
+
+def run_serve(args, resources: Resources):
+    import uvicorn
+    from streaming_inference_pipeline import create_app
+    uvicorn.run(create_app(resources.inference), host=args.host, port=args.port)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='churn', description='Churn pipeline entry point')
+    parser.add_argument('--model-path', default='artifacts/models/churn_analysis_model.joblib')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    data = subparsers.add_parser('data', help='Run the data preprocessing pipeline')
+    data.add_argument('--data-path', default='data/telco_data.csv')
+    data.add_argument('--force', action='store_true', help='Ignore cached step outputs')
+    data.add_argument('--incremental', action='store_true', help='Process only rows appended since the last run')
+    data.set_defaults(func=run_data)
+
+    train = subparsers.add_parser('train', help='Train and evaluate the model (runs the data pipeline only if splits are missing)')
+    train.add_argument('--data-path', default='data/telco_data.csv')
+    train.add_argument('--incremental', action='store_true', help='Warm-start the saved model on training rows appended since it was trained')
+    train.set_defaults(func=run_train)
+
+    infer = subparsers.add_parser('infer', help='Predict for a JSON record or list of records')
+    infer.add_argument('--input', help="JSON file, or '-' for stdin; defaults to a sample record")
+    infer.set_defaults(func=run_infer)
+
+    serve = subparsers.add_parser('serve', help='Serve predictions over HTTP')
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    args.func(args, Resources(args.model_path))
+
+
+if __name__ == "__main__":
+    main()
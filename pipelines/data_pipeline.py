@@ -7,43 +7,206 @@ from typing import Dict
 import yaml
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-from data_ingestion import DataIngestorCSV
-from handling_missing_values import DropMissingValuesStrategy, fillingMissingValuesStrategy, GenderImputer
-from outlier_detection import IQROutlierDetection, OutlierDetector
+from data_ingestion import DataIngestorCSV, DataIngestorParquet, ParquetConversionCache, concat_chunks
+from handling_missing_values import DropMissingValuesStrategy, fillingMissingValuesStrategy, GenderImputer, LocalGenderImputer, MissingValueImputer
+from gender_cache import GenderCache
+from outlier_detection import OutlierDetector, create_outlier_strategy
 from feature_binning import CustomBinningStrategy
-from feature_encoding import NominalEncodingStrategy, OrdinalEncodingStrategy
-from feature_scaling import MinMaxScalingStrategy
-from data_splitter import SimpleDataSplitStrategy
+from feature_encoding import NominalEncodingStrategy, OrdinalEncodingStrategy, EncoderBundle
+from feature_scaling import create_scaling_strategy, FittedScaler
+from data_splitter import create_split_strategy
+from feature_store import SplitArtifactStore
+from step_cache import CachedStep, StepCache
+from incremental import IncrementalState, WatermarkMode, complete_lines_offset, feature_drift, reference_statistics, split_new_rows
+import data_ingestion, handling_missing_values, gender_cache as gender_cache_module, outlier_detection, feature_binning, feature_encoding, feature_scaling
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
-from mlflow_utils import MLflowTracker, setup_mlflow_autolog, create_mlflow_run_tags
+from step_profiler import StepProfiler
 
 from config import (get_data_path,
                     get_columns,
+                    get_ingestion_config,
                     get_missing_value_config,
                     get_outlier_config,
                     get_binning_config,
                     get_encoding_config,
                     get_scaling_config,
-                    get_split_config
+                    get_split_config,
+                    get_preprocessing_config,
+                    get_pipeline_config,
+                    get_incremental_config,
+                    get_profiling_config
 ) 
 
+POST_PROCESSING_DROP_COLUMNS = ['RowNumber', 'CustomerId', 'Firstname', 'Lastname', 'CreditScore']
+
+
+def build_gender_imputer(gender_config: Dict, allow_fit: bool = True):
+    gender_cache_config = gender_config.get('cache', {})
+    gender_cache = None
+    if gender_cache_config.get('enabled', False):
+        gender_cache = GenderCache(
+            db_path=gender_cache_config.get('path', 'artifacts/cache/gender_cache.sqlite'),
+            max_entries=gender_cache_config.get('max_entries', 100000),
+            ttl_days=gender_cache_config.get('ttl_days', 180),
+            use_firstname_fallback=gender_cache_config.get('use_firstname_fallback', True)
+        )
+    
+    local_imputer_config = gender_config.get('local_imputer', {})
+    if local_imputer_config.get('enabled', False):
+        gender_imputer = LocalGenderImputer(
+            model_path=local_imputer_config.get('model_path', 'artifacts/models/gender_imputer.joblib'),
+            confidence_threshold=local_imputer_config.get('confidence_threshold', 0.8),
+            fallback_imputer=GenderImputer(cache=gender_cache, **gender_config.get('imputer', {}))
+                if local_imputer_config.get('fallback_to_llm', True) else None,
+            allow_fit=allow_fit
+        )
+    else:
+        gender_imputer = GenderImputer(cache=gender_cache, **gender_config.get('imputer', {}))
+    return gender_imputer, gender_cache
+
+
+def spark_preprocessing(data_path: str, preprocessing_config: Dict):
+    # Steps 01-06 on a Spark DataFrame. Fitted statistics, bounds, encoders and
+    # scaler parameters are saved to the same artifacts as the pandas engine;
+    # the model-ready DataFrame stays in Spark for splitting.
+    from pyspark.sql import functions as F
+    from spark_session import ROW_ORDER_COLUMN, get_or_create_spark_session, read_spark_data
+    from spark_preprocessing import (SparkFillMissingValuesStrategy, SparkMissingValueImputer, SparkOutlierDetector,
+                                     SparkBinningStrategy, SparkNominalEncodingStrategy, SparkOrdinalEncodingStrategy,
+                                     create_spark_outlier_strategy, create_spark_scaling_strategy)
+    
+    columns_config = get_columns()
+    missing_value_config = get_missing_value_config()
+    outlier_config = get_outlier_config()
+    encoding_config = get_encoding_config()
+    scaling_config = get_scaling_config()
+    relative_error = preprocessing_config.get('relative_error', 0.001)
+    
+    spark = get_or_create_spark_session(preprocessing_config.get('spark', {}))
+    df = read_spark_data(spark, data_path, columns_config.get('dtypes'), with_row_order=True)
+    
+    print('\nStep 01 : Handling Missing Values (Spark)...')
+    df = DropMissingValuesStrategy(critical_columns=columns_config['critical_columns']).handle_missing_values(df)
+    df = df.cache()
+    
+    missing_value_imputer = SparkMissingValueImputer.from_config(missing_value_config['methods'], relative_error)
+    missing_value_imputer.fit(df)
+    missing_value_imputer.save(missing_value_config.get('statistics_path', 'artifacts/imputation/imputation_statistics.json'))
+    
+    gender_imputer, gender_cache = build_gender_imputer(missing_value_config['methods']['gender'])
+    if isinstance(gender_imputer, LocalGenderImputer):
+        # Only rows with a missing Gender reach the imputer, so the local model
+        # is checked against (and if needed fitted on) the labelled names up front.
+        labelled = df.where(F.col('Gender').isNotNull()).select('Firstname', 'Gender').toPandas()
+        gender_imputer.ensure_model(labelled)
+    
+    gender_handler = SparkFillMissingValuesStrategy(
+        relevant_column='Gender',
+        is_custom_imputer=True,
+        custom_imputer=gender_imputer
+    )
+    df = gender_handler.handle_missing_values(df)
+    if gender_cache is not None:
+        logging.info(f"Gender cache stats: {dict(gender_cache.stats)}")
+    df = missing_value_imputer.transform(df)
+    
+    print('\nStep 02 : Detecting and Handling Outliers (Spark)...')
+    outlier_detector = SparkOutlierDetector(
+        strategy=create_spark_outlier_strategy({'relative_error': relative_error, **outlier_config}),
+        min_outlier_columns=outlier_config.get('min_outlier_columns', 2)
+    )
+    df = outlier_detector.handle_outliers(df, columns_config['outlier_columns']).cache()
+    outlier_detector.save_bounds(outlier_config.get('bounds_path', 'artifacts/outliers/outlier_bounds.json'))
+    
+    print('\nStep 03 : Binning Features (Spark)...')
+    df = SparkBinningStrategy(get_binning_config()['credit_score_bins']).bin_feature(df, 'CreditScore')
+    
+    print('\nStep 04 : Feature Encoding (Spark)...')
+    nominal_encoding = SparkNominalEncodingStrategy(encoding_config['nominal_columns'])
+    ordinal_encoding = SparkOrdinalEncodingStrategy(encoding_config['ordinal_mappings'])
+    df = nominal_encoding.encode(df)
+    df = ordinal_encoding.encode(df)
+    EncoderBundle.from_strategies(
+        nominal_encoding, ordinal_encoding, encoding_config.get('unseen_codes')
+    ).save(encoding_config.get('bundle_path', 'artifacts/encoders/encoder_bundle.json'))
+    
+    print('\nStep 05 : Feature Scaling (Spark)...')
+    scaler = create_spark_scaling_strategy(scaling_config)
+    df = scaler.scale(df, scaling_config['columns_to_scale'])
+    scaler.save(scaling_config.get('scaler_path', 'artifacts/scalers/scaler_parameters.json'))
+    
+    print('\nStep 06 : Post processing (Spark)...')
+    return df.drop(*POST_PROCESSING_DROP_COLUMNS, ROW_ORDER_COLUMN)
+
+
+def spark_split_pipeline(data_path: str, target_column: str, source: Dict, preprocessing_config: Dict, profiler) -> Dict:
+    # Steps 01-07 without collecting the data onto the driver: Spark splits
+    # and writes each split as Parquet, and the split store is filled from
+    # those files one record batch at a time.
+    from spark_preprocessing import create_spark_split_strategy, spark_reference_statistics
+    
+    data_paths_config = get_data_path()
+    incremental_config = get_incremental_config()
+    split_dir = data_paths_config.get('spark_split_dir', 'artifacts/data/spark')
+    split_paths = {split: os.path.join(split_dir, split) for split in ('train', 'test')}
+    
+    with profiler.step('spark_preprocessing'):
+        df = spark_preprocessing(data_path, preprocessing_config).cache()
+    
+    print('Step 07 : Data Splitting (Spark)...')
+    with profiler.step('split'):
+        train, test = create_spark_split_strategy(get_split_config()).split_data(df, target_column)
+        for split, frame in (('train', train), ('test', test)):
+            frame.write.mode('overwrite').parquet(split_paths[split])
+    
+    with profiler.step('save_splits'):
+        # Split CSVs from an earlier pandas run would look newer than the
+        # store to the training pipeline, so they are removed.
+        for key in ('X_train_path', 'X_test_path', 'Y_train_path', 'Y_test_path'):
+            if os.path.exists(data_paths_config[key]):
+                os.remove(data_paths_config[key])
+        split_store = SplitArtifactStore(data_paths_config.get('split_store_dir', 'artifacts/data/store'))
+        manifest = split_store.save_parquet(split_paths['train'], split_paths['test'], target_column)
+    
+    train_rows, test_rows = manifest['splits']['y_train']['rows'], manifest['splits']['y_test']['rows']
+    IncrementalState(incremental_config.get('state_path', 'artifacts/incremental/state.json')).reset(
+        data_path, source, train_rows + test_rows, spark_reference_statistics(df.drop(target_column))
+    )
+    print(f"Train rows: {train_rows}, test rows: {test_rows}; splits written to {split_dir}")
+    return {
+        'total_samples': train_rows + test_rows,
+        'train_samples': train_rows,
+        'test_samples': test_rows,
+        'train_path': split_paths['train'],
+        'test_path': split_paths['test']
+    }
+
 def data_pipeline(
     data_path: str = "data/telco_data.csv",
     target_column: str = "Exited",
     test_size: float = 0.2,
-    force_build: bool = False
+    force_build: bool = False,
+    mlflow_tracker = None
 ) -> Dict[str, np.ndarray]:
+    # mlflow is imported here rather than at module level so that importing
+    # this module (e.g. from training_pipeline or the CLI) stays cheap.
+    from mlflow_utils import MLflowTracker, setup_mlflow_autolog, create_mlflow_run_tags
     
     data_paths_config = get_data_path()
     columns_config = get_columns()
+    missing_value_config = get_missing_value_config()
+    ingestion_config = get_ingestion_config()
     outlier_config = get_outlier_config()
     binning_config = get_binning_config()
     encoding_config = get_encoding_config()
     scaling_config = get_scaling_config()
     splitting_config = get_split_config()
+    preprocessing_config = get_preprocessing_config()
+    pipeline_config = get_pipeline_config()
+    incremental_config = get_incremental_config()
 
-    mlflow_tracker = MLflowTracker()
+    mlflow_tracker = mlflow_tracker or MLflowTracker()
     setup_mlflow_autolog()
     run_tags = create_mlflow_run_tags(
         'data_pipeline', {
@@ -62,88 +225,170 @@ def data_pipeline(
     y_train_path = os.path.join(artifacts_dir, 'y_train.csv')
     y_test_path = os.path.join(artifacts_dir, 'y_test.csv')
     
-    if os.path.exists(X_train_path) and \
-       os.path.exists(X_test_path) and \
-       os.path.exists(y_train_path) and \
-       os.path.exists(y_test_path):
-           
-           X_train = pd.read_csv(X_train_path)
-           X_test = pd.read_csv(X_test_path)
-           y_train = pd.read_csv(y_train_path)
-           y_test = pd.read_csv(y_test_path)  
-    
-    os.makedirs(data_paths_config['data_artifacts_dir'], exist_ok=True)
-    os.makedirs(data_paths_config.get('processed_dir', 'data/processed'), exist_ok=True)
-    imputed_path = data_paths_config.get('imputed_data', 'data/processed/imputed.csv')
-           
-    if not os.path.exists(imputed_path):       
-        ingester = DataIngestorCSV()     
-        df = ingester.ingest_data(data_path)
-        print("\nData Ingestion Completed.")
-        print(f"Data Shape: {df.shape}")
-        
+    statistics_path = missing_value_config.get('statistics_path', 'artifacts/imputation/imputation_statistics.json')
+    bounds_path = outlier_config.get('bounds_path', 'artifacts/outliers/outlier_bounds.json')
+    bundle_path = encoding_config.get('bundle_path', 'artifacts/encoders/encoder_bundle.json')
+    scaler_path = scaling_config.get('scaler_path', 'artifacts/scalers/scaler_parameters.json')
+    local_imputer_config = missing_value_config['methods']['gender'].get('local_imputer', {})
+    gender_model_path = local_imputer_config.get('model_path', 'artifacts/models/gender_imputer.joblib') \
+        if local_imputer_config.get('enabled', False) else None
+    
+    if ingestion_config.get('use_parquet_cache', False):
+        ingester = DataIngestorParquet(
+            cache=ParquetConversionCache(
+                ingestion_config.get('parquet_cache_dir', 'artifacts/cache/parquet'),
+                dtypes=columns_config.get('dtypes'),
+                chunk_size=ingestion_config.get('chunk_size', 100000)
+            )
+        )
+    else:
+        ingester = DataIngestorCSV(dtypes=columns_config.get('dtypes'))
+    
+    
+    def handle_missing_values(_):
+        chunks = ingester.ingest_data_chunks(data_path, ingestion_config.get('chunk_size', 100000))
         
         print('\nStep 01 : Handling Missing Values...')
         drop_handler = DropMissingValuesStrategy(critical_columns=columns_config['critical_columns'])
+        # Rows are dropped per chunk, but the imputer, outlier bounds, encoders
+        # and the split are all fitted on the whole frame, so it is materialised
+        # here and peak memory follows the file size (the Spark engine does not).
+        df = concat_chunks(drop_handler.handle_missing_values_chunks(chunks))
+        print("\nData Ingestion Completed.")
+        print(f"Data Shape: {df.shape}")
         
-        age_handler = fillingMissingValuesStrategy(
-            method='mean',
-            relevant_column='Age'
-        )
+        missing_value_imputer = MissingValueImputer.from_config(missing_value_config['methods'])
+        missing_value_imputer.fit(df)
+        missing_value_imputer.save(statistics_path)
         
+        gender_imputer, gender_cache = build_gender_imputer(missing_value_config['methods']['gender'])
         gender_handler = fillingMissingValuesStrategy(
             relevant_column='Gender',
             is_custom_imputer=True,
-            custom_imputer=GenderImputer()
+            custom_imputer=gender_imputer
         )
         
-        df = drop_handler.handle_missing_values(df)
-        df = age_handler.handle_missing_values(df)
         df = gender_handler.handle_missing_values(df)
-        df.to_csv('temp_imputed_data.csv', index=False)
+        if gender_cache is not None:
+            logging.info(f"Gender cache stats: {dict(gender_cache.stats)}")
+        df = missing_value_imputer.transform(df)
+        print("\nMissing Value Handling Completed.")
+        return df
     
-    df = pd.read_csv('temp_imputed_data.csv')
-    print("\nMissing Value Handling Completed.")
     
+    def handle_outliers(df):
+        print('\nStep 02 : Detecting and Handling Outliers...')
+        outlier_detector = OutlierDetector(
+            strategy=create_outlier_strategy(outlier_config),
+            min_outlier_columns=outlier_config.get('min_outlier_columns', 2)
+        )
+        df = outlier_detector.handle_outliers(df, columns_config['outlier_columns'])
+        outlier_detector.save_bounds(bounds_path)
+        print(f'After Outlier Handling, Data Shape: {df.shape}')
+        print("\nOutlier Detection and Handling Completed.")
+        return df
     
-    print('\nStep 02 : Detecting and Handling Outliers...')
-    outlier_detector = OutlierDetector(strategy=IQROutlierDetection())
-    df = outlier_detector.handle_outliers(df, columns_config['outlier_columns'])
-    print(f'After Outlier Handling, Data Shape: {df.shape}')
-    print("\nOutlier Detection and Handling Completed.")
     
+    def bin_features(df):
+        print('\nStep 03 : Binning Features...')
+        binning = CustomBinningStrategy(binning_config['credit_score_bins'])
+        df = binning.bin_feature(df, 'CreditScore')
+        print("\nFeature Binning Completed.")
+        print(f"Data after Binning:\n {df.head()}")
+        return df
     
-    print('\nStep 03 : Binning Features...')
-    binning = CustomBinningStrategy(binning_config['credit_score_bins'])
-    df = binning.bin_feature(df, 'CreditScore')
-    print("\nFeature Binning Completed.")
-    print(f"Data after Binning:\n {df.head()}")
     
+    def encode_features(df):
+        print('\nStep 04 : Feature Encoding...')
+        nominal_encoding = NominalEncodingStrategy(encoding_config['nominal_columns'])
+        ordinal_encoding = OrdinalEncodingStrategy(encoding_config['ordinal_mappings'])
+        df = nominal_encoding.encode(df)
+        df = ordinal_encoding.encode(df)
+        EncoderBundle.from_strategies(
+            nominal_encoding, ordinal_encoding, encoding_config.get('unseen_codes')
+        ).save(bundle_path)
+        print("\nFeature Encoding Completed.")
+        print(f"Data after Encoding:\n {df.head()}")
+        return df
     
-    print('\nStep 04 : Feature Encoding...')
-    nominal_encoding = NominalEncodingStrategy(encoding_config['nominal_columns'])
-    ordinal_encoding = OrdinalEncodingStrategy(encoding_config['ordinal_mappings'])
-    df = nominal_encoding.encode(df)
-    df = ordinal_encoding.encode(df)
-    print("\nFeature Encoding Completed.")
-    print(f"Data after Encoding:\n {df.head()}")
     
+    def scale_features(df):
+        print('\nStep 05 : Feature Scaling...')
+        scaler = create_scaling_strategy(scaling_config)
+        df = scaler.scale(df, scaling_config['columns_to_scale'])
+        scaler.save(scaler_path)
+        print("\nFeature Scaling Completed.")
+        print(f"Data after Scaling:\n {df.head()}")
+        return df
     
-    print('\nStep 05 : Feature Scaling...')
-    min_max_scaler = MinMaxScalingStrategy()   
-    df = min_max_scaler.scale(df, scaling_config['columns_to_scale'])
-    print("\nFeature Scaling Completed.")
-    print(f"Data after Scaling:\n {df.head()}")
     
+    def post_process(df):
+        print('\nStep 06 : Post processing...')
+        df = df.drop(columns = POST_PROCESSING_DROP_COLUMNS)
+        print(f"Data after Post processing:\n {df.head()}")
+        return df
     
-    print('\nStep 06 : Post processing...')
-    df = df.drop(columns = ['RowNumber', 'CustomerId', 'Firstname', 'Lastname', 'CreditScore'])
-    print(f"Data after Post processing:\n {df.head()}")
+    
+    profiler = StepProfiler.from_config('data_pipeline', get_profiling_config())
+    watermark_column = incremental_config.get('watermark_column', 'RowNumber')
+    watermark_ingester = None
+    if isinstance(ingester, DataIngestorParquet) and preprocessing_config.get('engine', 'pandas') == 'pandas':
+        # Step 01 reads the same columnar copy, so converting it here costs
+        # nothing extra and the scan reads the watermark column alone.
+        watermark_ingester = DataIngestorParquet(columns=[watermark_column], cache=ingester.cache)
+    with profiler.step('scan_source'):
+        source = IncrementalState.scan_source(data_path, watermark_column, watermark_ingester)
+    
+    if preprocessing_config.get('engine', 'pandas') == 'pyspark':
+        # The Spark engine writes its own Parquet splits, so it bypasses the
+        # step cache (whose entries are local pandas frames).
+        metrics = spark_split_pipeline(data_path, target_column, source, preprocessing_config, profiler)
+        logging.info("Data pipeline completed successfully.")
+        mlflow_tracker.log_data_pipeline_metrics(metrics)
+        profiler.report(mlflow_tracker)
+        mlflow_tracker.end_run()
+        return
+    
+    steps = [
+        CachedStep(
+            'missing_values', handle_missing_values,
+            config={
+                'missing_values': missing_value_config,
+                'critical_columns': columns_config['critical_columns'],
+                'dtypes': columns_config.get('dtypes')
+            },
+            modules=[data_ingestion, handling_missing_values, gender_cache_module],
+            # The local gender model is written by this step (and fitted from
+            # its input), so it is stored with the entry instead of being part
+            # of the key. The gender cache only pins LLM answers the cached
+            # output already holds.
+            artifacts=[statistics_path],
+            optional_artifacts=[gender_model_path] if gender_model_path else []
+        ),
+        CachedStep(
+            'outliers', handle_outliers,
+            config={'outlier_detection': outlier_config, 'outlier_columns': columns_config['outlier_columns']},
+            modules=[outlier_detection],
+            artifacts=[bounds_path]
+        ),
+        CachedStep('binning', bin_features, config=binning_config, modules=[feature_binning]),
+        CachedStep('encoding', encode_features, config=encoding_config, modules=[feature_encoding], artifacts=[bundle_path]),
+        CachedStep('scaling', scale_features, config=scaling_config, modules=[feature_scaling], artifacts=[scaler_path]),
+        CachedStep('post_processing', post_process, config=POST_PROCESSING_DROP_COLUMNS)
+    ]
+    
+    step_cache = StepCache(
+        pipeline_config.get('cache_dir', 'artifacts/cache/steps'),
+        enabled=pipeline_config.get('enable_cache', False),
+        max_entries_per_step=pipeline_config.get('max_cache_entries_per_step', 3)
+    )
+    df, _ = step_cache.run_steps(steps, StepCache.file_fingerprint(data_path), force=force_build, profiler=profiler)
     
     
     print('Step 07 : Data Splitting...')
-    splitting = SimpleDataSplitStrategy(test_size=splitting_config['test_size'])
-    X_train, X_test, y_train, y_test = splitting.split_data(df, target_column)
+    with profiler.step('split', df) as record:
+        splitting = create_split_strategy(splitting_config)
+        X_train, X_test, y_train, y_test = record.output(splitting.split_data(df, target_column))
     print("\nData Splitting Completed.")
     
     print(f"X_train shape: {X_train.shape}")
@@ -153,11 +398,21 @@ def data_pipeline(
     
     # Save split data to artifacts
     print(f"\nSaving split data to {artifacts_dir}...")
-    X_train.to_csv(X_train_path, index=False)
-    X_test.to_csv(X_test_path, index=False)
-    y_train.to_csv(y_train_path, index=False)
-    y_test.to_csv(y_test_path, index=False)
+    with profiler.step('save_splits', (X_train, X_test, y_train, y_test)):
+        X_train.to_csv(X_train_path, index=False)
+        X_test.to_csv(X_test_path, index=False)
+        y_train.to_csv(y_train_path, index=False)
+        y_test.to_csv(y_test_path, index=False)
+        split_store = SplitArtifactStore(data_paths_config.get('split_store_dir', 'artifacts/data/store'))
+        split_store.save(
+            X_train, X_test, y_train, y_test,
+            sources={'X_train': X_train_path, 'X_test': X_test_path, 'y_train': y_train_path, 'y_test': y_test_path}
+        )
     print("Split data saved successfully!")
+    
+    IncrementalState(incremental_config.get('state_path', 'artifacts/incremental/state.json')).reset(
+        data_path, source, len(df), reference_statistics(df.drop(columns=[target_column]))
+    )
 
     logging.info("Data pipeline completed successfully.")
 
@@ -170,9 +425,133 @@ def data_pipeline(
             'y_train_path': y_train_path,
             'y_test_path': y_test_path
         })
+    profiler.report(mlflow_tracker)
         
     mlflow_tracker.end_run()
 
+
+def incremental_data_pipeline(
+    data_path: str = "data/telco_data.csv",
+    target_column: str = "Exited",
+    mlflow_tracker = None
+):
+    data_paths_config = get_data_path()
+    columns_config = get_columns()
+    missing_value_config = get_missing_value_config()
+    ingestion_config = get_ingestion_config()
+    outlier_config = get_outlier_config()
+    binning_config = get_binning_config()
+    encoding_config = get_encoding_config()
+    scaling_config = get_scaling_config()
+    splitting_config = get_split_config()
+    incremental_config = get_incremental_config()
+    
+    state = IncrementalState(incremental_config.get('state_path', 'artifacts/incremental/state.json'))
+    if not state.exists():
+        logging.info("No incremental state found; running the full data pipeline")
+        return data_pipeline(data_path, target_column, mlflow_tracker=mlflow_tracker)
+    state.load()
+    
+    local_imputer_config = missing_value_config['methods']['gender'].get('local_imputer', {})
+    if local_imputer_config.get('enabled', False) and \
+       not os.path.exists(local_imputer_config.get('model_path', 'artifacts/models/gender_imputer.joblib')):
+        # New rows alone are too few (and too skewed) to fit the name model on
+        logging.info("No saved local gender imputer; running the full data pipeline")
+        return data_pipeline(data_path, target_column, mlflow_tracker=mlflow_tracker)
+    
+    profiler = StepProfiler.from_config('incremental_data_pipeline', get_profiling_config())
+    watermark_column = incremental_config.get('watermark_column', 'RowNumber')
+    file_offset = complete_lines_offset(data_path)
+    
+    print("Step 00 : Ingesting New Rows...")
+    with profiler.step('ingest_new_rows') as record:
+        chunks = state.read_new_rows(
+            data_path,
+            watermark_column,
+            WatermarkMode(incremental_config.get('watermark_mode', 'offset')),
+            dtypes=columns_config.get('dtypes'),
+            chunk_size=ingestion_config.get('chunk_size', 100000),
+            end_offset=file_offset
+        )
+        drop_handler = DropMissingValuesStrategy(critical_columns=columns_config['critical_columns'])
+        df = record.output(concat_chunks(drop_handler.handle_missing_values_chunks(chunks)))
+    if df.empty:
+        logging.info(f"No rows past watermark {state.state['row_watermark']}; nothing to do")
+        return
+    row_watermark = int(df[watermark_column].max())
+    new_rows = len(df)
+    print(f"New rows: {new_rows}")
+    
+    volume = state.volume_fraction(new_rows)
+    if volume > incremental_config.get('refit_volume_fraction', 0.25):
+        logging.info(f"{volume:.1%} of the fitted row count arrived since the last fit; refitting on the full history")
+        return data_pipeline(data_path, target_column, mlflow_tracker=mlflow_tracker)
+    
+    print('\nStep 01 : Applying Fitted Imputation...')
+    with profiler.step('missing_values', df) as record:
+        gender_imputer, _ = build_gender_imputer(missing_value_config['methods']['gender'], allow_fit=False)
+        df = gender_imputer.impute(df)
+        df = record.output(MissingValueImputer.load(
+            missing_value_config.get('statistics_path', 'artifacts/imputation/imputation_statistics.json')
+        ).transform(df))
     
-data_pipeline()
+    print('\nStep 02 : Applying Fitted Outlier Bounds...')
+    with profiler.step('outliers', df) as record:
+        outlier_detector = OutlierDetector.load_bounds(
+            outlier_config.get('bounds_path', 'artifacts/outliers/outlier_bounds.json'), outlier_config
+        )
+        df = record.output(outlier_detector.handle_outliers(df))
+    
+    print('\nSteps 03-06 : Binning, Encoding, Scaling and Post processing...')
+    with profiler.step('transform', df) as record:
+        df = CustomBinningStrategy(binning_config['credit_score_bins']).bin_feature(df, 'CreditScore')
+        df = EncoderBundle.load(encoding_config.get('bundle_path', 'artifacts/encoders/encoder_bundle.json')).encode(df)
+        df = FittedScaler.load(scaling_config.get('scaler_path', 'artifacts/scalers/scaler_parameters.json')).transform(df)
+        df = record.output(df.drop(columns = POST_PROCESSING_DROP_COLUMNS))
+    if df.empty:
+        logging.info(f"All {new_rows} new rows were removed as outliers")
+        state.advance(file_offset, row_watermark, new_rows)
+        profiler.report()
+        return
+    
+    # The mean of a small batch is too noisy to compare with the reference;
+    # small batches still count towards the refit volume fraction.
+    drift = {}
+    if len(df) >= incremental_config.get('drift_min_rows', 500):
+        drift = feature_drift(df, state.state['reference'])
+    else:
+        logging.info(f"Skipping the drift check for a batch of {len(df)} rows")
+    drifted = {col: value for col, value in drift.items() if value > incremental_config.get('drift_threshold', 0.25)}
+    if drifted:
+        logging.info(f"Feature drift above threshold in {drifted}; refitting on the full history")
+        return data_pipeline(data_path, target_column, mlflow_tracker=mlflow_tracker)
+    
+    print('Step 07 : Splitting and Appending New Rows...')
+    with profiler.step('append_splits', df):
+        X_train, X_test, y_train, y_test = split_new_rows(
+            df, target_column, create_split_strategy(splitting_config), incremental_config.get('split_min_rows', 20)
+        )
+        artifacts_dir = os.path.join(os.path.dirname(__file__), '..', data_paths_config['data_artifacts_dir'])
+        sources = {}
+        for frame, name in ((X_train, 'X_train'), (X_test, 'X_test'), (y_train, 'y_train'), (y_test, 'y_test')):
+            path = os.path.join(artifacts_dir, f'{name}.csv')
+            # A Spark engine run writes only the store. Recreating a CSV here
+            # would hold just the new rows, so the store stays the only source.
+            if os.path.exists(path):
+                frame.to_csv(path, mode='a', header=False, index=False)
+                sources[name] = path
+        SplitArtifactStore(data_paths_config.get('split_store_dir', 'artifacts/data/store')).append(
+            X_train, X_test, y_train, y_test, sources=sources
+        )
+    
+    state.advance(file_offset, row_watermark, new_rows)
+    profiler.report()
+    logging.info(f"Incremental data pipeline appended {len(X_train)} train and {len(X_test)} test rows "
+                 f"(max drift {max(drift.values(), default=0.0):.3f}, volume {volume:.1%})")
+
+
+if __name__ == "__main__":
+    from cli import main
+    main(['data'])
+
         
\ No newline at end of file
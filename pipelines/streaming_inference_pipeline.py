@@ -1,13 +1,13 @@
 import os
 import sys
 import json
-import logging  
+import logging
 import pandas as pd
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from model_inference import ModelInference
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
-from config import get_model_config, get_inference_config
+from config import get_model_config, get_inference_config, get_deployment_config
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,20 +15,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-logger.info("Starting streaming inference pipeline...")
+DEFAULT_MODEL_PATH = "artifacts/models/churn_analysis_model.joblib"
 
-inference = ModelInference(model_path="artifacts/models/churn_analysis_model.joblib")
-   
-def streaming_inference(inference, input_data):
-    
-    inference.load_encoders('artifacts/encoders')
-    #preprocessed_data = inference.preprocess_input(input_data)
-    #print(preprocessed_data)
-    result = inference.predict(input_data)
-    return result
-
-if __name__ == "__main__":
-    data = {
+SAMPLE_RECORD = {
     "RowNumber": 6,
     "CustomerId": 15574012,
     "Firstname": "Jack",
@@ -43,7 +32,39 @@ if __name__ == "__main__":
     "HasCrCard": 1,
     "IsActiveMember": 0,
     "EstimatedSalary": 149756.71,
-    }
+}
+
+
+def load_inference(model_path: str = DEFAULT_MODEL_PATH) -> ModelInference:
+    logger.info("Starting streaming inference pipeline...")
+    return ModelInference(model_path=model_path)
+
+
+def streaming_inference(inference, input_data):
 
-    pred = streaming_inference(inference, data)
-    print(pred)
\ No newline at end of file
+    #preprocessed_data = inference.preprocess_input(input_data)
+    #print(preprocessed_data)
+    result = inference.predict(input_data)
+    return result
+
+
+def create_app(inference: ModelInference):
+    # The model and its artifacts are loaded once by the caller and shared by
+    # every request; fastapi is only imported when the service is built.
+    from fastapi import FastAPI, Body
+
+    app = FastAPI(title="Churn prediction")
+    endpoint = get_deployment_config().get('api_endpoint', '/predict')
+
+    @app.post(endpoint)
+    def predict(payload = Body(...)):
+        if isinstance(payload, list):
+            return inference.predict_batch(payload)
+        return inference.predict(payload)
+
+    return app
+
+
+if __name__ == "__main__":
+    from cli import main
+    main(['infer'])
@@ -1,87 +1,342 @@
 import os
-from pyexpat import model
 import sys
 import joblib
 import logging
 import pandas as pd
+from datetime import datetime
 from data_pipeline import data_pipeline
 from typing import Dict, Any, Optional, Tuple
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-from mlflow_utils import MLflowTracker, create_mlflow_run_tags, setup_mlflow_autolog
-from model_training import ModelTrainer
+from model_training import ModelTrainer, CrossValidationTrainer, load_training_state, save_training_state
 from model_evaluation import ModelEvaluator
-from model_building import RandomForestModelBuilder, XGBoostModelBuilder
+from model_building import RandomForestModelBuilder, XGBoostModelBuilder, builder_for_model
+from model_selection import ModelSelector
+from hyperparameter_tuning import HyperparameterTuner
+from data_ingestion import DataIngestorCSV, DataIngestorParquet, ParquetConversionCache
+from feature_store import SplitArtifactStore
+from incremental import IncrementalState
+from xgboost_matrix import XGBoostMatrixCache
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
-from config import get_model_config, get_data_path
+from config import get_model_config, get_data_path, get_ingestion_config, get_profiling_config, get_model_selection_config, get_training_config, get_incremental_config
+from step_profiler import StepProfiler
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def preprocessing_fitted_at() -> Optional[str]:
+    # Changes whenever the data pipeline refits its imputers, encoders and
+    # scalers, after which features from before and after are not comparable.
+    state = IncrementalState(get_incremental_config().get('state_path', 'artifacts/incremental/state.json'))
+    return state.load().state.get('fitted_at') if state.exists() else None
+
+
+def record_training_state(model_path: str, model_name: str, train_rows: int, metrics: Dict[str, Any], mode: str):
+    save_training_state(model_path, {
+        'model_name': model_name,
+        'train_rows': int(train_rows),
+        'preprocessing_fitted_at': preprocessing_fitted_at(),
+        'metrics': {name: float(value) for name, value in metrics.items()},
+        'mode': mode,
+        'trained_at': datetime.now().isoformat(timespec='seconds')
+    })
+
+
+def split_sources(data_paths: Dict[str, str]) -> Dict[str, str]:
+    return {
+        'X_train': data_paths['X_train_path'],
+        'X_test': data_paths['X_test_path'],
+        'y_train': data_paths['Y_train_path'],
+        'y_test': data_paths['Y_test_path']
+    }
+
+
 def training_pipeline(
     data_path: str = "data/telco_data.csv",
     model_params: Optional[Dict[str, Any]] = None,
     test_size: float = 0.2,
     random_state: int = 42,
     model_path: str = "artifacts/models/churn_analysis_model.joblib",
+    mlflow_tracker = None
 ):
-    if not os.path.exists(get_data_path()['X_train_path']) and \
-       not os.path.exists(get_data_path()['X_test_path']) and \
-       not os.path.exists(get_data_path()['y_train_path']) and \
-       not os.path.exists(get_data_path()['y_test_path']):
-           
-           data_pipeline()
-    
+    from mlflow_utils import MLflowTracker, create_mlflow_run_tags, setup_mlflow_autolog
+
+    data_paths = get_data_path()
+    sources = split_sources(data_paths)
+    if not SplitArtifactStore(data_paths.get('split_store_dir', 'artifacts/data/store')).exists() and \
+       not all(os.path.exists(path) for path in sources.values()):
+        mlflow_tracker = mlflow_tracker or MLflowTracker()
+        data_pipeline(data_path, mlflow_tracker=mlflow_tracker)
     else:
         print("Data artifacts already exist. Skipping data pipeline and loading existing artifacts...")
 
     logging.info("Starting training pipeline...")
 
-    mlflow_tracker = MLflowTracker()
+    selection_config = get_model_selection_config()
+    model_selection = selection_config.get('enabled', False)
+    training_config = get_training_config()
+    training_strategy = get_model_config().get('training_strategy', 'simple')
+    tuning_config = training_config.get('hyperparameter_tuning', {})
+    tuning = tuning_config.get('enabled', False) and not model_selection
+    n_jobs = training_config.get('sklearn_training', {}).get('n_jobs', -1)
+    matrix_cache = build_matrix_cache(training_config)
+
+    mlflow_tracker = mlflow_tracker or MLflowTracker()
     setup_mlflow_autolog()
-    run_tags = create_mlflow_run_tags(
-        'training_pipeline', {
-            'model_type': 'XGBoost',
-            'training_strategy':'simple',
-            'other_models': 'RandomForest'
-        }
-    )
+    if model_selection:
+        run_tags = create_mlflow_run_tags(
+            'training_pipeline', {
+                'model_type': 'selected',
+                'training_strategy': 'model_selection',
+                'other_models': ','.join(selection_config.get('candidates', []))
+            }
+        )
+    else:
+        run_tags = create_mlflow_run_tags(
+            'training_pipeline', {
+                'model_type': 'XGBoost',
+                'training_strategy': training_strategy,
+                'other_models': 'RandomForest'
+            }
+        )
 
     run=mlflow_tracker.start_run(run_name='Training Pipeline', tags=run_tags)
+    profiler = StepProfiler.from_config('training_pipeline', get_profiling_config())
 
     # Load data
-    X_train = pd.read_csv(get_data_path()['X_train_path'])
-    y_train = pd.read_csv(get_data_path()['Y_train_path'])
-    X_test = pd.read_csv(get_data_path()['X_test_path'])
-    y_test = pd.read_csv(get_data_path()['Y_test_path'])
+    with profiler.step('load_data') as record:
+        split_store = SplitArtifactStore(get_data_path().get('split_store_dir', 'artifacts/data/store'))
+        # Split CSVs edited or regenerated after the store was written win
+        use_store = split_store.is_current(sources)
+        if use_store:
+            X_train, X_test, y_train, y_test = split_store.load(mmap_mode='r')
+        else:
+            ingestion_config = get_ingestion_config()
+            if ingestion_config.get('use_parquet_cache', False):
+                ingester = DataIngestorParquet(
+                    cache=ParquetConversionCache(ingestion_config.get('parquet_cache_dir', 'artifacts/cache/parquet'))
+                )
+            else:
+                ingester = DataIngestorCSV()
+            X_train = ingester.ingest_data(get_data_path()['X_train_path'])
+            y_train = ingester.ingest_data(get_data_path()['Y_train_path'])
+            X_test = ingester.ingest_data(get_data_path()['X_test_path'])
+            y_test = ingester.ingest_data(get_data_path()['Y_test_path'])
+        record.output((X_train, X_test))
+
+    # Selection candidates, CV folds and tuning trials train in separate processes
+    # that memmap the split store, so CSV-only splits are written to the store first.
+    if (model_selection or tuning or training_strategy == 'cv') and not use_store:
+        with profiler.step('store_splits', X_train):
+            split_store.save(X_train, X_test, y_train, y_test, sources=sources)
+        use_store = True
+
+    if model_selection:
+        zoo = get_model_config().get('sklearn_model_types', {})
+        selector = ModelSelector(
+            {model_type: zoo.get(model_type, {}) for model_type in selection_config.get('candidates', [])},
+            metric=selection_config.get('metric', 'f1_score'),
+            cpu_budget=selection_config.get('cpu_budget'),
+            candidate_dir=selection_config.get('candidate_dir', 'artifacts/models/candidates'),
+            validation_fraction=selection_config.get('validation_fraction', 0.2),
+            random_state=training_config.get('random_state', 42),
+            matrix_cache=matrix_cache
+        )
+        with profiler.step('model_selection', X_train):
+            best = selector.select(split_store)
+        with profiler.step('save_model'):
+            selector.promote(model_path)
+        logger.info(f"Model saved to {model_path}")
+
+        model = joblib.load(model_path)
+        results = best['metrics']
+        logger.info(f"Evaluation results for {best['model_name']}: {results}")
+
+        record_training_state(model_path, best['model_name'], len(X_train), results, 'full')
+        mlflow_tracker.log_model_selection(selector.results, selector.metric)
+        mlflow_tracker.log_training_metrics(model, results, best['model_params'])
+        profiler.report(mlflow_tracker)
+        mlflow_tracker.end_run()
+        return
 
     # Build model
-    model_builder = XGBoostModelBuilder(**get_model_config()['model_params'])
+    model_builder = XGBoostModelBuilder(**(model_params if model_params is not None else get_model_config()['model_params']))
+    model_builder.set_threads(n_jobs)
+    if tuning:
+        tuner = HyperparameterTuner.from_config(
+            XGBoostModelBuilder,
+            'xgboost',
+            tuning_config,
+            base_params=model_builder.model_params,
+            random_state=training_config.get('random_state', 42),
+            mlflow_tracker=mlflow_tracker,
+            matrix_cache=matrix_cache
+        )
+        with profiler.step('tune', X_train):
+            best = tuner.tune(split_store)
+        model_builder = XGBoostModelBuilder(**{**model_builder.model_params, **best['params']})
+        model_builder.set_threads(n_jobs)
     model = model_builder.build_model()
 
     # Train model
     trainer = ModelTrainer()
-    model, train_score = trainer.train(model, X_train, y_train.squeeze())
-    print(model_params)
-    logger.info(f"Training completed with training score: {train_score:.4f}")
+    cv_results = None
+    if training_strategy == 'cv':
+        cv_trainer = CrossValidationTrainer(
+            model_builder,
+            cv_folds=training_config.get('cv_folds', 5),
+            early_stopping_rounds=training_config.get('early_stopping_patience', 10),
+            max_iterations=training_config.get('max_iterations', 1000),
+            cpu_budget=n_jobs,
+            random_state=training_config.get('random_state', 42),
+            matrix_cache=matrix_cache
+        )
+        with profiler.step('train', X_train):
+            model, cv_results = cv_trainer.train(split_store)
+        logger.info(f"Cross-validation completed with mean fold metrics: {cv_results['mean_metrics']}")
+    elif use_store:
+        # Fits from the cached XGBoost matrix for this split store rather than
+        # converting the DataFrame again on every run.
+        with profiler.step('train', X_train):
+            model = model_builder.fit_store(split_store, matrix_cache=matrix_cache)
+        logger.info("Training completed")
+    else:
+        with profiler.step('train', X_train):
+            model, train_score = trainer.train(model, X_train, y_train.squeeze())
+        logger.info(f"Training completed with training score: {train_score:.4f}")
 
     #save model
-    trainer.save_model(model, model_path)
+    with profiler.step('save_model'):
+        trainer.save_model(model, model_path)
     logger.info(f"Model saved to {model_path}")
 
     #evaluate model
     evaluater = ModelEvaluator(model, "XGBoost")
-    results = evaluater.evaluate(X_test, y_test)
+    with profiler.step('evaluate', X_test):
+        if use_store:
+            results = evaluater.evaluate_store(split_store)
+        else:
+            results = evaluater.evaluate(X_test, y_test)
     logger.info(f"Evaluation results: {results}")
+    record_training_state(model_path, model_builder.model_name, len(X_train), results, 'full')
 
-    params=get_model_config()['model_params']
+    params=model_builder.model_params
+    if cv_results is not None:
+        mlflow_tracker.log_cv_results(cv_results)
     mlflow_tracker.log_training_metrics(model, results, params)
+    profiler.report(mlflow_tracker)
     mlflow_tracker.end_run()
         
+
+def build_matrix_cache(training_config: Dict[str, Any]) -> XGBoostMatrixCache:
+    cache_config = training_config.get('xgboost_matrix_cache', {})
+    return XGBoostMatrixCache(
+        cache_config.get('cache_dir', 'artifacts/cache/xgboost'),
+        enabled=cache_config.get('enabled', True),
+        keep_fingerprints=cache_config.get('keep_fingerprints', 1),
+        max_slices=cache_config.get('max_slices', 16)
+    )
+
+
+def incremental_training_pipeline(
+    model_path: str = "artifacts/models/churn_analysis_model.joblib",
+    mlflow_tracker = None
+):
+    from mlflow_utils import MLflowTracker, create_mlflow_run_tags
+
+    retraining_config = get_training_config().get('incremental_retraining', {})
+    split_store = SplitArtifactStore(get_data_path().get('split_store_dir', 'artifacts/data/store'))
+    state = load_training_state(model_path)
+
+    if state is None or not os.path.exists(model_path) or not split_store.is_current(split_sources(get_data_path())):
+        logging.info("No saved model, training state or current split store; running the full training pipeline")
+        return training_pipeline(model_path=model_path, mlflow_tracker=mlflow_tracker)
+    if state.get('preprocessing_fitted_at') != preprocessing_fitted_at():
+        logging.info("Preprocessing was refit since the model was trained; running the full training pipeline")
+        return training_pipeline(model_path=model_path, mlflow_tracker=mlflow_tracker)
+
+    model = joblib.load(model_path)
+    try:
+        model_builder = builder_for_model(model)
+    except ValueError as e:
+        logging.info(f"{e}; running the full training pipeline")
+        return training_pipeline(model_path=model_path, mlflow_tracker=mlflow_tracker)
+    if not model_builder.SUPPORTS_WARM_START:
+        logging.info(f"{model_builder.model_name} cannot be warm-started; running the full training pipeline")
+        return training_pipeline(model_path=model_path, mlflow_tracker=mlflow_tracker)
+    # The saved model's thread count comes from whatever machine trained it
+    model_builder.set_threads(get_training_config().get('sklearn_training', {}).get('n_jobs', -1))
+
+    X_train, y_train = split_store.load_split('train', mmap_mode='r')
+    watermark = state['train_rows']
+    if len(X_train) < watermark:
+        logging.info(f"Split store has {len(X_train)} training rows, fewer than the {watermark} the model saw; running the full training pipeline")
+        return training_pipeline(model_path=model_path, mlflow_tracker=mlflow_tracker)
+    if len(X_train) == watermark:
+        logging.info(f"No training rows past watermark {watermark}; nothing to do")
+        return
+
+    # The split store only grows by appending, so rows past the watermark
+    # are exactly the ones the saved model has not seen.
+    X_new = X_train.iloc[watermark:]
+    logging.info(f"Warm-starting {model_builder.model_name} on {len(X_new)} new training rows")
+
+    mlflow_tracker = mlflow_tracker or MLflowTracker()
+    run_tags = create_mlflow_run_tags(
+        'incremental_training_pipeline', {
+            'model_type': model_builder.model_name,
+            'training_strategy': 'warm_start'
+        }
+    )
+    run = mlflow_tracker.start_run(run_name='Incremental Training Pipeline', tags=run_tags)
+    profiler = StepProfiler.from_config('incremental_training_pipeline', get_profiling_config())
+    metric = retraining_config.get('metric', 'f1_score')
+
+    # The current model is scored on the current test split rather than
+    # trusting its recorded metrics, since appended rows change that split.
+    with profiler.step('evaluate_baseline'):
+        baseline = ModelEvaluator(model, model_builder.model_name).evaluate_store(split_store)
+
+    with profiler.step('continue_training', X_new):
+        model = model_builder.continue_training(
+            model,
+            split_store,
+            range(watermark, len(X_train)),
+            retraining_config.get('additional_estimators', 50),
+            matrix_cache=build_matrix_cache(get_training_config())
+        )
+
+    with profiler.step('evaluate'):
+        results = ModelEvaluator(model, model_builder.model_name).evaluate_store(split_store)
+
+    metric_drop = baseline[metric] - results[metric]
+    accepted = metric_drop <= retraining_config.get('max_metric_drop', 0.01)
+    if accepted:
+        with profiler.step('save_model'):
+            tmp_path = f'{model_path}.tmp'
+            ModelTrainer().save_model(model, tmp_path)
+            os.replace(tmp_path, model_path)
+        record_training_state(model_path, model_builder.model_name, len(X_train), results, 'incremental')
+        logger.info(f"Accepted warm-started model: {metric} {baseline[metric]:.4f} -> {results[metric]:.4f}")
+    else:
+        logger.warning(
+            f"Rejected warm-started model: {metric} dropped from {baseline[metric]:.4f} to {results[metric]:.4f}; "
+            f"keeping {model_path}"
+        )
+
+    mlflow_tracker.log_retraining_guard(baseline, results, accepted, len(X_new))
+    if accepted:
+        mlflow_tracker.log_training_metrics(model, results, model_builder.model_params)
+    profiler.report(mlflow_tracker)
+    mlflow_tracker.end_run()
+    return accepted
+
+
 if __name__ == "__main__":
-    training_pipeline(model_params=get_model_config()['model_params'])
+    from cli import main
+    main(['train'])
            
         
 
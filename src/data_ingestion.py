@@ -1,23 +1,163 @@
 import os
+import glob
+import json
+import hashlib
+import logging
+import threading
 import pandas as pd
 from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Iterable, List, Optional
+from pandas.api.types import union_categoricals
 
 class DataIngester(ABC):
     @abstractmethod
     def ingest_data(self, file_path_or_link: str) -> pd.DataFrame:
         pass
     
+    def ingest_data_chunks(self, file_path_or_link: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        yield self.ingest_data(file_path_or_link)
+    
 class DataIngestorCSV(DataIngester):
+    def __init__(self, dtypes: Optional[Dict[str, str]] = None):
+        self.dtypes = dtypes
+        
     def ingest_data(self, file_path_or_link: str) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path_or_link)
+            return pd.read_csv(file_path_or_link, dtype=self.dtypes)
         except Exception as e:
             raise RuntimeError(f"Error ingesting CSV data: {e}")
         
+    def ingest_data_chunks(self, file_path_or_link: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        try:
+            with pd.read_csv(file_path_or_link, dtype=self.dtypes, chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    yield chunk
+        except Exception as e:
+            raise RuntimeError(f"Error ingesting CSV data in chunks: {e}")
+        
 class DataIngestorExcel(DataIngester):
     def ingest_data(self, file_path_or_link: str) -> pd.DataFrame:
         try:
             return pd.read_excel(file_path_or_link)
         except Exception as e:
             raise RuntimeError(f"Error ingesting Excel data: {e}")
-        
\ No newline at end of file
+        
+        
+class ParquetConversionCache:
+    def __init__(self, cache_dir: str, dtypes: Optional[Dict[str, str]] = None, chunk_size: int = 100000):
+        self.cache_dir = cache_dir
+        self.dtypes = dtypes
+        self.chunk_size = chunk_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+        
+    def _source_prefix(self, csv_path: str) -> str:
+        abs_path = os.path.abspath(csv_path)
+        stem = os.path.splitext(os.path.basename(abs_path))[0]
+        path_hash = hashlib.sha1(abs_path.encode()).hexdigest()[:8]
+        return os.path.join(self.cache_dir, f"{stem}-{path_hash}")
+        
+    def cache_path(self, csv_path: str) -> str:
+        stat = os.stat(csv_path)
+        # The pinned dtypes decide the Parquet schema, so changing them must
+        # not hit a copy converted under the old mapping.
+        dtypes = json.dumps(self.dtypes or {}, sort_keys=True)
+        key = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}:{dtypes}".encode()).hexdigest()[:16]
+        return f"{self._source_prefix(csv_path)}-{key}.parquet"
+    
+    def get_or_convert(self, csv_path: str) -> str:
+        parquet_path = self.cache_path(csv_path)
+        if os.path.exists(parquet_path):
+            logging.info(f"Parquet cache hit for {csv_path}: {parquet_path}")
+            return parquet_path
+        
+        for stale_path in glob.glob(f"{self._source_prefix(csv_path)}-*.parquet"):
+            # A concurrent writer may have just published the current copy
+            if stale_path != parquet_path:
+                try:
+                    os.remove(stale_path)
+                except FileNotFoundError:
+                    pass
+        
+        self._convert(csv_path, parquet_path)
+        logging.info(f"Converted {csv_path} to columnar cache {parquet_path}")
+        return parquet_path
+    
+    def _convert(self, csv_path: str, parquet_path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        # Write to a per-writer temp file first so an interrupted or concurrent
+        # conversion never leaves a truncated file behind under a valid cache key.
+        tmp_path = f"{parquet_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        writer = None
+        try:
+            try:
+                chunks = DataIngestorCSV(dtypes=self.dtypes).ingest_data_chunks(csv_path, self.chunk_size)
+                for chunk in chunks:
+                    if writer is None:
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        writer = pq.ParquetWriter(tmp_path, table.schema)
+                    else:
+                        table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                    writer.write_table(table)
+                if writer is None:
+                    # A header-only CSV yields no chunks; keep the pinned schema anyway
+                    empty = pd.read_csv(csv_path, dtype=self.dtypes, nrows=0)
+                    pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), tmp_path)
+            finally:
+                if writer is not None:
+                    writer.close()
+            os.replace(tmp_path, parquet_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        
+class DataIngestorParquet(DataIngester):
+    def __init__(self, columns: Optional[List[str]] = None, cache: Optional[ParquetConversionCache] = None):
+        self.columns = columns
+        self.cache = cache
+        
+    def _resolve_path(self, file_path_or_link: str) -> str:
+        if file_path_or_link.endswith('.csv'):
+            if self.cache is None:
+                raise RuntimeError(f"Cannot read {file_path_or_link} as Parquet without a ParquetConversionCache")
+            return self.cache.get_or_convert(file_path_or_link)
+        return file_path_or_link
+        
+    def ingest_data(self, file_path_or_link: str) -> pd.DataFrame:
+        try:
+            return pd.read_parquet(self._resolve_path(file_path_or_link), columns=self.columns)
+        except Exception as e:
+            raise RuntimeError(f"Error ingesting Parquet data: {e}")
+        
+    def ingest_data_chunks(self, file_path_or_link: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        try:
+            import pyarrow.parquet as pq
+            
+            parquet_file = pq.ParquetFile(self._resolve_path(file_path_or_link))
+            start = 0
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=self.columns):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+        except Exception as e:
+            raise RuntimeError(f"Error ingesting Parquet data in chunks: {e}")
+        
+        
+def concat_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    
+    # Each chunk infers its own categories, so union them before concatenating
+    # to keep categorical columns categorical instead of falling back to object.
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    
+    return pd.concat(chunks)
@@ -1,23 +1,46 @@
 import logging
+import numpy as np
 import pandas as pd
 from enum import Enum
 from abc import ABC, abstractmethod
-from typing import Tuple
-from sklearn.model_selection import train_test_split
-from pyspark.sql import DataFrame as SparkDataFrame
-from pyspark.sql import functions as F
-from spark_session import get_or_create_spark_session
+from typing import Dict, List, Optional, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+Indices = np.ndarray
+
+
+def take_rows(data, indices: Indices):
+    # Sorted contiguous index runs become slices, so NumPy arrays and memmaps
+    # come back as views; anything else falls back to a single gather. The
+    # shuffled train/test split and K-fold indices are never contiguous, so
+    # those always copy their rows (see benchmarks/bench_split.py). Code that
+    # must avoid the copy passes the index arrays down instead, as
+    # BaseModelBuilder.fit_store does with fold rows.
+    indices = np.asarray(indices, dtype=np.intp)
+    if len(indices) and indices[-1] - indices[0] + 1 == len(indices) and np.all(np.diff(indices) == 1):
+        rows = slice(int(indices[0]), int(indices[-1]) + 1)
+    else:
+        rows = indices
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.iloc[rows]
+    return data[rows]
+
+
 class DataSplitStrategy(ABC):
     @abstractmethod
+    def split_indices(self, y) -> Tuple[Indices, Indices]:
+        pass
+
     def split_data(self, df: pd.DataFrame, target_column: str) -> Tuple[pd.DataFrame,
                    pd.DataFrame, pd.Series, pd.Series]:
-        pass
+        Y = df[target_column]
+        X = df.drop(columns=[target_column])
+        train_idx, test_idx = self.split_indices(Y.to_numpy())
+        return take_rows(X, train_idx), take_rows(X, test_idx), take_rows(Y, train_idx), take_rows(Y, test_idx)
     
     
 class SplitType(str, Enum):
@@ -25,16 +48,67 @@ class SplitType(str, Enum):
     STRATIFIED = "stratified"
     
 class SimpleDataSplitStrategy(DataSplitStrategy):
-    def __init__(self, test_size):
+    def __init__(self, test_size, random_state=42):
         self.test_size = test_size
-        
-    def split_data(self, df, target_column):
-        Y = df[target_column]
-        X = df.drop(columns=[target_column])
-        
-        X_train, X_test, Y_train, Y_test = train_test_split(
-            X, Y, test_size = self.test_size, random_state=42
+        self.random_state = random_state
+
+    def split_indices(self, y):
+        from sklearn.model_selection import train_test_split
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)), test_size = self.test_size, random_state=self.random_state
         )
         logging.info(f"Performed simple data split with test size = {self.test_size}")
-        
-        return X_train, X_test, Y_train, Y_test
+        return train_idx, test_idx
+
+
+class StratifiedDataSplitStrategy(DataSplitStrategy):
+    def __init__(self, test_size, random_state=42):
+        self.test_size = test_size
+        self.random_state = random_state
+
+    def split_indices(self, y):
+        from sklearn.model_selection import train_test_split
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)), test_size = self.test_size, random_state=self.random_state, stratify=y
+        )
+        logging.info(f"Performed stratified data split with test size = {self.test_size}")
+        return train_idx, test_idx
+
+
+class KFoldSplitter:
+    def __init__(self, n_splits=5, stratified=True, shuffle=True, random_state=42):
+        self.n_splits = n_splits
+        self.stratified = stratified
+        self.shuffle = shuffle
+        self.random_state = random_state if shuffle else None
+
+    def split_indices(self, y) -> List[Tuple[Indices, Indices]]:
+        from sklearn.model_selection import KFold, StratifiedKFold
+        splitter_class = StratifiedKFold if self.stratified else KFold
+        splitter = splitter_class(n_splits=self.n_splits, shuffle=self.shuffle, random_state=self.random_state)
+        y = np.asarray(y)
+        folds = [
+            (train_idx.astype(np.intp), val_idx.astype(np.intp))
+            for train_idx, val_idx in splitter.split(np.zeros((len(y), 1)), y)
+        ]
+        logging.info(f"Generated {self.n_splits} {'stratified ' if self.stratified else ''}folds over {len(y)} rows")
+        return folds
+
+
+def create_split_strategy(split_config: Dict) -> DataSplitStrategy:
+    split_type = SplitType(split_config.get('split_type', SplitType.SIMPLE.value))
+    test_size = split_config.get('test_size', 0.2)
+    random_state = split_config.get('random_state', 42)
+    if split_type == SplitType.STRATIFIED:
+        return StratifiedDataSplitStrategy(test_size, random_state)
+    return SimpleDataSplitStrategy(test_size, random_state)
+
+
+def create_fold_splitter(split_config: Dict, stratified: Optional[bool] = None) -> KFoldSplitter:
+    if stratified is None:
+        stratified = split_config.get('split_type') == SplitType.STRATIFIED.value
+    return KFoldSplitter(
+        n_splits=split_config.get('n_splits', 5),
+        stratified=stratified,
+        random_state=split_config.get('random_state', 42)
+    )
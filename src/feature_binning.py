@@ -1,39 +1,102 @@
+import bisect
 import logging
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List
 
 logging.basicConfig(
     level=logging.INFO,
     format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+INVALID_LABEL = 'Invalid'
+SPECIAL_VALUES = {850: 'Excellent'}
+
+
+def assign_bin(value, bin_definitions: Dict[str, List[float]]) -> str:
+    if value in SPECIAL_VALUES:
+        return SPECIAL_VALUES[value]
+
+    for label, bin_range in bin_definitions.items():
+        if len(bin_range) == 2:
+            if bin_range[0] <= value <= bin_range[1]:
+                return label
+        elif len(bin_range) == 1:
+            if value >= bin_range[0]:
+                return label
+
+    return INVALID_LABEL
+
+
+class CompiledBins:
+    # Every rule in assign_bin compares the value against a bin edge, so the
+    # label is constant on each edge and on each open interval between edges.
+    # Evaluating assign_bin once per edge and once per interval gives a lookup
+    # table that reproduces its first-match semantics exactly.
+    def __init__(self, bin_definitions: Dict[str, List[float]]):
+        self.bin_definitions = bin_definitions
+        edges = sorted({float(edge) for bin_range in bin_definitions.values() for edge in bin_range} | set(SPECIAL_VALUES))
+        self.edges = np.array(edges, dtype=np.float64)
+        self._edge_list = edges
+
+        representatives = (
+            [edges[0] - 1]
+            + [(lo + hi) / 2 for lo, hi in zip(edges[:-1], edges[1:])]
+            + [edges[-1] + 1]
+        )
+        point_labels = [assign_bin(edge, bin_definitions) for edge in edges]
+        interval_labels = [assign_bin(value, bin_definitions) for value in representatives]
+
+        self.labels = np.array(list(dict.fromkeys(list(bin_definitions) + point_labels + interval_labels + [INVALID_LABEL])), dtype=object)
+        label_codes = {label: code for code, label in enumerate(self.labels)}
+        self.point_codes = np.array([label_codes[label] for label in point_labels], dtype=np.intp)
+        self.interval_codes = np.array([label_codes[label] for label in interval_labels], dtype=np.intp)
+        self.invalid_code = label_codes[INVALID_LABEL]
+        self.point_labels = point_labels
+        self.interval_labels = interval_labels
+
+    def transform_codes(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        positions = np.searchsorted(self.edges, values, side='left')
+        clipped = np.minimum(positions, len(self.edges) - 1)
+        on_edge = self.edges[clipped] == values
+
+        codes = np.where(on_edge, self.point_codes[clipped], self.interval_codes[positions])
+        codes[np.isnan(values)] = self.invalid_code
+        return codes
+
+    def transform(self, values) -> np.ndarray:
+        return self.labels[self.transform_codes(values)]
+
+    def bin_value(self, value) -> str:
+        if value is None or value != value:
+            return INVALID_LABEL
+        position = bisect.bisect_left(self._edge_list, value)
+        if position < len(self._edge_list) and self._edge_list[position] == value:
+            return self.point_labels[position]
+        return self.interval_labels[position]
+
+
 class FeatureBinningStrategy(ABC):
     @abstractmethod
     def bin_feature(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
         pass
 
+    def bin_feature_chunks(self, chunks: Iterable[pd.DataFrame], column: str) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.bin_feature(chunk, column)
+
 class CustomBinningStrategy(FeatureBinningStrategy):
     def __init__(self, bin_definitions):
         self.bin_definitions = bin_definitions
-    
+        self.compiled_bins = CompiledBins(bin_definitions)
+
     def bin_feature(self, df, col):
-        def assign_bin(value):
-            if value == 850:
-                return 'Excellent'
-
-            for label, bin_range in self.bin_definitions.items():
-                if len(bin_range) == 2:
-                    if bin_range[0] <= value <= bin_range[1]:
-                        return label
-                elif len(bin_range) == 1:
-                    if value >= bin_range[0]:
-                        return label      
-            if value > 850:
-                return 'Invalid'
-            
-            return 'Invalid'
-
-        df[f'{col}_binned'] = df[col].apply(assign_bin)
+        df[f'{col}_binned'] = self.compiled_bins.transform(df[col].to_numpy())
         logging.info(f"Binned feature '{col}' using custom bin definitions.")
-        
+
         return df
+
+    def bin_value(self, value):
+        return self.compiled_bins.bin_value(value)
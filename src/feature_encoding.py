@@ -1,9 +1,10 @@
 import logging
+import numpy as np
 import pandas as pd
 import os
 import json
 from enum import Enum
-from typing import List, Dict
+from typing import Any, List, Dict, Iterable, Iterator, Optional
 from abc import ABC, abstractmethod
 
 logging.basicConfig(
@@ -20,23 +21,35 @@ class variableType(Enum):
     NOMINAL = "nominal"
     ORDINAL = "ordinal"
     
+def encode_categories(values, categories: List[Any], codes: Optional[List[Any]] = None, unseen_code = None) -> np.ndarray:
+    # pd.Categorical does the category lookup in vectorised hash-table code;
+    # values outside `categories` (and nulls) come back as -1.
+    positions = pd.Categorical(values, categories=categories).codes
+    mapped = np.asarray(codes if codes is not None else range(len(categories)))[np.maximum(positions, 0)]
+    unseen = positions == -1
+    if not unseen.any():
+        return mapped
+    if unseen_code is None:
+        mapped = mapped.astype(np.float64)
+        mapped[unseen] = np.nan
+    else:
+        mapped[unseen] = unseen_code
+    return mapped
+
+
 class NominalEncodingStrategy(FeatureEncodingStrategy):
     def __init__(self, nominal_features):
         self.nominal_features = nominal_features
         self.encoder_dictionary = {}
-        os.makedirs("artifacts/encoders", exist_ok=True)
+        self.categories = {}
         
     def encode(self, df):
         for col in self.nominal_features:
-            unique_values = df[col].unique()
-            encoder_dict = {val: idx for idx, val in enumerate(unique_values)}
-            self.encoder_dictionary[col] = encoder_dict
-            
-            encoder_path = os.path.join('artifacts/encoders', f'{col}_encoder.json')
-            with open(encoder_path, 'w') as file:
-                json.dump(encoder_dict, file)
-                
-            df[col] = df[col].map(encoder_dict)
+            codes, categories = pd.factorize(df[col], sort=False)
+            self.categories[col] = [category.item() if hasattr(category, 'item') else category for category in categories]
+            self.encoder_dictionary[col] = {category: idx for idx, category in enumerate(self.categories[col])}
+            df[col] = np.where(codes == -1, np.nan, codes) if (codes == -1).any() else codes
+            logging.info(f"Encoded nominal feature '{col}' with {len(categories)} categories")
         return df
     
     
@@ -49,4 +62,82 @@ class OrdinalEncodingStrategy(FeatureEncodingStrategy):
             df[col] = df[col].map(mapping)
             logging.info(f"Encoded ordinal feature '{col}' with mapping: {mapping}") 
         return df
-        
\ No newline at end of file
+    
+    def encode_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.encode(chunk)
+        
+
+class EncoderBundle:
+    VERSION = 1
+    
+    def __init__(
+        self,
+        nominal_categories: Optional[Dict[str, List[Any]]] = None,
+        ordinal_mappings: Optional[Dict[str, Dict[str, Any]]] = None,
+        unseen_codes: Optional[Dict[str, Any]] = None
+    ):
+        self.nominal_categories = nominal_categories or {}
+        self.ordinal_mappings = ordinal_mappings or {}
+        self.unseen_codes = unseen_codes or {}
+        self.version = self.VERSION
+        self._lookups = {
+            **{col: {category: idx for idx, category in enumerate(categories)} for col, categories in self.nominal_categories.items()},
+            **{col: dict(mapping) for col, mapping in self.ordinal_mappings.items()}
+        }
+        
+    @classmethod
+    def from_strategies(cls, nominal_encoding: NominalEncodingStrategy, ordinal_encoding: OrdinalEncodingStrategy, unseen_codes=None):
+        return cls(nominal_encoding.categories, ordinal_encoding.ordinal_mappings, unseen_codes)
+    
+    @classmethod
+    def from_legacy_dir(cls, encoders_dir: str, ordinal_mappings: Dict[str, Dict[str, Any]]):
+        nominal_categories = {}
+        for file in sorted(os.listdir(encoders_dir)):
+            if not file.endswith('_encoder.json'):
+                continue
+            with open(os.path.join(encoders_dir, file), 'r') as f:
+                encoder = json.load(f)
+            nominal_categories[file[:-len('_encoder.json')]] = sorted(encoder, key=encoder.get)
+        return cls(nominal_categories, ordinal_mappings)
+    
+    def save(self, filepath: str):
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        artifact = {
+            'version': self.version,
+            'nominal': self.nominal_categories,
+            'ordinal': self.ordinal_mappings,
+            'unseen_codes': self.unseen_codes
+        }
+        with open(filepath, 'w') as file:
+            json.dump(artifact, file, indent=2)
+        logging.info(f"Saved encoder bundle v{self.version} to {filepath}")
+        
+    @classmethod
+    def load(cls, filepath: str):
+        if not os.path.exists(filepath):
+            raise ValueError(f"Encoder bundle {filepath} does not exist")
+        with open(filepath, 'r') as file:
+            artifact = json.load(file)
+        if artifact.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported encoder bundle version {artifact.get('version')} in {filepath}")
+        return cls(artifact['nominal'], artifact['ordinal'], artifact.get('unseen_codes'))
+    
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        for col, categories in self.nominal_categories.items():
+            if col in df.columns:
+                df[col] = encode_categories(df[col], categories, unseen_code=self.unseen_codes.get(col))
+        for col, mapping in self.ordinal_mappings.items():
+            if col in df.columns:
+                df[col] = encode_categories(df[col], list(mapping), list(mapping.values()), self.unseen_codes.get(col))
+        return df
+    
+    def mapping(self, col: str) -> Dict[Any, Any]:
+        return self._lookups.get(col, {})
+    
+    def encode_value(self, col: str, value):
+        code = self._lookups[col].get(value)
+        if code is None:
+            unseen_code = self.unseen_codes.get(col)
+            return np.nan if unseen_code is None else unseen_code
+        return code
@@ -1,10 +1,11 @@
 import logging
+import numpy as np
 import pandas as pd
 import os
+import json
 from enum import Enum
-from typing import List
+from typing import Dict, Iterable, List
 from abc import ABC, abstractmethod
-from sklearn.preprocessing import MinMaxScaler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,26 +13,131 @@ logging.basicConfig(
 )
 
 class FeatureScalingStrategy(ABC):
-    @abstractmethod
-    def scale(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
-        pass
-    
-class ScalingType(Enum):
-    MIN_MAX = "min_max"
-    STANDARD = "standard"
-    
-class MinMaxScalingStrategy(FeatureScalingStrategy):
     def __init__(self):
-        self.scaler = MinMaxScaler()
+        self.scaler = self.build_scaler()
+        self.columns = None
         self.is_fitted = False
-        
-    def scale(self, df, columns):
-        df[columns] = self.scaler.fit_transform(df[columns])
+
+    @abstractmethod
+    def build_scaler(self):
+        pass
+
+    @abstractmethod
+    def linear_parameters(self):
+        # (scale, offset) arrays such that scaled = value * scale + offset
+        pass
+
+    def partial_fit(self, df: pd.DataFrame, columns: List[str]):
+        if self.columns is not None and list(columns) != self.columns:
+            raise ValueError(f"Scaler was fitted on {self.columns}, got {list(columns)}")
+        self.columns = list(columns)
+        self.scaler.partial_fit(df[self.columns])
         self.is_fitted = True
-        logging.info(f"Applied Min-Max Scaling on columns: {columns}")
+        return self
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame], columns: List[str]):
+        for chunk in chunks:
+            self.partial_fit(chunk, columns)
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if not self.is_fitted:
+            raise ValueError("Scaler has not been fitted yet.")
+        scale, offset = self.linear_parameters()
+        values = df[self.columns].to_numpy(dtype=np.float64, copy=True)
+        values *= scale
+        values += offset
+        df[self.columns] = values
         return df
-    
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]):
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def scale(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        self.scaler = self.build_scaler()
+        self.columns = None
+        self.partial_fit(df, columns)
+        df = self.transform(df)
+        logging.info(f"Applied {self.scaling_type.value} scaling on columns: {columns}")
+        return df
+
     def get_scaler(self):
         if not self.is_fitted:
             raise ValueError("Scaler has not been fitted yet.")
-        return self.scaler
\ No newline at end of file
+        return self.scaler
+
+    def parameters(self) -> Dict[str, Dict[str, float]]:
+        scale, offset = self.linear_parameters()
+        return {col: {'scale': float(s), 'offset': float(o)} for col, s, o in zip(self.columns, scale, offset)}
+
+    def save(self, filepath):
+        if not self.is_fitted:
+            raise ValueError("Scaler has not been fitted yet.")
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        with open(filepath, 'w') as file:
+            json.dump({'scaling_type': self.scaling_type.value, 'columns': self.parameters()}, file, indent=2)
+        logging.info(f"Saved {self.scaling_type.value} scaler parameters to {filepath}")
+
+
+class ScalingType(Enum):
+    MIN_MAX = "min_max"
+    STANDARD = "standard"
+
+class MinMaxScalingStrategy(FeatureScalingStrategy):
+    scaling_type = ScalingType.MIN_MAX
+
+    def build_scaler(self):
+        from sklearn.preprocessing import MinMaxScaler
+        return MinMaxScaler()
+
+    def linear_parameters(self):
+        return self.scaler.scale_, self.scaler.min_
+
+
+class StandardScalingStrategy(FeatureScalingStrategy):
+    scaling_type = ScalingType.STANDARD
+
+    def build_scaler(self):
+        from sklearn.preprocessing import StandardScaler
+        return StandardScaler()
+
+    def linear_parameters(self):
+        return 1.0 / self.scaler.scale_, -self.scaler.mean_ / self.scaler.scale_
+
+
+class FittedScaler:
+    # Scaling parameters loaded from the saved artifact; applies the same
+    # value * scale + offset transform without needing the sklearn scaler.
+    def __init__(self, scaling_type: ScalingType, parameters: Dict[str, Dict[str, float]]):
+        self.scaling_type = scaling_type
+        self.columns = list(parameters)
+        self.scale_by_column = {col: params['scale'] for col, params in parameters.items()}
+        self.offset_by_column = {col: params['offset'] for col, params in parameters.items()}
+        self.scale = np.array([self.scale_by_column[col] for col in self.columns])
+        self.offset = np.array([self.offset_by_column[col] for col in self.columns])
+
+    @classmethod
+    def load(cls, filepath):
+        if not os.path.exists(filepath):
+            raise ValueError(f"Scaler parameters file {filepath} does not exist")
+        with open(filepath, 'r') as file:
+            artifact = json.load(file)
+        return cls(ScalingType(artifact['scaling_type']), artifact['columns'])
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        values = df[self.columns].to_numpy(dtype=np.float64, copy=True)
+        values *= self.scale
+        values += self.offset
+        df[self.columns] = values
+        return df
+
+    def transform_value(self, col: str, value: float) -> float:
+        return value * self.scale_by_column[col] + self.offset_by_column[col]
+
+
+def create_scaling_strategy(scaling_config: Dict) -> FeatureScalingStrategy:
+    scaling_type = scaling_config.get('scaling_type', 'min_max').replace('minmax', 'min_max')
+    if ScalingType(scaling_type) == ScalingType.STANDARD:
+        return StandardScalingStrategy()
+    return MinMaxScalingStrategy()
@@ -0,0 +1,337 @@
+import io
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+class SplitArtifactStore:
+    MANIFEST_FILE = 'manifest.json'
+    FORMAT_VERSION = 1
+    SPLITS = ('train', 'test')
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._manifest = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.store_dir, self.MANIFEST_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            if not self.exists():
+                raise FileNotFoundError(f"No split artifact manifest found at {self.manifest_path}")
+            with open(self.manifest_path, 'r') as file:
+                self._manifest = json.load(file)
+        return self._manifest
+
+    @property
+    def fingerprint(self) -> str:
+        return self.manifest['fingerprint']
+
+    @staticmethod
+    def _feature_array(X: pd.DataFrame) -> np.ndarray:
+        array_dtype = np.result_type(*[X[col].to_numpy().dtype for col in X.columns])
+        if array_dtype == np.dtype(object):
+            array_dtype = np.dtype(np.float64)
+        return np.ascontiguousarray(X.to_numpy(dtype=array_dtype))
+
+    def save(
+        self,
+        X_train: pd.DataFrame,
+        X_test: pd.DataFrame,
+        y_train: pd.Series,
+        y_test: pd.Series,
+        sources: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        if list(X_train.columns) != list(X_test.columns):
+            raise ValueError("X_train and X_test must have the same columns in the same order")
+
+        y_train = y_train.squeeze(axis=1) if isinstance(y_train, pd.DataFrame) else y_train
+        y_test = y_test.squeeze(axis=1) if isinstance(y_test, pd.DataFrame) else y_test
+
+        arrays = {
+            'X_train': self._feature_array(X_train),
+            'X_test': self._feature_array(X_test),
+            'y_train': np.ascontiguousarray(y_train.to_numpy()),
+            'y_test': np.ascontiguousarray(y_test.to_numpy()),
+        }
+
+        self._remove_manifest()
+        hasher = hashlib.sha1()
+        splits = {}
+        for name, array in arrays.items():
+            np.save(os.path.join(self.store_dir, f'{name}.npy'), array)
+            self._hash_header(hasher, name, array.dtype, array.shape)
+            hasher.update(memoryview(array))
+            splits[name] = self._split_entry(name, array.dtype, array.shape)
+
+        return self._write_manifest({
+            'feature_columns': list(X_train.columns),
+            'feature_dtypes': {col: str(dtype) for col, dtype in X_train.dtypes.items()},
+            'target_column': y_train.name,
+            'target_dtype': str(y_train.dtype),
+            'splits': splits,
+            'sources': {name: self.source_fingerprint(path) for name, path in (sources or {}).items()},
+            'fingerprint': hasher.hexdigest()
+        })
+
+    def save_parquet(
+        self,
+        train_path: str,
+        test_path: str,
+        target_column: str,
+        sources: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        # Splits written by Spark are streamed one record batch at a time into
+        # preallocated .npy files, so the driver never holds a whole split.
+        # Features and target are read in separate column-projected passes.
+        import pyarrow.dataset as ds
+        from numpy.lib.format import open_memmap
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        datasets = {'train': ds.dataset(train_path, format='parquet'), 'test': ds.dataset(test_path, format='parquet')}
+        schema = datasets['train'].schema
+        feature_columns = [name for name in schema.names if name != target_column]
+        if [name for name in datasets['test'].schema.names if name != target_column] != feature_columns:
+            raise ValueError("Train and test Parquet splits must have the same columns in the same order")
+        column_dtypes = {field.name: np.dtype(field.type.to_pandas_dtype()) for field in schema}
+
+        feature_dtype = np.result_type(*[column_dtypes[col] for col in feature_columns])
+        if feature_dtype == np.dtype(object):
+            feature_dtype = np.dtype(np.float64)
+        arrays = {
+            f'X_{split}': (datasets[split], feature_columns, feature_dtype) for split in self.SPLITS
+        }
+        arrays.update({
+            f'y_{split}': (datasets[split], [target_column], column_dtypes[target_column]) for split in self.SPLITS
+        })
+
+        self._remove_manifest()
+        hasher = hashlib.sha1()
+        splits = {}
+        for name, (dataset, columns, dtype) in arrays.items():
+            rows = dataset.count_rows()
+            shape = (rows, len(columns)) if name.startswith('X_') else (rows,)
+            path = os.path.join(self.store_dir, f'{name}.npy')
+            self._hash_header(hasher, name, dtype, shape)
+            if rows == 0:
+                np.save(path, np.empty(shape, dtype=dtype))
+            else:
+                array = open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+                start = 0
+                for batch in dataset.to_batches(columns=columns):
+                    block = np.ascontiguousarray(batch.to_pandas().to_numpy(dtype=dtype).reshape((-1,) + shape[1:]))
+                    array[start:start + len(block)] = block
+                    hasher.update(memoryview(block))
+                    start += len(block)
+                array.flush()
+                del array
+            splits[name] = self._split_entry(name, dtype, shape)
+
+        return self._write_manifest({
+            'feature_columns': feature_columns,
+            'feature_dtypes': {col: str(column_dtypes[col]) for col in feature_columns},
+            'target_column': target_column,
+            'target_dtype': str(column_dtypes[target_column]),
+            'splits': splits,
+            'sources': {name: self.source_fingerprint(path) for name, path in (sources or {}).items()},
+            'fingerprint': hasher.hexdigest()
+        })
+
+    def _remove_manifest(self):
+        if self.exists():
+            os.remove(self.manifest_path)
+        self._manifest = None
+
+    @staticmethod
+    def _hash_header(hasher, name: str, dtype: np.dtype, shape: Tuple[int, ...]):
+        hasher.update(name.encode())
+        hasher.update(str(np.dtype(dtype)).encode())
+        hasher.update(str(tuple(int(dim) for dim in shape)).encode())
+
+    @staticmethod
+    def _split_entry(name: str, dtype: np.dtype, shape: Tuple[int, ...]) -> Dict[str, Any]:
+        return {
+            'file': f'{name}.npy',
+            'rows': int(shape[0]),
+            'shape': [int(dim) for dim in shape],
+            'dtype': str(np.dtype(dtype))
+        }
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        # The old manifest is removed before and the new one written after the
+        # arrays, so readers never mistake a half-written store for a valid one.
+        manifest = {'version': self.FORMAT_VERSION, **manifest}
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+        self._manifest = manifest
+        logging.info(f"Saved split artifacts to {self.store_dir} (fingerprint {manifest['fingerprint'][:12]})")
+        return manifest
+
+    def append(
+        self,
+        X_train: pd.DataFrame,
+        X_test: pd.DataFrame,
+        y_train: pd.Series,
+        y_test: pd.Series,
+        sources: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        # New rows are written after the existing data in each .npy file and
+        # only the header's row count is rewritten, so an append costs the new
+        # rows rather than the history. The fingerprint chains the previous
+        # one with the appended blocks instead of rehashing every array.
+        manifest = self.manifest
+        columns = manifest['feature_columns']
+        splits = manifest['splits']
+        y_train = y_train.squeeze(axis=1) if isinstance(y_train, pd.DataFrame) else y_train
+        y_test = y_test.squeeze(axis=1) if isinstance(y_test, pd.DataFrame) else y_test
+        blocks = {
+            'X_train': np.ascontiguousarray(X_train[columns].to_numpy(dtype=splits['X_train']['dtype'])),
+            'X_test': np.ascontiguousarray(X_test[columns].to_numpy(dtype=splits['X_test']['dtype'])),
+            'y_train': np.ascontiguousarray(y_train.to_numpy(dtype=splits['y_train']['dtype'])),
+            'y_test': np.ascontiguousarray(y_test.to_numpy(dtype=splits['y_test']['dtype'])),
+        }
+
+        logging.info(f"Appending {len(X_train)} train and {len(X_test)} test rows to {self.store_dir}")
+        self._remove_manifest()
+        hasher = hashlib.sha1(manifest['fingerprint'].encode())
+        appended = {}
+        for name, block in blocks.items():
+            shape = self._extend_npy(os.path.join(self.store_dir, splits[name]['file']), block)
+            self._hash_header(hasher, name, block.dtype, shape)
+            hasher.update(memoryview(block))
+            appended[name] = self._split_entry(name, block.dtype, shape)
+
+        recorded_sources = dict(manifest.get('sources', {}))
+        recorded_sources.update({name: self.source_fingerprint(path) for name, path in (sources or {}).items()})
+        return self._write_manifest({
+            **{key: value for key, value in manifest.items() if key not in ('version', 'splits', 'sources', 'fingerprint')},
+            'splits': appended,
+            'sources': recorded_sources,
+            'fingerprint': hasher.hexdigest()
+        })
+
+    @staticmethod
+    def _extend_npy(path: str, block: np.ndarray) -> Tuple[int, ...]:
+        fmt = np.lib.format
+        with open(path, 'r+b') as file:
+            version = fmt.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = fmt.read_array_header_1_0(file)
+                write_header = fmt.write_array_header_1_0
+            elif version == (2, 0):
+                shape, fortran_order, dtype = fmt.read_array_header_2_0(file)
+                write_header = fmt.write_array_header_2_0
+            else:
+                raise ValueError(f"Cannot append to {path}: unsupported .npy format version {version}")
+            if fortran_order or dtype != block.dtype or tuple(shape[1:]) != block.shape[1:]:
+                raise ValueError(
+                    f"Cannot append {block.dtype} rows of shape {block.shape[1:]} to {path} "
+                    f"({dtype}, {tuple(shape[1:])}, fortran_order={fortran_order})"
+                )
+            data_offset = file.tell()
+            new_shape = (shape[0] + block.shape[0],) + tuple(shape[1:])
+
+            header = io.BytesIO()
+            write_header(header, {'descr': fmt.dtype_to_descr(dtype), 'fortran_order': False, 'shape': new_shape})
+            header = header.getvalue()
+            if len(header) == data_offset:
+                # Anything past the recorded data is left over from an
+                # interrupted append and is overwritten.
+                file.seek(data_offset + int(np.prod(shape, dtype=np.int64)) * dtype.itemsize)
+                file.truncate()
+                file.write(block.tobytes())
+                file.seek(0)
+                file.write(header)
+                return new_shape
+
+        # Headers written without spare room for a longer row count cannot be
+        # updated in place; the file is rewritten once with the new header.
+        logging.info(f"Rewriting {path} because its header cannot grow in place")
+        np.save(path, np.concatenate([np.load(path), block]))
+        return new_shape
+
+    @staticmethod
+    def source_fingerprint(path: str) -> str:
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def is_current(self, sources: Dict[str, str]) -> bool:
+        # The split CSVs are written alongside the store; if any of them
+        # changed afterwards (or the store predates source tracking) the
+        # arrays no longer describe them.
+        if not self.exists():
+            return False
+        recorded = self.manifest.get('sources', {})
+        for name, path in sources.items():
+            if os.path.exists(path) and recorded.get(name) != self.source_fingerprint(path):
+                logging.info(f"Split store {self.store_dir} is stale: {path} changed after it was written")
+                return False
+        return True
+
+    def load_array(self, name: str, mmap_mode: Optional[str] = 'r') -> np.ndarray:
+        entry = self.manifest['splits'][name]
+        array = np.load(os.path.join(self.store_dir, entry['file']), mmap_mode=mmap_mode)
+        if list(array.shape) != entry['shape']:
+            raise ValueError(f"Split artifact {name} has shape {array.shape}, manifest expects {entry['shape']}")
+        return array
+
+    def load_split(self, split: str, mmap_mode: Optional[str] = 'r') -> Tuple[pd.DataFrame, pd.Series]:
+        if split not in self.SPLITS:
+            raise ValueError(f"Unknown split '{split}', expected one of {self.SPLITS}")
+
+        X = pd.DataFrame(
+            self.load_array(f'X_{split}', mmap_mode),
+            columns=self.manifest['feature_columns'],
+            copy=False
+        )
+        y = pd.Series(self.load_array(f'y_{split}', mmap_mode), name=self.manifest['target_column'], copy=False)
+        return self._restore_dtypes(X), self._restore_target_dtype(y)
+
+    @staticmethod
+    def _numpy_dtype(name: str) -> Optional[np.dtype]:
+        try:
+            return np.dtype(name)
+        except TypeError:
+            # Extension dtypes such as category stay in the array dtype
+            return None
+
+    def _restore_dtypes(self, X: pd.DataFrame) -> pd.DataFrame:
+        # All features share one array dtype on disk. Only the columns whose
+        # saved dtype differs are cast back, so a homogeneous frame stays a
+        # zero-copy view of the memmap.
+        for col, name in self.manifest.get('feature_dtypes', {}).items():
+            dtype = self._numpy_dtype(name)
+            if dtype is not None and col in X.columns and X[col].dtype != dtype:
+                X[col] = X[col].to_numpy().astype(dtype)
+        return X
+
+    def _restore_target_dtype(self, y: pd.Series) -> pd.Series:
+        dtype = self._numpy_dtype(self.manifest.get('target_dtype', str(y.dtype)))
+        if dtype is not None and y.dtype != dtype:
+            return y.astype(dtype)
+        return y
+
+    def load(self, mmap_mode: Optional[str] = 'r') -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+        X_train, y_train = self.load_split('train', mmap_mode)
+        X_test, y_test = self.load_split('test', mmap_mode)
+        logging.info(f"Loaded split artifacts from {self.store_dir} with mmap_mode={mmap_mode}")
+        return X_train, X_test, y_train, y_test
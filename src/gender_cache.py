@@ -0,0 +1,140 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+class GenderCache:
+    def __init__(
+        self,
+        db_path: str = 'artifacts/cache/gender_cache.sqlite',
+        max_entries: int = 100000,
+        ttl_days: Optional[float] = 180,
+        use_firstname_fallback: bool = True
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.use_firstname_fallback = use_firstname_fallback
+        self.stats = Counter(exact_hits=0, firstname_hits=0, misses=0, evictions=0)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS name_gender (
+                firstname TEXT NOT NULL,
+                lastname TEXT NOT NULL,
+                gender TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (firstname, lastname)
+            );
+            CREATE INDEX IF NOT EXISTS idx_name_gender_firstname ON name_gender (firstname);
+            CREATE INDEX IF NOT EXISTS idx_name_gender_last_access ON name_gender (last_access);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(name) -> str:
+        if not isinstance(name, str):
+            return ''
+        return ' '.join(name.split()).lower()
+
+    def _key(self, firstname, lastname) -> Tuple[str, str]:
+        return self.normalize(firstname), self.normalize(lastname)
+
+    def _min_created_at(self, now: float) -> float:
+        return now - self.ttl_seconds if self.ttl_seconds else float('-inf')
+
+    def get_many(self, names: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        now = time.time()
+        min_created_at = self._min_created_at(now)
+        found = {}
+        hit_keys = set()
+
+        with self._lock:
+            for name in names:
+                firstname, lastname = self._key(*name)
+                row = self._conn.execute(
+                    "SELECT gender FROM name_gender WHERE firstname = ? AND lastname = ? AND created_at >= ?",
+                    (firstname, lastname, min_created_at)
+                ).fetchone()
+                if row is not None:
+                    found[name] = row[0]
+                    hit_keys.add((firstname, lastname))
+                    self.stats['exact_hits'] += 1
+                    continue
+
+                if self.use_firstname_fallback and firstname:
+                    rows = self._conn.execute(
+                        "SELECT gender, COUNT(*) FROM name_gender WHERE firstname = ? AND created_at >= ? GROUP BY gender ORDER BY COUNT(*) DESC",
+                        (firstname, min_created_at)
+                    ).fetchall()
+                    # Only trust the first name on its own when every cached
+                    # surname combination agrees on the gender.
+                    if len(rows) == 1:
+                        found[name] = rows[0][0]
+                        self.stats['firstname_hits'] += 1
+                        continue
+
+                self.stats['misses'] += 1
+
+            if hit_keys:
+                self._conn.executemany(
+                    "UPDATE name_gender SET last_access = ? WHERE firstname = ? AND lastname = ?",
+                    [(now, firstname, lastname) for firstname, lastname in hit_keys]
+                )
+                self._conn.commit()
+
+        return found
+
+    def put_many(self, predictions: Dict[Tuple[str, str], str]):
+        if not predictions:
+            return
+        now = time.time()
+        rows = [(*self._key(*name), gender, now, now) for name, gender in predictions.items()]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO name_gender (firstname, lastname, gender, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM name_gender WHERE created_at < ?",
+                (self._min_created_at(time.time()),)
+            ).rowcount
+
+            overflow = self._conn.execute("SELECT COUNT(*) FROM name_gender").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM name_gender WHERE rowid IN (SELECT rowid FROM name_gender ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                ).rowcount
+            self._conn.commit()
+            # Counted under the same lock as the hit and miss counters
+            self.stats['evictions'] += removed
+
+        if removed:
+            logging.info(f"Evicted {removed} entries from gender cache {self.db_path}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM name_gender").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -1,24 +1,29 @@
-import groq
+import os
+import json
+import time
+import random
 import logging
 import pandas as pd
 from enum import Enum
-from typing import Optional
-from dotenv import load_dotenv
-from prompt_toolkit import prompt
-from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from abc import ABC, abstractmethod
+from gender_cache import GenderCache
 
 logging.basicConfig(
     level = logging.INFO, 
     format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
 )
 
-load_dotenv()
-
 class MissingValueHandlingStrategy(ABC):
     @abstractmethod
     def handle_missing_values(self, df:pd.DataFrame) -> pd.DataFrame:
         pass
+    
+    def handle_missing_values_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.handle_missing_values(chunk)
 
 
 class DropMissingValuesStrategy(MissingValueHandlingStrategy):
@@ -37,56 +42,301 @@ class Gender(str, Enum):
     FEMALE = 'Female'
     
     
-class GenderPrediction(BaseModel):
-    firstname: str
-    lastname: str
-    predicted_gender: Gender
+@lru_cache(maxsize=None)
+def gender_prediction_model():
+    # pydantic only validates LLM responses, so it is imported on the first
+    # remote prediction rather than with this module.
+    from pydantic import BaseModel
+    
+    class GenderPrediction(BaseModel):
+        firstname: str
+        lastname: str
+        predicted_gender: Gender
+        
+    return GenderPrediction
     
 
-class GenderImputer:
-    def __init__(self):
+class GenderPredictionClient(ABC):
+    @abstractmethod
+    def complete(self, prompt: str) -> str:
+        pass
+    
+    
+class GroqGenderClient(GenderPredictionClient):
+    def __init__(self, model: str = "llama-3.3-70b-versatile"):
+        # groq and dotenv are only needed when the LLM path is used, so they
+        # are imported here rather than on every import of this module.
+        import groq
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        self.model = model
         self.groq_client = groq.Groq()
-    def predict_gender(
+        
+    def complete(self, prompt: str) -> str:
+        response = self.groq_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+    
+
+class GenderImputer:
+    def __init__(
         self,
-        firstname: str,
-        lastname: str
+        client: Optional[GenderPredictionClient] = None,
+        batch_size: int = 50,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        model: str = "llama-3.3-70b-versatile",
+        cache: Optional[GenderCache] = None
     ):
-        prompt = f"""
-                    What is the most probable gender(Male/Female) for a person
-                    with the first name '{firstname}' and last name '{lastname}'?  
+        self._client = client
+        self._client_error: Optional[Exception] = None
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        
+    def _ensure_client(self) -> Optional[GenderPredictionClient]:
+        # Built on the first remote batch, so runs served entirely by the
+        # cache or a local model never need groq or an API key. Without them
+        # the names are left missing for the mode fill.
+        if self._client is None and self._client_error is None:
+            try:
+                self._client = GroqGenderClient(model=self.model)
+            except Exception as e:
+                self._client_error = e
+                logging.warning(f"Gender prediction client unavailable, leaving names for the mode fill: {e}")
+        return self._client
+        
+    @staticmethod
+    def build_batch_prompt(names: List[Tuple[str, str]]) -> str:
+        people = [
+            {"id": idx, "firstname": firstname, "lastname": lastname}
+            for idx, (firstname, lastname) in enumerate(names)
+        ]
+        return f"""
+                    For each person below, give the most probable gender (Male/Female)
+                    based on their first name and last name.
                     
-                    Your answer should consist of only one word: 'Male' or 'Female'.
-                """   
+                    {json.dumps(people)}
+                    
+                    Answer with only a JSON array containing one object per person, in the form
+                    [{{"id": 0, "predicted_gender": "Male"}}, ...] and nothing else.
+                """
                 
+    @staticmethod
+    def parse_batch_response(content: str, names: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Gender]:
+        start, end = content.find('['), content.rfind(']')
+        if start == -1 or end == -1:
+            raise ValueError(f"No JSON array in gender prediction response: {content!r}")
+        
+        GenderPrediction = gender_prediction_model()
+        predictions = {}
+        for item in json.loads(content[start:end + 1]):
+            firstname, lastname = names[int(item['id'])]
+            prediction = GenderPrediction(
+                firstname=firstname,
+                lastname=lastname,
+                predicted_gender=str(item['predicted_gender']).strip().capitalize()
+            )
+            predictions[(firstname, lastname)] = prediction.predicted_gender
+        return predictions
+        
+    def _predict_batch(self, names: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Gender]:
+        prompt = self.build_batch_prompt(names)
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.parse_batch_response(self._client.complete(prompt), names)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logging.error(f"Gender prediction failed for a batch of {len(names)} names after {attempt + 1} attempts: {e}")
+                    return {}
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random())
+                logging.warning(f"Gender prediction attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def predict_genders(self, names: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Gender]:
+        unique_names = list(dict.fromkeys(names))
+        
+        predictions = {}
+        if self.cache is not None:
+            predictions = {name: Gender(gender) for name, gender in self.cache.get_many(unique_names).items()}
+            unique_names = [name for name in unique_names if name not in predictions]
+            logging.info(f"Gender cache served {len(predictions)} names, {len(unique_names)} left for remote prediction")
+        
+        batches = [
+            unique_names[i:i + self.batch_size]
+            for i in range(0, len(unique_names), self.batch_size)
+        ]
+        
+        remote_predictions = {}
+        # Resolve the client once here rather than racing in the workers
+        if batches and self._ensure_client() is not None:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for batch_predictions in executor.map(self._predict_batch, batches):
+                    remote_predictions.update(batch_predictions)
+            
+        if self.cache is not None:
+            self.cache.put_many({name: gender.value for name, gender in remote_predictions.items()})
                 
-        response = groq.Groq().chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}]
+        logging.info(f"Predicted gender for {len(remote_predictions)}/{len(unique_names)} unique names in {len(batches)} requests")
+        predictions.update(remote_predictions)
+        return predictions
+        
+    def predict_gender(
+        self,
+        firstname: str,
+        lastname: str
+    ):
+        return self.predict_genders([(firstname, lastname)]).get((firstname, lastname))
+    
+    def impute(self, df):
+        missing_gender_index = df.Gender.isnull()
+        if not missing_gender_index.any():
+            return df
+        
+        missing_names = df.loc[missing_gender_index, ['Firstname', 'Lastname']].fillna('')
+        keys = pd.Series(
+            list(zip(missing_names['Firstname'], missing_names['Lastname'])),
+            index=missing_names.index
         )
+        predictions = self.predict_genders(keys.tolist())
+        imputed = keys.map({key: gender.value for key, gender in predictions.items()})
+        
+        if isinstance(df['Gender'].dtype, pd.CategoricalDtype):
+            new_categories = [gender.value for gender in Gender if gender.value not in df['Gender'].cat.categories]
+            df['Gender'] = df['Gender'].cat.add_categories(new_categories)
+        df.loc[missing_gender_index, 'Gender'] = imputed
+        
+        logging.info(f"Imputed gender for {imputed.notna().sum()} of {len(imputed)} rows with missing gender")
+        return df
+    
+class LocalGenderImputer:
+    def __init__(
+        self,
+        model_path: str = 'artifacts/models/gender_imputer.joblib',
+        confidence_threshold: float = 0.8,
+        fallback_imputer = None,
+        ngram_range: Tuple[int, int] = (2, 4),
+        refit: bool = False,
+        allow_fit: bool = True
+    ):
+        self.model_path = model_path
+        self.confidence_threshold = confidence_threshold
+        self.fallback_imputer = fallback_imputer
+        self.ngram_range = tuple(ngram_range)
+        self.refit = refit
+        self.allow_fit = allow_fit
+        self.model = None
+        self.labelled_fingerprint = None
+        
+    @staticmethod
+    def _names(df: pd.DataFrame) -> pd.Series:
+        return df['Firstname'].fillna('').astype(str).str.strip().str.lower()
         
-        pred_gender = response.choices[0].message.content.strip()
-        prediction = GenderPrediction(firstname=firstname, lastname=lastname, predicted_gender=pred_gender)
+    @classmethod
+    def fingerprint(cls, df: pd.DataFrame) -> str:
+        import hashlib
         
-        logging.info(f"Predicted gender for {firstname} {lastname}: {pred_gender}")
+        labelled = df[df['Gender'].notna()]
+        hashes = pd.util.hash_pandas_object(
+            pd.DataFrame({'name': cls._names(labelled), 'gender': labelled['Gender'].astype(str)}),
+            index=False
+        )
+        # Sorted, so the same labels read back in another order (e.g. from Spark) match
+        return hashlib.sha1(hashes.sort_values().to_numpy().tobytes()).hexdigest()
+        
+    def fit(self, df: pd.DataFrame):
+        from sklearn.pipeline import make_pipeline, make_union
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        labelled = df[df['Gender'].notna()]
         
-        return prediction.predicted_gender
+        # Character n-grams generalise to unseen names, while the whole-name
+        # token lets frequent names be decided by their observed label counts.
+        self.model = make_pipeline(
+            make_union(
+                TfidfVectorizer(analyzer='char_wb', ngram_range=self.ngram_range),
+                TfidfVectorizer(analyzer='word', token_pattern=r'\S+')
+            ),
+            LogisticRegression(max_iter=1000)
+        )
+        self.model.fit(self._names(labelled), labelled['Gender'].astype(str))
+        self.labelled_fingerprint = self.fingerprint(labelled)
+        logging.info(f"Fitted local gender imputer on {len(labelled)} labelled rows")
+        return self
     
+    def save_model(self):
+        if self.model is None:
+            raise ValueError("Local gender imputer has not been fitted yet.")
+        import joblib
+        
+        os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+        joblib.dump({'model': self.model, 'labelled_fingerprint': self.labelled_fingerprint}, self.model_path)
+        
+    def load_model(self):
+        if not os.path.exists(self.model_path):
+            raise ValueError(f"Gender imputer model file {self.model_path} does not exist")
+        import joblib
+        
+        saved = joblib.load(self.model_path)
+        if isinstance(saved, dict):
+            self.model, self.labelled_fingerprint = saved['model'], saved.get('labelled_fingerprint')
+        else:
+            # Saved before the labelled data was fingerprinted
+            self.model, self.labelled_fingerprint = saved, None
+        
+    def ensure_model(self, df: pd.DataFrame):
+        # The saved model is reused only while the labelled rows it was fitted
+        # on are unchanged. Without allow_fit (incremental batches) df is not
+        # the full history, so the saved model is used as is.
+        if self.model is not None:
+            return
+        if not self.allow_fit:
+            self.load_model()
+            logging.info(f"Loaded local gender imputer from {self.model_path}")
+            return
+        if os.path.exists(self.model_path) and not self.refit:
+            self.load_model()
+            if self.labelled_fingerprint == self.fingerprint(df):
+                logging.info(f"Loaded local gender imputer from {self.model_path}")
+                return
+            logging.info(f"Labelled names changed since {self.model_path} was fitted; refitting")
+        self.fit(df)
+        self.save_model()
+        logging.info(f"Saved local gender imputer to {self.model_path}")
+            
     def impute(self, df):
         missing_gender_index = df.Gender.isnull()
+        if not missing_gender_index.any():
+            return df
+        self.ensure_model(df)
         
-        for idx in df[missing_gender_index].index:
-            first_name = df.loc[idx, 'Firstname']
-            last_name = df.loc[idx, 'Lastname']
-            gender = self.predict_gender(first_name, last_name)
-            
-            if gender:
-                df.loc[idx, 'Gender'] = gender
-                print(f"Imputed gender for {first_name} {last_name} as {gender}")
-            else:
-                print(f"Could not predict gender for {first_name} {last_name}")
+        probabilities = self.model.predict_proba(self._names(df[missing_gender_index]))
+        classes = self.model.classes_
+        confidence = probabilities.max(axis=1)
+        predicted = pd.Series(classes[probabilities.argmax(axis=1)], index=df.index[missing_gender_index])
+        predicted = predicted.where(confidence >= self.confidence_threshold)
+        
+        if isinstance(df['Gender'].dtype, pd.CategoricalDtype):
+            new_categories = [gender for gender in classes if gender not in df['Gender'].cat.categories]
+            df['Gender'] = df['Gender'].cat.add_categories(new_categories)
+        df.loc[missing_gender_index, 'Gender'] = predicted
+        
+        n_confident = int(predicted.notna().sum())
+        logging.info(f"Local gender imputer filled {n_confident} of {len(predicted)} rows at confidence >= {self.confidence_threshold}")
         
+        if self.fallback_imputer is not None and n_confident < len(predicted):
+            df = self.fallback_imputer.impute(df)
         return df
     
+    
 class fillingMissingValuesStrategy(MissingValueHandlingStrategy):
     def __init__(
         self,
@@ -101,20 +351,113 @@ class fillingMissingValuesStrategy(MissingValueHandlingStrategy):
         self.relevant_column = relevant_column
         self.is_custom_imputer = is_custom_imputer
         self.custom_imputer = custom_imputer
+        self.statistic = None
         
         logging.info(
             f"Initialized fillingMissingValuesStrategy with method: {self.method}, fill_value: {self.fill_value}, relevant_column: {self.relevant_column}, is_custom_imputer: {self.is_custom_imputer}"
         )
         
+    def fit(self, df):
+        column = df[self.relevant_column]
+        if self.method == 'mean':
+            statistic = column.mean()
+        elif self.method == 'median':
+            statistic = column.median()
+        elif self.method == 'mode':
+            statistic = column.mode().iloc[0]
+        elif self.method == 'constant':
+            statistic = self.fill_value
+        else:
+            raise ValueError(f"Unsupported fill method: {self.method}")
+        
+        self.statistic = statistic.item() if hasattr(statistic, 'item') else statistic
+        logging.info(f"Fitted {self.method} statistic for column {self.relevant_column}: {self.statistic}")
+        return self
+        
     def handle_missing_values(self, df):
         if self.is_custom_imputer:
             df = self.custom_imputer.impute(df)
             logging.info("Applied custom imputer for missing values.")
         else:
-            df[self.relevant_column] = df[self.relevant_column].fillna(df[self.relevant_column].mean())
+            if self.statistic is None:
+                self.fit(df)
+            df[self.relevant_column] = df[self.relevant_column].fillna(self.statistic)
             logging.info(f"Filled missing values in column {self.relevant_column} using method: {self.method}")
         return df
+    
+    def handle_missing_values_chunks(self, chunks):
+        if not self.is_custom_imputer and self.statistic is None:
+            raise NotImplementedError(
+                f"Filling '{self.relevant_column}' with method '{self.method}' needs statistics over the full column; call fit() before applying it chunk by chunk."
+            )
+        return super().handle_missing_values_chunks(chunks)
+    
+    
+class MissingValueImputer:
+    def __init__(self, strategies: List[fillingMissingValuesStrategy]):
+        self.strategies = {strategy.relevant_column: strategy for strategy in strategies}
+        self.statistics = {}
         
-     
-            
-    
\ No newline at end of file
+    @classmethod
+    def from_config(cls, methods_config: Dict[str, Dict]):
+        return cls([
+            fillingMissingValuesStrategy(
+                method=method_config.get('method', 'mean'),
+                fill_value=method_config.get('fill_value'),
+                relevant_column=method_config['relevant_column']
+            )
+            for method_config in methods_config.values()
+        ])
+        
+    def fit(self, df):
+        self.statistics = {
+            col: strategy.fit(df).statistic
+            for col, strategy in self.strategies.items()
+        }
+        return self
+    
+    def transform(self, df):
+        if not self.statistics:
+            raise ValueError("MissingValueImputer has not been fitted yet.")
+        fill_values = {col: value for col, value in self.statistics.items() if col in df.columns}
+        df = df.fillna(value=fill_values)
+        logging.info(f"Filled missing values with fitted statistics for columns: {list(fill_values)}")
+        return df
+    
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.transform(chunk)
+    
+    def fill_record(self, record: Dict) -> Dict:
+        filled = dict(record)
+        for col, value in self.statistics.items():
+            current = filled.get(col)
+            if current is None or (isinstance(current, float) and current != current):
+                filled[col] = value
+        return filled
+    
+    def save(self, filepath):
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        artifact = {
+            col: {'method': self.strategies[col].method, 'value': value}
+            for col, value in self.statistics.items()
+        }
+        with open(filepath, 'w') as file:
+            json.dump(artifact, file, indent=2)
+        logging.info(f"Saved imputation statistics to {filepath}")
+        
+    @classmethod
+    def load(cls, filepath):
+        if not os.path.exists(filepath):
+            raise ValueError(f"Imputation statistics file {filepath} does not exist")
+        with open(filepath, 'r') as file:
+            artifact = json.load(file)
+        
+        imputer = cls([
+            fillingMissingValuesStrategy(method=entry['method'], relevant_column=col)
+            for col, entry in artifact.items()
+        ])
+        for col, entry in artifact.items():
+            imputer.strategies[col].statistic = entry['value']
+        imputer.statistics = {col: entry['value'] for col, entry in artifact.items()}
+        return imputer
@@ -0,0 +1,315 @@
+import os
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import itertools
+import logging
+import numpy as np
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from sklearn.model_selection import StratifiedKFold
+
+from feature_store import SplitArtifactStore
+from model_evaluation import ModelEvaluator
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+def sample_value(spec, rng: np.random.RandomState):
+    # A list is a set of choices; {low, high, log} is a continuous range,
+    # sampled as integers when both bounds are integers.
+    if isinstance(spec, dict):
+        low, high = spec['low'], spec['high']
+        if spec.get('log', False):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        if isinstance(low, int) and isinstance(high, int):
+            return int(round(value))
+        return float(value)
+    value = spec[rng.randint(len(spec))]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def grid_configs(search_space: Dict[str, Any]) -> List[Dict[str, Any]]:
+    for name, spec in search_space.items():
+        if not isinstance(spec, list):
+            raise ValueError(f"Grid search needs a list of values for '{name}', got {spec}")
+    names = sorted(search_space)
+    return [dict(zip(names, values)) for values in itertools.product(*(search_space[name] for name in names))]
+
+
+def random_configs(search_space: Dict[str, Any], n_iter: int, random_state: int) -> List[Dict[str, Any]]:
+    rng = np.random.RandomState(random_state)
+    return [{name: sample_value(search_space[name], rng) for name in sorted(search_space)} for _ in range(n_iter)]
+
+
+def rung_fractions(min_resource_fraction: float, eta: int) -> List[float]:
+    # Training-row fractions per rung, ending at the full split:
+    # e.g. eta=3 and a 0.1 minimum give 1/9, 1/3, 1.
+    rungs = max(0, int(math.floor(math.log(1 / min_resource_fraction, eta) + 1e-9)))
+    return [eta ** -(rungs - rung) for rung in range(rungs + 1)]
+
+
+def run_trial(
+    builder_class,
+    params: Dict[str, Any],
+    n_threads: int,
+    store_dir: str,
+    row_count: int,
+    cv_folds: int,
+    metric: str,
+    random_state: int,
+    matrix_cache=None
+) -> Dict[str, Any]:
+    # Runs in a worker process. Every rung trains on a prefix of the same
+    # shuffled row order, so a promoted trial sees a superset of its rows.
+    store = SplitArtifactStore(store_dir)
+    X, y = store.load_split('train', mmap_mode='r')
+    order = np.random.RandomState(random_state).permutation(len(y))[:row_count]
+    X_rung, y_rung = X.iloc[order], y.iloc[order]
+
+    builder = builder_class(**params)
+    builder.set_threads(n_threads)
+
+    scores = []
+    started = time.perf_counter()
+    splitter = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=random_state)
+    for train_index, val_index in splitter.split(np.zeros(len(y_rung)), y_rung):
+        model = builder.fit_store(store, order[train_index], matrix_cache=matrix_cache)
+        results = ModelEvaluator(model, builder.model_name).evaluate(X_rung.iloc[val_index], y_rung.iloc[val_index])
+        scores.append(results[metric])
+    return {'score': float(np.mean(scores)), 'fit_seconds': time.perf_counter() - started}
+
+
+class TrialStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS trials (
+                    search_id TEXT NOT NULL,
+                    trial_id INTEGER NOT NULL,
+                    rung INTEGER NOT NULL,
+                    params TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    score REAL,
+                    fit_seconds REAL,
+                    finished_at TEXT,
+                    PRIMARY KEY (search_id, trial_id, rung)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def finished(self, search_id: str, rung: int) -> Dict[int, Dict[str, Any]]:
+        # Failed trials are recorded for inspection but not returned, so a
+        # resumed search retries them (e.g. after a worker was OOM-killed).
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT trial_id, status, score, fit_seconds FROM trials "
+                "WHERE search_id = ? AND rung = ? AND status = 'complete'",
+                (search_id, rung)
+            ).fetchall()
+        return {
+            trial_id: {'status': status, 'score': score, 'fit_seconds': fit_seconds}
+            for trial_id, status, score, fit_seconds in rows
+        }
+
+    def record(self, search_id: str, trial: Dict[str, Any]):
+        # Written by the coordinating process only, once per finished trial,
+        # so an interrupted search loses at most the trials still running.
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    search_id, trial['trial_id'], trial['rung'], json.dumps(trial['params'], sort_keys=True),
+                    trial['row_count'], trial['status'], trial['score'], trial['fit_seconds'],
+                    datetime.now().isoformat(timespec='seconds')
+                )
+            )
+
+
+class HyperparameterTuner:
+    def __init__(
+        self,
+        builder_class,
+        search_space: Dict[str, Any],
+        trial_store: TrialStore,
+        base_params: Optional[Dict[str, Any]] = None,
+        search_method: str = 'random',
+        n_iter: int = 20,
+        cv_folds: int = 3,
+        metric: str = 'f1_score',
+        eta: int = 3,
+        min_resource_fraction: float = 0.1,
+        cpu_budget: Optional[int] = None,
+        random_state: int = 42,
+        mlflow_tracker=None,
+        matrix_cache=None
+    ):
+        if search_method not in ('random', 'grid'):
+            raise ValueError(f"Unknown search method '{search_method}', expected 'random' or 'grid'")
+        if not search_space:
+            raise ValueError("Hyperparameter tuning needs a non-empty search space")
+        self.builder_class = builder_class
+        self.search_space = search_space
+        self.trial_store = trial_store
+        self.base_params = base_params or {}
+        self.search_method = search_method
+        self.n_iter = n_iter
+        self.cv_folds = cv_folds
+        self.metric = metric
+        self.eta = eta
+        self.min_resource_fraction = min_resource_fraction
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.random_state = random_state
+        self.mlflow_tracker = mlflow_tracker
+        self.matrix_cache = matrix_cache if builder_class.USES_MATRIX_CACHE else None
+
+    @classmethod
+    def from_config(cls, builder_class, model_type: str, tuning_config: Dict[str, Any], **kwargs):
+        search_spaces = tuning_config.get('search_spaces', {})
+        if model_type not in search_spaces:
+            raise ValueError(f"No search space configured for '{model_type}'")
+        return cls(
+            builder_class,
+            search_spaces[model_type],
+            TrialStore(tuning_config.get('trial_store', 'artifacts/tuning/trials.db')),
+            search_method=tuning_config.get('search_method', 'random'),
+            n_iter=tuning_config.get('n_iter', 20),
+            cv_folds=tuning_config.get('cv_folds', 3),
+            metric=tuning_config.get('metric', 'f1_score'),
+            eta=tuning_config.get('eta', 3),
+            min_resource_fraction=tuning_config.get('min_resource_fraction', 0.1),
+            cpu_budget=tuning_config.get('cpu_budget'),
+            **kwargs
+        )
+
+    def configs(self) -> List[Dict[str, Any]]:
+        if self.search_method == 'grid':
+            return grid_configs(self.search_space)
+        return random_configs(self.search_space, self.n_iter, self.random_state)
+
+    def search_id(self, split_store: SplitArtifactStore) -> str:
+        # Anything that changes which trials run or what they score starts a
+        # new search; an identical rerun resumes the stored one.
+        payload = json.dumps({
+            'builder': self.builder_class.__name__,
+            'base_params': self.base_params,
+            'search_space': self.search_space,
+            'search_method': self.search_method,
+            'n_iter': self.n_iter,
+            'cv_folds': self.cv_folds,
+            'metric': self.metric,
+            'eta': self.eta,
+            'min_resource_fraction': self.min_resource_fraction,
+            'random_state': self.random_state,
+            'data': split_store.fingerprint
+        }, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def _run_rung(
+        self,
+        search_id: str,
+        rung: int,
+        trial_ids: List[int],
+        configs: List[Dict[str, Any]],
+        row_count: int,
+        split_store: SplitArtifactStore
+    ) -> Dict[int, Dict[str, Any]]:
+        finished = self.trial_store.finished(search_id, rung)
+        pending = [trial_id for trial_id in trial_ids if trial_id not in finished]
+        if len(pending) < len(trial_ids):
+            logging.info(f"Rung {rung}: resuming with {len(trial_ids) - len(pending)} of {len(trial_ids)} trials already finished")
+        if not pending:
+            return {trial_id: finished[trial_id] for trial_id in trial_ids}
+
+        max_workers = min(len(pending), self.cpu_budget)
+        n_threads = max(1, self.cpu_budget // max_workers)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    run_trial,
+                    self.builder_class,
+                    {**self.base_params, **configs[trial_id]},
+                    n_threads,
+                    split_store.store_dir,
+                    row_count,
+                    self.cv_folds,
+                    self.metric,
+                    self.random_state,
+                    self.matrix_cache
+                ): trial_id
+                for trial_id in pending
+            }
+            for future in as_completed(futures):
+                trial_id = futures[future]
+                trial = {
+                    'trial_id': trial_id,
+                    'rung': rung,
+                    'params': configs[trial_id],
+                    'row_count': row_count,
+                    'status': 'complete',
+                    'score': None,
+                    'fit_seconds': None
+                }
+                try:
+                    trial.update(future.result())
+                except Exception as e:
+                    logging.error(f"Trial {trial_id} at rung {rung} failed: {e}")
+                    trial['status'] = 'failed'
+                self.trial_store.record(search_id, trial)
+                if self.mlflow_tracker is not None:
+                    self.mlflow_tracker.log_tuning_trial(trial, self.metric)
+                finished[trial_id] = trial
+
+        return {trial_id: finished[trial_id] for trial_id in trial_ids}
+
+    def tune(self, split_store: SplitArtifactStore) -> Dict[str, Any]:
+        configs = self.configs()
+        search_id = self.search_id(split_store)
+        n_rows = split_store.manifest['splits']['y_train']['rows']
+        fractions = rung_fractions(self.min_resource_fraction, self.eta)
+        logging.info(
+            f"Search {search_id}: {len(configs)} {self.search_method} configs over {len(fractions)} rungs "
+            f"with row fractions {[round(f, 3) for f in fractions]}"
+        )
+
+        if self.matrix_cache is not None:
+            self.matrix_cache.ensure(split_store, 'train', self.cpu_budget)
+
+        trial_ids = list(range(len(configs)))
+        ranked: List[Tuple[int, float]] = []
+        for rung, fraction in enumerate(fractions):
+            row_count = max(self.cv_folds * 2, int(n_rows * fraction))
+            results = self._run_rung(search_id, rung, trial_ids, configs, row_count, split_store)
+            ranked = sorted(
+                ((trial_id, result['score']) for trial_id, result in results.items() if result['score'] is not None),
+                key=lambda item: item[1],
+                reverse=True
+            )
+            if not ranked:
+                raise RuntimeError(f"Every trial at rung {rung} of search {search_id} failed")
+            logging.info(f"Rung {rung} ({row_count} rows): best {self.metric}={ranked[0][1]:.4f} from trial {ranked[0][0]}")
+
+            # Only the top 1/eta of each rung is promoted to the next,
+            # larger budget; the rest stop here.
+            if rung < len(fractions) - 1:
+                keep = max(1, len(trial_ids) // self.eta)
+                trial_ids = [trial_id for trial_id, _ in ranked[:keep]]
+
+        best_id, best_score = ranked[0]
+        logging.info(f"Best configuration (trial {best_id}, {self.metric}={best_score:.4f}): {configs[best_id]}")
+        return {'search_id': search_id, 'trial_id': best_id, 'score': best_score, 'params': configs[best_id]}
@@ -0,0 +1,183 @@
+import io
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from enum import Enum
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from data_ingestion import DataIngester
+from data_splitter import DataSplitStrategy, StratifiedDataSplitStrategy
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+class WatermarkMode(str, Enum):
+    OFFSET = "offset"
+    ROW_NUMBER = "row_number"
+
+
+def reference_statistics(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    numeric = df.select_dtypes(include='number')
+    return {
+        col: {'mean': float(numeric[col].mean()), 'std': float(numeric[col].std())}
+        for col in numeric.columns
+    }
+
+
+def feature_drift(df: pd.DataFrame, reference: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    # Shift of each column's mean in units of the reference standard deviation
+    drift = {}
+    for col, stats in reference.items():
+        if col not in df.columns or not stats['std']:
+            continue
+        mean = df[col].astype(np.float64).mean()
+        if mean == mean:
+            drift[col] = abs(mean - stats['mean']) / stats['std']
+    return drift
+
+
+def complete_lines_offset(data_path: str, block_size: int = 1 << 16) -> int:
+    # Byte offset just past the last newline. A final line without one may
+    # still be being written, so reads stop at this offset and the next
+    # offset-mode read starts at the beginning of that line once an append
+    # completes it.
+    with open(data_path, 'rb') as file:
+        end = file.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - block_size)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b'\n')
+            if newline != -1:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+class IncrementalState:
+    VERSION = 1
+
+    def __init__(self, state_path: str):
+        self.state_path = state_path
+        self.state: Dict[str, Any] = {}
+
+    def exists(self) -> bool:
+        return os.path.exists(self.state_path)
+
+    def load(self):
+        with open(self.state_path, 'r') as file:
+            state = json.load(file)
+        if state.get('version') != self.VERSION:
+            raise ValueError(f"Unsupported incremental state version {state.get('version')} in {self.state_path}")
+        self.state = state
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.state, file, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def scan_source(data_path: str, watermark_column: str, ingester: Optional[DataIngester] = None) -> Dict[str, Any]:
+        # Taken before a full run reads the file, so rows appended while it
+        # runs are picked up by the next incremental run. An ingester that
+        # projects the watermark column (a cached Parquet copy) avoids
+        # parsing every CSV column just for the maximum.
+        offset = complete_lines_offset(data_path)
+        if ingester is not None:
+            row_watermark = ingester.ingest_data(data_path)[watermark_column].max()
+        else:
+            row_watermark = pd.read_csv(data_path, usecols=[watermark_column])[watermark_column].max()
+        return {'file_offset': offset, 'row_watermark': int(row_watermark)}
+
+    def reset(self, data_path: str, source: Dict[str, Any], fitted_rows: int, reference: Dict[str, Dict[str, float]]):
+        # reference is reference_statistics() of the model-ready features
+        # (or its Spark counterpart), so the frame itself need not be local.
+        self.state = {
+            'version': self.VERSION,
+            'source': os.path.abspath(data_path),
+            'file_offset': source['file_offset'],
+            'row_watermark': source['row_watermark'],
+            'fitted_rows': int(fitted_rows),
+            'rows_since_fit': 0,
+            'reference': reference,
+            'fitted_at': datetime.now().isoformat(timespec='seconds'),
+            'updated_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self.save()
+        logging.info(f"Reset incremental state at offset {source['file_offset']}, row watermark {source['row_watermark']}")
+
+    def advance(self, file_offset: int, row_watermark: int, new_rows: int):
+        self.state['file_offset'] = file_offset
+        self.state['row_watermark'] = row_watermark
+        self.state['rows_since_fit'] += new_rows
+        self.state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        self.save()
+
+    def volume_fraction(self, new_rows: int) -> float:
+        return (self.state['rows_since_fit'] + new_rows) / max(self.state['fitted_rows'], 1)
+
+    def read_new_rows(
+        self,
+        data_path: str,
+        watermark_column: str,
+        mode: WatermarkMode = WatermarkMode.OFFSET,
+        dtypes: Optional[Dict[str, str]] = None,
+        chunk_size: int = 100000,
+        end_offset: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        # Only bytes before end_offset are parsed. The caller takes it from
+        # complete_lines_offset() and records the same value with advance(),
+        # so a line still being written is neither read nor skipped.
+        if os.path.abspath(data_path) != self.state['source']:
+            raise ValueError(f"Incremental state tracks {self.state['source']}, not {os.path.abspath(data_path)}")
+        if end_offset is None:
+            end_offset = complete_lines_offset(data_path)
+
+        offset = self.state['file_offset']
+        if mode == WatermarkMode.OFFSET and end_offset >= offset:
+            if end_offset == offset:
+                return
+            # Appended rows start right after the recorded offset, so only the
+            # new bytes are parsed, under the header's column names.
+            columns = list(pd.read_csv(data_path, nrows=0).columns)
+            with open(data_path, 'rb') as file:
+                file.seek(offset)
+                new_bytes = io.BytesIO(file.read(end_offset - offset))
+            with pd.read_csv(new_bytes, names=columns, header=None, dtype=dtypes, chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    yield chunk[chunk[watermark_column] > self.state['row_watermark']]
+            return
+
+        if mode == WatermarkMode.OFFSET:
+            logging.warning(f"{data_path} is smaller than the recorded offset; falling back to the {watermark_column} watermark")
+        with open(data_path, 'rb') as file:
+            complete_lines = io.BytesIO(file.read(end_offset))
+        with pd.read_csv(complete_lines, dtype=dtypes, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                yield chunk[chunk[watermark_column] > self.state['row_watermark']]
+
+
+def split_new_rows(
+    df: pd.DataFrame,
+    target_column: str,
+    split_strategy: DataSplitStrategy,
+    min_rows: int
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    # A batch too small to split, or with a class too rare to stratify, goes
+    # to the train split whole; the rows are still appended and the watermark
+    # still advances past them.
+    y = df[target_column]
+    stratified = isinstance(split_strategy, StratifiedDataSplitStrategy)
+    if len(df) < min_rows or (stratified and y.value_counts().min() < 2):
+        logging.info(f"Appending all {len(df)} new rows to the train split; the batch is too small to split")
+        X = df.drop(columns=[target_column])
+        return X, X.iloc[:0], y, y.iloc[:0]
+    return split_strategy.split_data(df, target_column)
@@ -1,12 +1,27 @@
 import os
 import joblib
+import numpy as np
+import xgboost as xgb
 from typing import Dict, Any
 from datetime import datetime
 from xgboost import XGBClassifier
 from abc import ABC, abstractmethod
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.svm import SVC
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from xgboost_matrix import XGBoostMatrixCache
 
 class BaseModelBuilder(ABC):
+    # Estimator parameter that controls its thread count, or None for
+    # estimators that always fit on a single core.
+    THREAD_PARAM = None
+    # Whether fit() accepts an eval_set and honours early_stopping_rounds
+    SUPPORTS_EARLY_STOPPING = False
+    SUPPORTS_WARM_START = False
+    # Whether fit_store() trains from an XGBoostMatrixCache buffer
+    USES_MATRIX_CACHE = False
+    ESTIMATOR_CLASS = None
+
     def __init__(
         self,
         model_name: str,
@@ -16,9 +31,31 @@ class BaseModelBuilder(ABC):
         self.model = None
         self.model_params = kwargs
         
+    @property
+    def multithreaded(self) -> bool:
+        return self.THREAD_PARAM is not None
+
+    def set_threads(self, n_threads: int):
+        if self.multithreaded:
+            self.model_params[self.THREAD_PARAM] = n_threads
+
     @abstractmethod
     def build_model(self):
         pass
+
+    def fit_store(self, split_store, rows=None, eval_rows=None, early_stopping_rounds=None, matrix_cache=None):
+        # Fits on the memmapped training split, optionally restricted to the
+        # given row positions. eval_rows and early_stopping_rounds are only
+        # used by builders with SUPPORTS_EARLY_STOPPING.
+        X, y = split_store.load_split('train', mmap_mode='r')
+        if rows is not None:
+            X, y = X.iloc[np.asarray(rows)], y.iloc[np.asarray(rows)]
+        self.build_model()
+        self.model.fit(X, y)
+        return self.model
+
+    def continue_training(self, model, split_store, rows, additional_estimators: int, matrix_cache=None):
+        raise ValueError(f"{self.model_name} does not support warm-start retraining")
     
     def save_model(self, filepath):
         if self.model is None:
@@ -32,6 +69,10 @@ class BaseModelBuilder(ABC):
         self.model = joblib.load(filepath)
         
 class RandomForestModelBuilder(BaseModelBuilder):
+    THREAD_PARAM = 'n_jobs'
+    SUPPORTS_WARM_START = True
+    ESTIMATOR_CLASS = RandomForestClassifier
+
     def __init__(self, **kwargs):      
         default_params = {
             'n_estimators': 100,
@@ -47,13 +88,30 @@ class RandomForestModelBuilder(BaseModelBuilder):
     def build_model(self):
         self.model = RandomForestClassifier(**self.model_params)
         return self.model
+
+    def continue_training(self, model, split_store, rows, additional_estimators: int, matrix_cache=None):
+        # warm_start keeps the fitted trees and grows only the added ones,
+        # which are the only trees that see the new rows.
+        X, y = split_store.load_split('train', mmap_mode='r')
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + additional_estimators)
+        model.fit(X.iloc[np.asarray(rows)], y.iloc[np.asarray(rows)])
+        model.set_params(warm_start=False)
+        self.model = model
+        return self.model
     
 class XGBoostModelBuilder(BaseModelBuilder):
+    THREAD_PARAM = 'n_jobs'
+    SUPPORTS_EARLY_STOPPING = True
+    SUPPORTS_WARM_START = True
+    USES_MATRIX_CACHE = True
+    ESTIMATOR_CLASS = XGBClassifier
+
     def __init__(self, **kwargs):      
         default_params = {
             'n_estimators': 100,
             'max_depth': 10,
-            'random_state': 42
+            'random_state': 42,
+            'tree_method': 'hist'
         }
         
         default_params.update(kwargs)
@@ -62,6 +120,125 @@ class XGBoostModelBuilder(BaseModelBuilder):
     def build_model(self):
         self.model = XGBClassifier(**self.model_params)
         return self.model
+
+    def _train_matrix(self, split_store, matrix_cache=None, rows=None) -> xgb.DMatrix:
+        nthread = self.model_params.get(self.THREAD_PARAM) or -1
+        matrix_cache = matrix_cache or XGBoostMatrixCache(cache_dir=None, enabled=False)
+        if rows is None:
+            return matrix_cache.load(split_store, 'train', nthread)
+        return matrix_cache.load_rows(split_store, rows, 'train', nthread)
+
+    def _wrap_booster(self, booster: xgb.Booster) -> XGBClassifier:
+        # Training runs on the native API so it can take a cached DMatrix;
+        # load_model turns the booster back into the XGBClassifier that
+        # evaluation, inference and joblib artifacts expect.
+        self.model = XGBClassifier(**self.model_params)
+        self.model.load_model(bytearray(booster.save_raw()))
+        return self.model
+
+    def fit_store(self, split_store, rows=None, eval_rows=None, early_stopping_rounds=None, matrix_cache=None):
+        dfit = self._train_matrix(split_store, matrix_cache, rows)
+        evals = [(self._train_matrix(split_store, matrix_cache, eval_rows), 'validation')] if eval_rows is not None else []
+        booster = xgb.train(
+            XGBClassifier(**self.model_params).get_xgb_params(),
+            dfit,
+            num_boost_round=self.model_params['n_estimators'],
+            evals=evals,
+            early_stopping_rounds=early_stopping_rounds if evals else None,
+            verbose_eval=False
+        )
+        return self._wrap_booster(booster)
+
+    def continue_training(self, model, split_store, rows, additional_estimators: int, matrix_cache=None):
+        # Boosting resumes from the existing booster, so the new rounds fit
+        # the residuals of the current model on the new rows only.
+        # An early-stopped booster predicts with its first best_iteration + 1
+        # rounds only, so it resumes from those; the attribute is cleared
+        # afterwards, or predictions would still ignore the new rounds.
+        base = model.get_booster()
+        best_iteration = base.attr('best_iteration')
+        if best_iteration is not None:
+            base = base[:int(best_iteration) + 1]
+        dnew = self._train_matrix(split_store, matrix_cache, rows)
+        booster = xgb.train(
+            XGBClassifier(**self.model_params).get_xgb_params(),
+            dnew,
+            num_boost_round=additional_estimators,
+            xgb_model=base,
+            verbose_eval=False
+        )
+        booster.set_attr(best_iteration=None, best_score=None)
+        return self._wrap_booster(booster)
+
+class GradientBoostingModelBuilder(BaseModelBuilder):
+    ESTIMATOR_CLASS = GradientBoostingClassifier
+
+    def __init__(self, **kwargs):
+        default_params = {
+            'n_estimators': 100,
+            'max_depth': 5,
+            'random_state': 42
+        }
+
+        default_params.update(kwargs)
+        super().__init__('GradientBoosting', **default_params)
+
+    def build_model(self):
+        self.model = GradientBoostingClassifier(**self.model_params)
+        return self.model
+
+class LogisticRegressionModelBuilder(BaseModelBuilder):
+    ESTIMATOR_CLASS = LogisticRegression
+
+    def __init__(self, **kwargs):
+        default_params = {
+            'max_iter': 1000,
+            'random_state': 42
+        }
+
+        default_params.update(kwargs)
+        super().__init__('LogisticRegression', **default_params)
+
+    def build_model(self):
+        self.model = LogisticRegression(**self.model_params)
+        return self.model
+
+class SVMModelBuilder(BaseModelBuilder):
+    ESTIMATOR_CLASS = SVC
+
+    def __init__(self, **kwargs):
+        default_params = {
+            'probability': True,
+            'random_state': 42
+        }
+
+        default_params.update(kwargs)
+        super().__init__('SVM', **default_params)
+
+    def build_model(self):
+        self.model = SVC(**self.model_params)
+        return self.model
+
+MODEL_BUILDERS = {
+    'xgboost': XGBoostModelBuilder,
+    'random_forest': RandomForestModelBuilder,
+    'gradient_boosting': GradientBoostingModelBuilder,
+    'logistic_regression': LogisticRegressionModelBuilder,
+    'svm': SVMModelBuilder,
+}
+
+def create_model_builder(model_type: str, **kwargs) -> BaseModelBuilder:
+    if model_type not in MODEL_BUILDERS:
+        raise ValueError(f"Unknown model type '{model_type}', expected one of {sorted(MODEL_BUILDERS)}")
+    return MODEL_BUILDERS[model_type](**kwargs)
+
+def builder_for_model(model) -> BaseModelBuilder:
+    for builder_class in MODEL_BUILDERS.values():
+        if type(model) is builder_class.ESTIMATOR_CLASS:
+            builder = builder_class(**model.get_params())
+            builder.model = model
+            return builder
+    raise ValueError(f"No model builder for {type(model).__name__}")
       
 model_params = {
     'n_estimators': 100,
@@ -5,8 +5,6 @@ from typing import Dict, Any, Optional, Union
 from datetime import datetime
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.metrics import (
     accuracy_score,
     precision_score,
@@ -48,4 +46,7 @@ class ModelEvaluator:
         }
         return self.evaluation_results
 
+    def evaluate_store(self, store, split='test'):
+        X, Y = store.load_split(split, mmap_mode='r')
+        return self.evaluate(X, Y)
      
\ No newline at end of file
@@ -6,12 +6,15 @@ import joblib
 from typing import Dict, Any, Optional
 import numpy as np
 import pandas as pd
-from sklearn.base import BaseEstimator
 from feature_binning import CustomBinningStrategy
-from feature_encoding import OrdinalEncodingStrategy
+from feature_encoding import EncoderBundle
+from feature_scaling import FittedScaler
+from handling_missing_values import MissingValueImputer
+from outlier_detection import OutlierDetector
+from preprocessing_plan import PreprocessingPlan
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
-from config import get_binning_config, get_encoding_config
+from config import get_binning_config, get_encoding_config, get_missing_value_config, get_outlier_config, get_scaling_config
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,12 +23,26 @@ logging.basicConfig(
 logger=logging.getLogger(__name__)
 
 class ModelInference:
-    def __init__(self, model_path):
+    def __init__(self, model_path, imputation_stats_path=None):
         self.model_path = model_path
         self.model = self.load_model()
         self.binning_config = get_binning_config()
         self.encoding_config = get_encoding_config()
-        self.encoders = {}
+        self.binning = CustomBinningStrategy(self.binning_config['credit_score_bins'])
+        self.encoder_bundle = self.load_encoder_bundle(
+            self.encoding_config.get('bundle_path', 'artifacts/encoders/encoder_bundle.json')
+        )
+        self.imputer = self.load_imputer(
+            imputation_stats_path or get_missing_value_config().get('statistics_path', 'artifacts/imputation/imputation_statistics.json')
+        )
+        self.outlier_config = get_outlier_config()
+        self.outlier_detector = self.load_outlier_detector(
+            self.outlier_config.get('bounds_path', 'artifacts/outliers/outlier_bounds.json')
+        )
+        self.scaler = self.load_scaler(
+            get_scaling_config().get('scaler_path', 'artifacts/scalers/scaler_parameters.json')
+        )
+        self.plan = self.build_plan()
 
     def load_model(self):
         if not os.path.exists(self.model_path):
@@ -33,40 +50,99 @@ class ModelInference:
             raise FileNotFoundError(f"Model file not found at {self.model_path}")
         return joblib.load(self.model_path)
 
+    def load_imputer(self, imputation_stats_path):
+        if not os.path.exists(imputation_stats_path):
+            logger.warning(f"Imputation statistics not found at {imputation_stats_path}. Missing values will not be imputed at inference time.")
+            return None
+        return MissingValueImputer.load(imputation_stats_path)
+
+    def load_outlier_detector(self, bounds_path):
+        if not os.path.exists(bounds_path):
+            logger.warning(f"Outlier bounds not found at {bounds_path}. Incoming records will not be checked for outliers.")
+            return None
+        return OutlierDetector.load_bounds(bounds_path, self.outlier_config)
+
+    def load_scaler(self, scaler_path):
+        if not os.path.exists(scaler_path):
+            logger.warning(f"Scaler parameters not found at {scaler_path}. Numeric features will not be scaled at inference time.")
+            return None
+        return FittedScaler.load(scaler_path)
+
+    def load_encoder_bundle(self, bundle_path):
+        if os.path.exists(bundle_path):
+            return EncoderBundle.load(bundle_path)
+        encoders_dir = os.path.dirname(bundle_path)
+        logger.warning(f"Encoder bundle not found at {bundle_path}. Falling back to per-column encoders in {encoders_dir}.")
+        return EncoderBundle.from_legacy_dir(encoders_dir, self.encoding_config['ordinal_mappings'])
+
     def load_encoders(self, encoders_dir):
-        for file in os.listdir(encoders_dir):
-            feature_name = file.split('_encoder.json')[0]
-            with open(os.path.join(encoders_dir, file), 'r') as f:
-                self.encoders[feature_name] = json.load(f)
+        self.encoder_bundle = EncoderBundle.from_legacy_dir(encoders_dir, self.encoding_config['ordinal_mappings'])
+        self.plan = self.build_plan()
+
+    def build_plan(self):
+        return PreprocessingPlan(
+            PreprocessingPlan.feature_columns_for(self.model),
+            self.encoder_bundle,
+            binning=self.binning,
+            imputer=self.imputer,
+            scaler=self.scaler
+        )
 
     def preprocess_input(self, input_data):
+        if self.imputer is not None:
+            input_data = self.imputer.fill_record(input_data)
         data = pd.DataFrame([input_data])
 
-        for col, encoder in self.encoders.items():
-            data[col] = data[col].map(encoder)
-
-        binning = CustomBinningStrategy(self.binning_config['credit_score_bins'])
-        data = binning.bin_feature(data, 'CreditScore') 
-
-        ordinal_encoding = OrdinalEncodingStrategy(self.encoding_config['ordinal_mappings'])
-        data = ordinal_encoding.encode(data)
+        data = self.binning.bin_feature(data, 'CreditScore') 
+        data = self.encoder_bundle.encode(data)
+        if self.scaler is not None:
+            data = self.scaler.transform(data)
 
         data = data.drop(columns = ['RowNumber', 'CustomerId', 'Firstname', 'Lastname', 'CreditScore'])
-        print(data)   
         return data
     
-    def predict(self, input_data):        
-        preprocessed_data = self.preprocess_input(input_data)
-        Y_pred = self.model.predict(preprocessed_data)
-        Y_pred_proba = self.model.predict_proba(preprocessed_data)[:, 1]
+    def check_outliers(self, input_data):
+        if self.outlier_detector is None:
+            return []
+        record = self.imputer.fill_record(input_data) if self.imputer is not None else input_data
+        outlier_columns = self.outlier_detector.flag_record(record)
+        if len(outlier_columns) >= self.outlier_detector.min_outlier_columns:
+            logger.warning(f"Input is out of the training range for columns: {outlier_columns}")
+        return outlier_columns
+
+    def is_rejected(self, outlier_columns):
+        return (
+            self.outlier_detector is not None
+            and self.outlier_config.get('inference_action', 'tag') == 'reject'
+            and len(outlier_columns) >= self.outlier_detector.min_outlier_columns
+        )
 
-        status = 'Churn' if Y_pred[0] == 1 else 'No Churn'
-        logger.info(f"Predicted status: {status} with probability of churn: {Y_pred_proba[0]:.4f}")
+    def predict_batch(self, records):
+        outlier_columns = [self.check_outliers(record) for record in records]
+        accepted = [i for i, flags in enumerate(outlier_columns) if not self.is_rejected(flags)]
 
-        return {
-            "prediction": int(Y_pred[0]),
-            "Confidence": float(Y_pred_proba[0])
-        }
+        results = [
+            {"prediction": None, "Confidence": None, "outlier_columns": flags, "rejected": True}
+            for flags in outlier_columns
+        ]
+        if accepted:
+            features = self.plan.transform([records[i] for i in accepted])
+            Y_pred_proba = self.model.predict_proba(features)
+            Y_pred = self.model.classes_[Y_pred_proba.argmax(axis=1)]
+            for row, i in enumerate(accepted):
+                results[i] = {
+                    "prediction": int(Y_pred[row]),
+                    "Confidence": float(Y_pred_proba[row, 1]),
+                    "outlier_columns": outlier_columns[i]
+                }
+        return results
+    
+    def predict(self, input_data):        
+        result = self.predict_batch([input_data])[0]
+        if not result.get('rejected'):
+            status = 'Churn' if result['prediction'] == 1 else 'No Churn'
+            logger.info(f"Predicted status: {status} with probability of churn: {result['Confidence']:.4f}")
+        return result
  
 
       
\ No newline at end of file
@@ -0,0 +1,173 @@
+import os
+import time
+import shutil
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sklearn.model_selection import StratifiedShuffleSplit
+
+from feature_store import SplitArtifactStore
+from model_building import create_model_builder
+from model_evaluation import ModelEvaluator
+from model_training import ModelTrainer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+def allocate_threads(builders: Dict[str, Any], cpu_budget: int) -> Dict[str, int]:
+    # All candidates run at once when the budget allows, so single-threaded
+    # estimators each hold one core and the multithreaded ones share the rest.
+    # With more candidates than cores every worker gets a single thread.
+    threaded = [name for name, builder in builders.items() if builder.multithreaded]
+    if len(builders) >= cpu_budget or not threaded:
+        return {name: 1 for name in builders}
+    spare = cpu_budget - (len(builders) - len(threaded))
+    share, extra = divmod(spare, len(threaded))
+    threads = {name: 1 for name in builders}
+    for position, name in enumerate(threaded):
+        threads[name] = max(1, share + (1 if position < extra else 0))
+    return threads
+
+
+def train_candidate(
+    model_type: str,
+    params: Dict[str, Any],
+    n_threads: int,
+    store_dir: str,
+    fit_rows: np.ndarray,
+    validation_rows: np.ndarray,
+    matrix_cache=None
+) -> Dict[str, Any]:
+    # Runs in a worker process. Every worker memmaps the same split files, so
+    # the feature matrix is shared through the page cache instead of being
+    # pickled into each process. Candidates are scored on a validation
+    # holdout carved from the training split; the test split is left for the
+    # winner's final report.
+    store = SplitArtifactStore(store_dir)
+    X_train, y_train = store.load_split('train', mmap_mode='r')
+
+    builder = create_model_builder(model_type, **params)
+    builder.set_threads(n_threads)
+
+    started = time.perf_counter()
+    model = builder.fit_store(store, fit_rows, matrix_cache=matrix_cache if builder.USES_MATRIX_CACHE else None)
+    fit_seconds = time.perf_counter() - started
+    train_score = model.score(X_train.iloc[fit_rows], y_train.iloc[fit_rows])
+
+    results = ModelEvaluator(model, builder.model_name).evaluate(X_train.iloc[validation_rows], y_train.iloc[validation_rows])
+    return {
+        'model_type': model_type,
+        'model_name': builder.model_name,
+        'model_params': builder.model_params,
+        'train_score': train_score,
+        'fit_seconds': fit_seconds,
+        'validation_metrics': results
+    }
+
+
+class ModelSelector:
+    def __init__(
+        self,
+        candidates: Dict[str, Dict[str, Any]],
+        metric: str = 'f1_score',
+        cpu_budget: Optional[int] = None,
+        candidate_dir: str = 'artifacts/models/candidates',
+        validation_fraction: float = 0.2,
+        random_state: int = 42,
+        matrix_cache=None
+    ):
+        if not candidates:
+            raise ValueError("Model selection needs at least one candidate")
+        self.candidates = candidates
+        self.metric = metric
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.candidate_dir = candidate_dir
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.matrix_cache = matrix_cache
+        self.results: List[Dict[str, Any]] = []
+        self.best: Optional[Dict[str, Any]] = None
+
+    def select(self, split_store: SplitArtifactStore) -> Dict[str, Any]:
+        builders = {
+            model_type: create_model_builder(model_type, **(params or {}))
+            for model_type, params in self.candidates.items()
+        }
+        threads = allocate_threads(builders, self.cpu_budget)
+        os.makedirs(self.candidate_dir, exist_ok=True)
+        if self.matrix_cache is not None and any(builder.USES_MATRIX_CACHE for builder in builders.values()):
+            self.matrix_cache.ensure(split_store, 'train', self.cpu_budget)
+
+        _, y_train = split_store.load_split('train', mmap_mode='r')
+        splitter = StratifiedShuffleSplit(n_splits=1, test_size=self.validation_fraction, random_state=self.random_state)
+        fit_rows, validation_rows = next(splitter.split(np.zeros(len(y_train)), y_train))
+
+        max_workers = min(len(builders), self.cpu_budget)
+        logging.info(f"Training {len(builders)} candidates with {max_workers} workers, threads per candidate: {threads}")
+
+        self.results = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    train_candidate,
+                    model_type,
+                    builders[model_type].model_params,
+                    threads[model_type],
+                    split_store.store_dir,
+                    fit_rows,
+                    validation_rows,
+                    self.matrix_cache
+                ): model_type
+                for model_type in builders
+            }
+            for future in as_completed(futures):
+                model_type = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Candidate {model_type} failed: {e}")
+                    continue
+                logging.info(
+                    f"Candidate {model_type}: validation {self.metric}={result['validation_metrics'][self.metric]:.4f} "
+                    f"in {result['fit_seconds']:.1f}s"
+                )
+                self.results.append(result)
+
+        if not self.results:
+            raise RuntimeError("Every model selection candidate failed to train")
+
+        self.results.sort(key=lambda result: result['validation_metrics'][self.metric], reverse=True)
+        self.best = self.results[0]
+        logging.info(
+            f"Selected {self.best['model_type']} with validation "
+            f"{self.metric}={self.best['validation_metrics'][self.metric]:.4f}"
+        )
+        return self.refit_best(split_store)
+
+    def refit_best(self, split_store: SplitArtifactStore) -> Dict[str, Any]:
+        # Only the winner is refit on the whole training split and scored on
+        # the test split, so the test metrics never influence the ranking.
+        builder = create_model_builder(self.best['model_type'], **self.best['model_params'])
+        builder.set_threads(self.cpu_budget)
+        model = builder.fit_store(split_store, matrix_cache=self.matrix_cache if builder.USES_MATRIX_CACHE else None)
+
+        model_path = os.path.join(self.candidate_dir, f"{self.best['model_type']}.joblib")
+        ModelTrainer().save_model(model, model_path)
+        self.best['model_path'] = model_path
+        self.best['metrics'] = ModelEvaluator(model, builder.model_name).evaluate_store(split_store)
+        logging.info(f"Test metrics for {self.best['model_type']}: {self.best['metrics']}")
+        return self.best
+
+    def promote(self, model_path: str) -> str:
+        if self.best is None:
+            raise ValueError("No candidate selected yet. Call select() before promoting.")
+        os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+        tmp_path = f'{model_path}.tmp'
+        shutil.copyfile(self.best['model_path'], tmp_path)
+        os.replace(tmp_path, model_path)
+        logging.info(f"Promoted {self.best['model_type']} to {model_path}")
+        return model_path
@@ -1,16 +1,195 @@
 import os
+import json
+import time
 import joblib
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from sklearn.model_selection import StratifiedKFold
+
+from feature_store import SplitArtifactStore
+from model_evaluation import ModelEvaluator
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
 
 class ModelTrainer:
     def train(self, model, X_train, y_train):
         model.fit(X_train, y_train)
         train_score = model.score(X_train, y_train)
         return model, train_score
-    
+
     def save_model(self, model, filepath):
         joblib.dump(model, filepath)
-        
+
     def load_model(self, model, filepath):
         return joblib.load(filepath)
-    
-    
\ No newline at end of file
+
+
+def training_state_path(model_path: str) -> str:
+    return f'{os.path.splitext(model_path)[0]}.state.json'
+
+
+def load_training_state(model_path: str) -> Optional[Dict[str, Any]]:
+    state_path = training_state_path(model_path)
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, 'r') as file:
+        return json.load(file)
+
+
+def save_training_state(model_path: str, state: Dict[str, Any]):
+    # Records how many training rows the saved model has seen, which is the
+    # watermark warm-start retraining continues from.
+    state_path = training_state_path(model_path)
+    os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+    tmp_path = f'{state_path}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(state, file, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def train_fold(
+    builder_class,
+    params: Dict[str, Any],
+    n_threads: int,
+    store_dir: str,
+    fold: int,
+    train_index: np.ndarray,
+    val_index: np.ndarray,
+    early_stopping_rounds: Optional[int],
+    matrix_cache=None
+) -> Dict[str, Any]:
+    # Runs in a worker process against the memmapped training split; only
+    # the fold's row indices cross the process boundary.
+    store = SplitArtifactStore(store_dir)
+    X, y = store.load_split('train', mmap_mode='r')
+    X_val, y_val = X.iloc[val_index], y.iloc[val_index]
+
+    builder = builder_class(**params)
+    builder.set_threads(n_threads)
+    early_stopping = bool(early_stopping_rounds) and builder.SUPPORTS_EARLY_STOPPING
+
+    started = time.perf_counter()
+    model = builder.fit_store(
+        store,
+        train_index,
+        eval_rows=val_index if early_stopping else None,
+        early_stopping_rounds=early_stopping_rounds if early_stopping else None,
+        matrix_cache=matrix_cache
+    )
+    best_iteration = int(model.best_iteration) if early_stopping else None
+    fit_seconds = time.perf_counter() - started
+
+    metrics = ModelEvaluator(model, builder.model_name).evaluate(X_val, y_val)
+    return {
+        'fold': fold,
+        'fit_seconds': fit_seconds,
+        'best_iteration': best_iteration,
+        'metrics': metrics
+    }
+
+
+class CrossValidationTrainer:
+    def __init__(
+        self,
+        builder,
+        cv_folds: int = 5,
+        early_stopping_rounds: Optional[int] = 10,
+        max_iterations: int = 1000,
+        cpu_budget: Optional[int] = None,
+        random_state: int = 42,
+        matrix_cache=None
+    ):
+        self.builder = builder
+        self.cv_folds = cv_folds
+        self.early_stopping_rounds = early_stopping_rounds
+        self.max_iterations = max_iterations
+        self.cpu_budget = cpu_budget if cpu_budget and cpu_budget > 0 else os.cpu_count() or 1
+        self.random_state = random_state
+        self.matrix_cache = matrix_cache if builder.USES_MATRIX_CACHE else None
+        self.fold_results: List[Dict[str, Any]] = []
+
+    @property
+    def early_stopping(self) -> bool:
+        return bool(self.early_stopping_rounds) and self.builder.SUPPORTS_EARLY_STOPPING
+
+    def run_folds(self, split_store: SplitArtifactStore) -> List[Dict[str, Any]]:
+        y = split_store.load_array('y_train', mmap_mode='r')
+        splitter = StratifiedKFold(n_splits=self.cv_folds, shuffle=True, random_state=self.random_state)
+        folds = list(splitter.split(np.zeros(len(y)), y))
+
+        # With early stopping the tree count is only a ceiling; each fold
+        # stops once its held-out loss has not improved for the patience window.
+        params = dict(self.builder.model_params)
+        if self.early_stopping:
+            params['n_estimators'] = self.max_iterations
+
+        max_workers = min(len(folds), self.cpu_budget)
+        n_threads = max(1, self.cpu_budget // max_workers)
+        logging.info(f"Running {len(folds)} {self.builder.model_name} folds with {max_workers} workers, {n_threads} threads each")
+        if self.matrix_cache is not None:
+            self.matrix_cache.ensure(split_store, 'train', self.cpu_budget)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    train_fold,
+                    type(self.builder),
+                    params,
+                    n_threads,
+                    split_store.store_dir,
+                    fold,
+                    train_index,
+                    val_index,
+                    self.early_stopping_rounds if self.early_stopping else None,
+                    self.matrix_cache
+                )
+                for fold, (train_index, val_index) in enumerate(folds)
+            ]
+            self.fold_results = [future.result() for future in futures]
+
+        for result in self.fold_results:
+            logging.info(
+                f"Fold {result['fold']}: {result['fit_seconds']:.2f}s, "
+                f"best iteration {result['best_iteration']}, metrics {result['metrics']}"
+            )
+        return self.fold_results
+
+    def summary(self) -> Dict[str, Any]:
+        metric_names = self.fold_results[0]['metrics'].keys()
+        summary = {
+            'folds': self.fold_results,
+            'mean_metrics': {
+                name: float(np.mean([result['metrics'][name] for result in self.fold_results]))
+                for name in metric_names
+            },
+            'fold_seconds': float(sum(result['fit_seconds'] for result in self.fold_results)),
+            'best_iteration': None
+        }
+        best_iterations = [result['best_iteration'] for result in self.fold_results if result['best_iteration'] is not None]
+        if best_iterations:
+            summary['best_iteration'] = int(np.median(best_iterations))
+        return summary
+
+    def train(self, split_store: SplitArtifactStore) -> Tuple[Any, Dict[str, Any]]:
+        self.run_folds(split_store)
+        summary = self.summary()
+
+        # Refit on the full training split with every core. The early-stopped
+        # folds fix the tree count (best_iteration is zero-based).
+        if summary['best_iteration'] is not None:
+            self.builder.model_params['n_estimators'] = summary['best_iteration'] + 1
+        self.builder.set_threads(self.cpu_budget)
+
+        started = time.perf_counter()
+        model = self.builder.fit_store(split_store, matrix_cache=self.matrix_cache)
+        summary['refit_seconds'] = time.perf_counter() - started
+        logging.info(
+            f"Refit {self.builder.model_name} on {split_store.manifest['splits']['y_train']['rows']} rows in {summary['refit_seconds']:.2f}s "
+            f"with params {self.builder.model_params}; CV means {summary['mean_metrics']}"
+        )
+        return model, summary
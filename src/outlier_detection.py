@@ -1,42 +1,178 @@
+import os
+import json
 import logging
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
     format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+Bounds = Dict[str, Tuple[float, float]]
+
+
+def outlier_mask(df: pd.DataFrame, bounds: Bounds) -> pd.DataFrame:
+    columns = list(bounds)
+    lower = np.array([bounds[col][0] for col in columns], dtype=np.float64)
+    upper = np.array([bounds[col][1] for col in columns], dtype=np.float64)
+    values = df[columns].to_numpy(dtype=np.float64)
+    return pd.DataFrame((values < lower) | (values > upper), index=df.index, columns=columns)
+
+
+class OutlierMethod(str, Enum):
+    IQR = "iqr"
+    Z_SCORE = "zscore"
+    MAD = "mad"
+
+
 class OutlierDetectionStrategy(ABC):
+    method = None
+
     @abstractmethod
-    def detect_outliers(self, df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    def compute_bounds(self, df: pd.DataFrame, columns: List[str]) -> Bounds:
         pass
-    
-class IQROutlierDetection(OutlierDetectionStrategy):
-    def detect_outliers(self, df, columns):
-        outliers = pd.DataFrame(False, index=df.index, columns=columns)
-        
-        for col in columns:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            print(f'IQR for {col}: {IQR}')
-            outliers[col] = (df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))
-            
-        logging.info(f"Detected outliers using IQR method for columns: {columns}")
+
+    def detect_outliers(self, df: pd.DataFrame, columns: list) -> pd.DataFrame:
+        outliers = outlier_mask(df, self.compute_bounds(df, columns))
+        logging.info(f"Detected outliers using {self.method.value} method for columns: {columns}")
         return outliers
-    
+
+
+class IQROutlierDetection(OutlierDetectionStrategy):
+    method = OutlierMethod.IQR
+
+    def __init__(self, multiplier: float = 1.5):
+        self.multiplier = multiplier
+
+    def _bounds_from_quartiles(self, columns: List[str], Q1: np.ndarray, Q3: np.ndarray) -> Bounds:
+        IQR = Q3 - Q1
+        lower = Q1 - self.multiplier * IQR
+        upper = Q3 + self.multiplier * IQR
+        for col, iqr in zip(columns, IQR):
+            logging.info(f'IQR for {col}: {iqr}')
+        return {col: (float(lo), float(hi)) for col, lo, hi in zip(columns, lower, upper)}
+
+    def compute_bounds(self, df: pd.DataFrame, columns: List[str]) -> Bounds:
+        quartiles = df[columns].quantile([0.25, 0.75])
+        return self._bounds_from_quartiles(
+            columns,
+            quartiles.loc[0.25].to_numpy(dtype=np.float64),
+            quartiles.loc[0.75].to_numpy(dtype=np.float64)
+        )
+
+
+class ZScoreOutlierDetection(OutlierDetectionStrategy):
+    method = OutlierMethod.Z_SCORE
+
+    def __init__(self, threshold: float = 3.0):
+        self.threshold = threshold
+
+    def _bounds_from_moments(self, columns: List[str], mean: np.ndarray, std: np.ndarray) -> Bounds:
+        lower = mean - self.threshold * std
+        upper = mean + self.threshold * std
+        return {col: (float(lo), float(hi)) for col, lo, hi in zip(columns, lower, upper)}
+
+    def compute_bounds(self, df: pd.DataFrame, columns: List[str]) -> Bounds:
+        values = df[columns]
+        return self._bounds_from_moments(
+            columns,
+            values.mean().to_numpy(dtype=np.float64),
+            values.std().to_numpy(dtype=np.float64)
+        )
+
+
+class MADOutlierDetection(OutlierDetectionStrategy):
+    method = OutlierMethod.MAD
+    # Scales the MAD to a standard deviation estimate for normally distributed data
+    NORMAL_CONSISTENCY = 1.4826
+
+    def __init__(self, threshold: float = 3.5):
+        self.threshold = threshold
+
+    def _bounds_from_mad(self, columns: List[str], median: np.ndarray, mad: np.ndarray) -> Bounds:
+        spread = self.threshold * self.NORMAL_CONSISTENCY * mad
+        return {col: (float(m - s), float(m + s)) for col, m, s in zip(columns, median, spread)}
+
+    def compute_bounds(self, df: pd.DataFrame, columns: List[str]) -> Bounds:
+        values = df[columns]
+        median = values.median()
+        mad = (values - median).abs().median()
+        return self._bounds_from_mad(columns, median.to_numpy(dtype=np.float64), mad.to_numpy(dtype=np.float64))
+
+
+def create_outlier_strategy(outlier_config: Dict) -> OutlierDetectionStrategy:
+    method = OutlierMethod(outlier_config.get('detection_method', 'iqr'))
+    if method == OutlierMethod.IQR:
+        return IQROutlierDetection(multiplier=outlier_config.get('iqr_multiplier', 1.5))
+    if method == OutlierMethod.Z_SCORE:
+        return ZScoreOutlierDetection(threshold=outlier_config.get('z_score_threshold', 3.0))
+    return MADOutlierDetection(threshold=outlier_config.get('mad_threshold', 3.5))
+
+
 class OutlierDetector:
-    def __init__(self, strategy):
+    def __init__(self, strategy, min_outlier_columns: int = 2):
         self._strategy = strategy
-        
+        self.min_outlier_columns = min_outlier_columns
+        self.bounds = None
+
+    def fit(self, df: pd.DataFrame, selected_columns: List[str]) -> Bounds:
+        self.bounds = self._strategy.compute_bounds(df, selected_columns)
+        return self.bounds
+
     def detect_outliers(self, df, selected_columns):
         return self._strategy.detect_outliers(df, selected_columns)
 
-    def handle_outliers(self, df, selected_columns, method='remove'):
-        outliers = self.detect_outliers(df, selected_columns)
-        outliers_count = outliers.sum(axis=1)
-        rows_to_remove = outliers_count >= 2
-        
-        return df[~rows_to_remove]       
-        
\ No newline at end of file
+    def _rows_to_remove(self, df: pd.DataFrame) -> np.ndarray:
+        return outlier_mask(df, self.bounds).to_numpy().sum(axis=1) >= self.min_outlier_columns
+
+    def handle_outliers(self, df, selected_columns=None, method='remove'):
+        # Fits the bounds when columns are given; otherwise applies the
+        # fitted (or loaded) bounds, as the incremental pipeline does.
+        if selected_columns is not None:
+            self.fit(df, selected_columns)
+        elif self.bounds is None:
+            raise ValueError("Outlier bounds have not been fitted yet. Pass selected_columns or load_bounds() first.")
+        return df[~self._rows_to_remove(df)]
+
+    def flag_record(self, record: Dict) -> List[str]:
+        if self.bounds is None:
+            raise ValueError("Outlier bounds have not been fitted yet.")
+        flagged = []
+        for col, (lower, upper) in self.bounds.items():
+            value = record.get(col)
+            if value is not None and not (lower <= value <= upper) and value == value:
+                flagged.append(col)
+        return flagged
+
+    def is_outlier_record(self, record: Dict) -> bool:
+        return len(self.flag_record(record)) >= self.min_outlier_columns
+
+    def save_bounds(self, filepath):
+        if self.bounds is None:
+            raise ValueError("Outlier bounds have not been fitted yet.")
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        artifact = {
+            'method': self._strategy.method.value,
+            'min_outlier_columns': self.min_outlier_columns,
+            'bounds': {col: [lower, upper] for col, (lower, upper) in self.bounds.items()}
+        }
+        with open(filepath, 'w') as file:
+            json.dump(artifact, file, indent=2)
+        logging.info(f"Saved {artifact['method']} outlier bounds to {filepath}")
+
+    @classmethod
+    def load_bounds(cls, filepath, outlier_config: Optional[Dict] = None):
+        if not os.path.exists(filepath):
+            raise ValueError(f"Outlier bounds file {filepath} does not exist")
+        with open(filepath, 'r') as file:
+            artifact = json.load(file)
+
+        strategy_config = dict(outlier_config or {})
+        strategy_config['detection_method'] = artifact['method']
+        detector = cls(create_outlier_strategy(strategy_config), artifact.get('min_outlier_columns', 2))
+        detector.bounds = {col: (lower, upper) for col, (lower, upper) in artifact['bounds'].items()}
+        return detector
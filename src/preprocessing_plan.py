@@ -0,0 +1,98 @@
+import logging
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+Record = Dict[str, Any]
+
+
+def _to_float(value) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class PreprocessingPlan:
+    # Compiles the training-time transforms (imputation, binning, encoding, scaling)
+    # into one extractor per model column, so a request dict goes straight
+    # into a preallocated float32 row without building a DataFrame.
+    BINNED_SUFFIX = '_binned'
+
+    def __init__(
+        self,
+        feature_columns: Sequence[str],
+        encoder_bundle,
+        binning = None,
+        imputer = None,
+        scaler = None
+    ):
+        self.feature_columns = list(feature_columns)
+        self.encoder_bundle = encoder_bundle
+        self.binning = binning
+        self.fill_values = dict(imputer.statistics) if imputer is not None else {}
+        self.scaler = scaler
+        self.extractors = [self._compile_column(col) for col in self.feature_columns]
+
+    @staticmethod
+    def feature_columns_for(model, fallback: Optional[Sequence[str]] = None) -> List[str]:
+        names = getattr(model, 'feature_names_in_', None)
+        if names is None and hasattr(model, 'get_booster'):
+            names = model.get_booster().feature_names
+        if names is None:
+            if fallback is None:
+                raise ValueError("Model does not record its feature names; pass the training column order explicitly.")
+            names = fallback
+        return [str(name) for name in names]
+
+    def _raw(self, col: str) -> Callable[[Record], Any]:
+        fill_value = self.fill_values.get(col)
+        if fill_value is None:
+            return lambda record: record.get(col)
+
+        def get(record):
+            value = record.get(col)
+            if value is None or value != value:
+                return fill_value
+            return value
+        return get
+
+    def _compile_column(self, col: str) -> Callable[[Record], float]:
+        unseen = self.encoder_bundle.unseen_codes.get(col)
+        unseen = np.nan if unseen is None else float(unseen)
+
+        if col.endswith(self.BINNED_SUFFIX) and self.binning is not None:
+            raw = self._raw(col[:-len(self.BINNED_SUFFIX)])
+            bin_value = self.binning.bin_value
+            lookup = {label: float(code) for label, code in self.encoder_bundle.mapping(col).items()}
+            if not lookup:
+                raise ValueError(f"No ordinal mapping for binned column '{col}'")
+            return lambda record: lookup.get(bin_value(_to_float(raw(record))), unseen)
+
+        raw = self._raw(col)
+        if self.encoder_bundle.mapping(col):
+            lookup = {category: float(code) for category, code in self.encoder_bundle.mapping(col).items()}
+            return lambda record: lookup.get(raw(record), unseen)
+
+        if self.scaler is not None and col in self.scaler.scale_by_column:
+            scale = self.scaler.scale_by_column[col]
+            offset = self.scaler.offset_by_column[col]
+            return lambda record: _to_float(raw(record)) * scale + offset
+
+        return lambda record: _to_float(raw(record))
+
+    def transform(self, records: Union[Record, List[Record]]) -> np.ndarray:
+        if isinstance(records, dict):
+            records = [records]
+        output = np.empty((len(records), len(self.extractors)), dtype=np.float32)
+        for i, record in enumerate(records):
+            row = output[i]
+            for j, extract in enumerate(self.extractors):
+                row[j] = extract(record)
+        return output
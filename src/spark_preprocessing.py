@@ -0,0 +1,433 @@
+import logging
+import numpy as np
+import pandas as pd
+from abc import abstractmethod
+from functools import reduce
+from itertools import chain
+from operator import add
+from typing import Dict, List
+
+from pyspark.sql import Column, DataFrame, Window
+from pyspark.sql import functions as F
+from pyspark.sql.types import NumericType
+
+from handling_missing_values import fillingMissingValuesStrategy, MissingValueImputer
+from outlier_detection import (Bounds, OutlierDetectionStrategy, OutlierDetector, OutlierMethod,
+                               IQROutlierDetection, ZScoreOutlierDetection, MADOutlierDetection)
+from feature_binning import CustomBinningStrategy, INVALID_LABEL
+from feature_encoding import NominalEncodingStrategy, OrdinalEncodingStrategy
+from feature_scaling import FeatureScalingStrategy, ScalingType
+from data_splitter import SimpleDataSplitStrategy, SplitType, StratifiedDataSplitStrategy
+from spark_session import ROW_ORDER_COLUMN
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+# Spark DataFrame counterparts of the pandas strategies. Each subclasses the
+# pandas strategy it replaces, so fitted state (statistics, bounds, categories,
+# scaling parameters) is saved through the same artifact code and read back
+# unchanged by ModelInference.
+#
+# DropMissingValuesStrategy needs no Spark variant: DataFrame.dropna(subset=...)
+# has the same signature and drops rows with nulls or NaNs in those columns.
+
+
+def _lookup(mapping: Dict) -> Column:
+    return F.create_map(*chain.from_iterable((F.lit(key), F.lit(value)) for key, value in mapping.items()))
+
+
+class SparkFillMissingValuesStrategy(fillingMissingValuesStrategy):
+    def __init__(self, *args, relative_error: float = 0.001, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.relative_error = relative_error
+
+    def fit(self, df: DataFrame):
+        column = F.col(self.relevant_column)
+        if self.method == 'mean':
+            statistic = df.select(F.mean(column)).first()[0]
+        elif self.method == 'median':
+            statistic = df.approxQuantile(self.relevant_column, [0.5], self.relative_error)[0]
+        elif self.method == 'mode':
+            # Ties go to the smallest value, as with pandas' Series.mode().iloc[0]
+            statistic = (
+                df.where(column.isNotNull())
+                .groupBy(column).count()
+                .orderBy(F.desc('count'), column)
+                .first()[0]
+            )
+        elif self.method == 'constant':
+            statistic = self.fill_value
+        else:
+            raise ValueError(f"Unsupported fill method: {self.method}")
+
+        self.statistic = statistic
+        logging.info(f"Fitted {self.method} statistic for column {self.relevant_column}: {self.statistic}")
+        return self
+
+    def _impute_with_custom_imputer(self, df: DataFrame) -> DataFrame:
+        # Only the distinct names with a missing value are collected; the
+        # imputer runs on the driver (where its cache and client live) and the
+        # predictions are broadcast-joined back onto the full DataFrame.
+        missing = (
+            df.where(F.col(self.relevant_column).isNull())
+            .select('Firstname', 'Lastname')
+            .distinct()
+            .toPandas()
+        )
+        if missing.empty:
+            return df
+
+        missing[self.relevant_column] = pd.Series([None] * len(missing), dtype=object)
+        imputed = self.custom_imputer.impute(missing)
+        imputed = imputed[imputed[self.relevant_column].notna()]
+        if imputed.empty:
+            return df
+
+        imputed = imputed[['Firstname', 'Lastname', self.relevant_column]].astype(object)
+        predictions = df.sparkSession.createDataFrame(
+            imputed.where(imputed.notna(), None),
+            schema=f"Firstname string, Lastname string, {self.relevant_column} string"
+        ).alias('imputed')
+        joined = df.alias('data').join(
+            F.broadcast(predictions),
+            F.col('data.Firstname').eqNullSafe(F.col('imputed.Firstname'))
+            & F.col('data.Lastname').eqNullSafe(F.col('imputed.Lastname')),
+            'left'
+        )
+        return joined.select([
+            F.coalesce(F.col(f'data.{col}'), F.col(f'imputed.{col}')).alias(col)
+            if col == self.relevant_column else F.col(f'data.{col}')
+            for col in df.columns
+        ])
+
+    def handle_missing_values(self, df: DataFrame) -> DataFrame:
+        if self.is_custom_imputer:
+            df = self._impute_with_custom_imputer(df)
+            logging.info("Applied custom imputer for missing values.")
+        else:
+            if self.statistic is None:
+                self.fit(df)
+            df = df.fillna({self.relevant_column: self.statistic})
+            logging.info(f"Filled missing values in column {self.relevant_column} using method: {self.method}")
+        return df
+
+
+class SparkMissingValueImputer(MissingValueImputer):
+    @classmethod
+    def from_config(cls, methods_config: Dict[str, Dict], relative_error: float = 0.001):
+        return cls([
+            SparkFillMissingValuesStrategy(
+                method=method_config.get('method', 'mean'),
+                fill_value=method_config.get('fill_value'),
+                relevant_column=method_config['relevant_column'],
+                relative_error=relative_error
+            )
+            for method_config in methods_config.values()
+        ])
+
+    def transform(self, df: DataFrame) -> DataFrame:
+        if not self.statistics:
+            raise ValueError("MissingValueImputer has not been fitted yet.")
+        fill_values = {col: value for col, value in self.statistics.items() if col in df.columns}
+        df = df.fillna(fill_values)
+        logging.info(f"Filled missing values with fitted statistics for columns: {list(fill_values)}")
+        return df
+
+
+def outlier_flags(bounds: Bounds) -> List[Column]:
+    # Spark orders NaN above every number, so NaN and null are excluded
+    # explicitly to match outlier_mask, where both compare as False.
+    flags = []
+    for col, (lower, upper) in bounds.items():
+        value = F.col(col).cast('double')
+        flag = ~F.isnan(value) & ((value < lower) | (value > upper))
+        flags.append(F.coalesce(flag, F.lit(False)).alias(col))
+    return flags
+
+
+class SparkOutlierDetectionStrategy(OutlierDetectionStrategy):
+    def detect_outliers(self, df: DataFrame, columns: list) -> DataFrame:
+        outliers = df.select(outlier_flags(self.compute_bounds(df, columns)))
+        logging.info(f"Detected outliers using {self.method.value} method for columns: {columns}")
+        return outliers
+
+
+class SparkIQROutlierDetection(SparkOutlierDetectionStrategy, IQROutlierDetection):
+    def __init__(self, multiplier: float = 1.5, relative_error: float = 0.001):
+        super().__init__(multiplier=multiplier)
+        self.relative_error = relative_error
+
+    def compute_bounds(self, df: DataFrame, columns: List[str]) -> Bounds:
+        quartiles = df.approxQuantile(list(columns), [0.25, 0.75], self.relative_error)
+        return self._bounds_from_quartiles(
+            columns,
+            np.array([q1 for q1, _ in quartiles], dtype=np.float64),
+            np.array([q3 for _, q3 in quartiles], dtype=np.float64)
+        )
+
+
+class SparkZScoreOutlierDetection(SparkOutlierDetectionStrategy, ZScoreOutlierDetection):
+    def compute_bounds(self, df: DataFrame, columns: List[str]) -> Bounds:
+        row = df.agg(
+            *[F.mean(col) for col in columns],
+            *[F.stddev_samp(col) for col in columns]
+        ).first()
+        return self._bounds_from_moments(
+            columns,
+            np.array(row[:len(columns)], dtype=np.float64),
+            np.array(row[len(columns):], dtype=np.float64)
+        )
+
+
+class SparkMADOutlierDetection(SparkOutlierDetectionStrategy, MADOutlierDetection):
+    def __init__(self, threshold: float = 3.5, relative_error: float = 0.001):
+        super().__init__(threshold=threshold)
+        self.relative_error = relative_error
+
+    def compute_bounds(self, df: DataFrame, columns: List[str]) -> Bounds:
+        columns = list(columns)
+        median = np.array([q[0] for q in df.approxQuantile(columns, [0.5], self.relative_error)], dtype=np.float64)
+        deviations = df.select([F.abs(F.col(col) - float(m)).alias(col) for col, m in zip(columns, median)])
+        mad = np.array([q[0] for q in deviations.approxQuantile(columns, [0.5], self.relative_error)], dtype=np.float64)
+        return self._bounds_from_mad(columns, median, mad)
+
+
+def create_spark_outlier_strategy(outlier_config: Dict) -> OutlierDetectionStrategy:
+    method = OutlierMethod(outlier_config.get('detection_method', 'iqr'))
+    relative_error = outlier_config.get('relative_error', 0.001)
+    if method == OutlierMethod.IQR:
+        return SparkIQROutlierDetection(outlier_config.get('iqr_multiplier', 1.5), relative_error)
+    if method == OutlierMethod.Z_SCORE:
+        return SparkZScoreOutlierDetection(threshold=outlier_config.get('z_score_threshold', 3.0))
+    return SparkMADOutlierDetection(outlier_config.get('mad_threshold', 3.5), relative_error)
+
+
+class SparkOutlierDetector(OutlierDetector):
+    # handle_outliers filters with df[~mask]; on a Spark DataFrame indexing
+    # with a boolean Column is a filter, so only the mask has to change.
+    def _rows_to_remove(self, df: DataFrame) -> Column:
+        flagged = reduce(add, [flag.cast('int') for flag in outlier_flags(self.bounds)])
+        return flagged >= self.min_outlier_columns
+
+
+class SparkBinningStrategy(CustomBinningStrategy):
+    # Bucketizer buckets are half-open, so each edge e gets its own bucket
+    # [e, nextafter(e)) holding exactly that value. Buckets then alternate
+    # between interval and edge labels of the compiled bins, and NaN lands in
+    # the extra bucket kept by handleInvalid='keep'.
+    def bucket_splits(self):
+        bins = self.compiled_bins
+        splits, labels = [-np.inf], [bins.interval_labels[0]]
+        for edge, point_label, interval_label in zip(bins._edge_list, bins.point_labels, bins.interval_labels[1:]):
+            splits += [float(edge), float(np.nextafter(edge, np.inf))]
+            labels += [point_label, interval_label]
+        splits.append(np.inf)
+        labels.append(INVALID_LABEL)
+        return splits, labels
+
+    def bin_feature(self, df: DataFrame, col: str) -> DataFrame:
+        from pyspark.ml.feature import Bucketizer
+
+        splits, labels = self.bucket_splits()
+        bucket_col = f'{col}_bucket'
+        bucketizer = Bucketizer(splits=splits, inputCol=col, outputCol=bucket_col, handleInvalid='keep')
+        label_array = F.array(*[F.lit(label) for label in labels])
+
+        df = bucketizer.transform(df.withColumn(col, F.col(col).cast('double')))
+        df = df.withColumn(
+            f'{col}_binned',
+            F.coalesce(F.element_at(label_array, F.col(bucket_col).cast('int') + 1), F.lit(INVALID_LABEL))
+        ).drop(bucket_col)
+        logging.info(f"Binned feature '{col}' using custom bin definitions.")
+        return df
+
+
+class SparkNominalEncodingStrategy(NominalEncodingStrategy):
+    ROW_ORDER = ROW_ORDER_COLUMN
+
+    def encode(self, df: DataFrame) -> DataFrame:
+        # pd.factorize numbers categories by first appearance; the smallest
+        # row id per category reproduces that order. The id must come from
+        # read_spark_data(with_row_order=True), since rows reach this step
+        # after the gender join and outlier filter in no guaranteed order.
+        if self.ROW_ORDER not in df.columns:
+            raise ValueError(
+                f"Nominal encoding needs the '{self.ROW_ORDER}' column; read the data with read_spark_data(with_row_order=True)"
+            )
+        for col in self.nominal_features:
+            first_seen = (
+                df.where(F.col(col).isNotNull())
+                .groupBy(col).agg(F.min(self.ROW_ORDER).alias(self.ROW_ORDER))
+                .orderBy(self.ROW_ORDER)
+                .collect()
+            )
+            self.categories[col] = [row[col] for row in first_seen]
+            self.encoder_dictionary[col] = {category: idx for idx, category in enumerate(self.categories[col])}
+            df = df.withColumn(col, _lookup(self.encoder_dictionary[col])[F.col(col)])
+            logging.info(f"Encoded nominal feature '{col}' with {len(first_seen)} categories")
+        return df
+
+
+class SparkOrdinalEncodingStrategy(OrdinalEncodingStrategy):
+    def encode(self, df: DataFrame) -> DataFrame:
+        for col, mapping in self.ordinal_mappings.items():
+            df = df.withColumn(col, _lookup(mapping)[F.col(col)])
+            logging.info(f"Encoded ordinal feature '{col}' with mapping: {mapping}")
+        return df
+
+
+class SparkFeatureScalingStrategy(FeatureScalingStrategy):
+    # Column statistics come from one DataFrame.agg per partial_fit and are
+    # merged across calls, so fitting over several DataFrames is incremental.
+    def build_scaler(self):
+        return None
+
+    @abstractmethod
+    def column_aggregates(self, col: str) -> List[Column]:
+        pass
+
+    @abstractmethod
+    def update_statistics(self, stats: np.ndarray, merge: bool):
+        # stats has one row per aggregate and one column per scaled column
+        pass
+
+    def partial_fit(self, df: DataFrame, columns: List[str]):
+        if self.columns is not None and list(columns) != self.columns:
+            raise ValueError(f"Scaler was fitted on {self.columns}, got {list(columns)}")
+        merge = self.columns is not None and self.is_fitted
+        self.columns = list(columns)
+
+        aggregates = [self.column_aggregates(col) for col in self.columns]
+        row = df.agg(*chain.from_iterable(aggregates)).first()
+        n_aggregates = len(aggregates[0])
+        stats = np.array(row, dtype=np.float64).reshape(len(self.columns), n_aggregates).T
+        self.update_statistics(stats, merge)
+        self.is_fitted = True
+        return self
+
+    def transform(self, df: DataFrame) -> DataFrame:
+        if not self.is_fitted:
+            raise ValueError("Scaler has not been fitted yet.")
+        parameters = self.parameters()
+        return df.select([
+            (F.col(col) * parameters[col]['scale'] + parameters[col]['offset']).alias(col)
+            if col in parameters else F.col(col)
+            for col in df.columns
+        ])
+
+
+class SparkMinMaxScalingStrategy(SparkFeatureScalingStrategy):
+    scaling_type = ScalingType.MIN_MAX
+
+    def column_aggregates(self, col):
+        return [F.min(col), F.max(col)]
+
+    def update_statistics(self, stats, merge):
+        data_min, data_max = stats
+        if merge:
+            data_min, data_max = np.fmin(self.data_min, data_min), np.fmax(self.data_max, data_max)
+        self.data_min, self.data_max = data_min, data_max
+
+    def linear_parameters(self):
+        # Same as MinMaxScaler's scale_ and min_, including the unit scale for constant columns
+        data_range = self.data_max - self.data_min
+        scale = 1.0 / np.where(data_range == 0, 1.0, data_range)
+        return scale, -self.data_min * scale
+
+
+class SparkStandardScalingStrategy(SparkFeatureScalingStrategy):
+    scaling_type = ScalingType.STANDARD
+
+    def column_aggregates(self, col):
+        return [F.count(col), F.mean(col), F.var_pop(col)]
+
+    def update_statistics(self, stats, merge):
+        count, mean, var = np.nan_to_num(stats)
+        m2 = var * count
+        if merge:
+            # Chan's parallel update of (count, mean, M2)
+            total = self.count + count
+            safe_total = np.maximum(total, 1)
+            delta = mean - self.mean
+            mean = self.mean + delta * count / safe_total
+            m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe_total
+            count = total
+        self.count, self.mean, self.m2 = count, mean, m2
+
+    def linear_parameters(self):
+        std = np.sqrt(self.m2 / np.maximum(self.count, 1))
+        std = np.where(std == 0, 1.0, std)
+        return 1.0 / std, -self.mean / std
+
+
+def create_spark_scaling_strategy(scaling_config: Dict) -> SparkFeatureScalingStrategy:
+    scaling_type = scaling_config.get('scaling_type', 'min_max').replace('minmax', 'min_max')
+    if ScalingType(scaling_type) == ScalingType.STANDARD:
+        return SparkStandardScalingStrategy()
+    return SparkMinMaxScalingStrategy()
+
+
+class SparkDataSplitStrategy:
+    # split_data returns the train and test DataFrames with the target still
+    # attached, so each split is written once (as Parquet) and features and
+    # target can never be misaligned by recomputing a random split.
+    @abstractmethod
+    def split_frames(self, df: DataFrame, target_column: str):
+        pass
+
+    def split_data(self, df: DataFrame, target_column: str):
+        train, test = self.split_frames(df, target_column)
+        return train.cache(), test.cache()
+
+
+class SparkSimpleDataSplitStrategy(SparkDataSplitStrategy, SimpleDataSplitStrategy):
+    def split_frames(self, df: DataFrame, target_column: str):
+        train, test = df.randomSplit([1 - self.test_size, self.test_size], seed=self.random_state)
+        logging.info(f"Performed simple Spark data split with test size = {self.test_size}")
+        return train, test
+
+
+class SparkStratifiedDataSplitStrategy(SparkDataSplitStrategy, StratifiedDataSplitStrategy):
+    SPLIT_KEY = '_split_key'
+    SPLIT_RANK = '_split_rank'
+
+    def split_frames(self, df: DataFrame, target_column: str):
+        # Rows are ranked by a seeded random key within each class, so every
+        # class contributes test_size of its rows, as train_test_split(stratify=y)
+        # does. The key is materialised first because window ordering must be
+        # deterministic.
+        keyed = df.withColumn(self.SPLIT_KEY, F.rand(self.random_state)).cache()
+        ranked = keyed.withColumn(
+            self.SPLIT_RANK,
+            F.percent_rank().over(Window.partitionBy(target_column).orderBy(self.SPLIT_KEY))
+        )
+        is_test = F.col(self.SPLIT_RANK) < self.test_size
+        train = ranked.where(~is_test).drop(self.SPLIT_KEY, self.SPLIT_RANK)
+        test = ranked.where(is_test).drop(self.SPLIT_KEY, self.SPLIT_RANK)
+        logging.info(f"Performed stratified Spark data split with test size = {self.test_size}")
+        return train, test
+
+
+def create_spark_split_strategy(split_config: Dict) -> SparkDataSplitStrategy:
+    split_type = SplitType(split_config.get('split_type', SplitType.SIMPLE.value))
+    test_size = split_config.get('test_size', 0.2)
+    random_state = split_config.get('random_state', 42)
+    if split_type == SplitType.STRATIFIED:
+        return SparkStratifiedDataSplitStrategy(test_size, random_state)
+    return SparkSimpleDataSplitStrategy(test_size, random_state)
+
+
+def spark_reference_statistics(df: DataFrame) -> Dict[str, Dict[str, float]]:
+    # Counterpart of incremental.reference_statistics: one aggregation for the
+    # mean and sample standard deviation of every numeric column.
+    columns = [field.name for field in df.schema.fields if isinstance(field.dataType, NumericType)]
+    if not columns:
+        return {}
+    row = df.agg(*[F.mean(col) for col in columns], *[F.stddev_samp(col) for col in columns]).first()
+    return {
+        col: {'mean': float(row[idx]) if row[idx] is not None else float('nan'),
+              'std': float(row[len(columns) + idx]) if row[len(columns) + idx] is not None else float('nan')}
+        for idx, col in enumerate(columns)
+    }
@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+# Row id taken at the scan; nominal encoding orders categories by it
+ROW_ORDER_COLUMN = '_row_order'
+
+# Pandas dtype names pinned in config.yaml -> Spark SQL type names
+SPARK_TYPES = {
+    'int8': 'tinyint',
+    'int16': 'smallint',
+    'int32': 'int',
+    'int64': 'bigint',
+    'float32': 'float',
+    'float64': 'double',
+    'bool': 'boolean',
+    'category': 'string',
+    'object': 'string',
+    'string': 'string',
+}
+
+
+def get_or_create_spark_session(spark_config: Optional[Dict] = None):
+    from pyspark.sql import SparkSession
+
+    spark_config = spark_config or {}
+    builder = (
+        SparkSession.builder
+        .master(spark_config.get('master', 'local[*]'))
+        .appName(spark_config.get('app_name', 'churn_pipeline'))
+    )
+    for key, value in spark_config.get('config', {}).items():
+        builder = builder.config(key, value)
+
+    spark = builder.getOrCreate()
+    spark.sparkContext.setLogLevel(spark_config.get('log_level', 'WARN'))
+    logging.info(f"Using Spark session on {spark.sparkContext.master} (Spark {spark.version})")
+    return spark
+
+
+def read_spark_data(spark, file_path: str, dtypes: Optional[Dict[str, str]] = None, with_row_order: bool = False):
+    from pyspark.sql import functions as F
+
+    if file_path.endswith('.csv'):
+        # Read every CSV column as a string and cast the pinned ones, so no
+        # inference pass over the file is needed.
+        df = spark.read.csv(file_path, header=True, inferSchema=False)
+    else:
+        df = spark.read.parquet(file_path)
+
+    dtypes = dtypes or {}
+    df = df.select([
+        F.col(col).cast(SPARK_TYPES.get(dtypes[col], 'string')).alias(col) if col in dtypes else F.col(col)
+        for col in df.columns
+    ])
+    if with_row_order:
+        # Assigned straight after the scan, where partitions follow the file's
+        # splits in order, so the ids follow the file's row order. Ids
+        # assigned after a join or shuffle carry no such guarantee.
+        df = df.withColumn(ROW_ORDER_COLUMN, F.monotonically_increasing_id())
+    return df
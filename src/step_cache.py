@@ -0,0 +1,169 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import pandas as pd
+from contextlib import nullcontext
+from types import ModuleType
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+class CachedStep:
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Optional[pd.DataFrame]], pd.DataFrame],
+        config: Any = None,
+        modules: Iterable[ModuleType] = (),
+        artifacts: Iterable[str] = (),
+        optional_artifacts: Iterable[str] = ()
+    ):
+        self.name = name
+        self.run = run
+        self.config = config
+        self.modules = list(modules)
+        self.artifacts = list(artifacts)
+        # Stored when the step wrote them, e.g. a model fitted only when needed
+        self.optional_artifacts = list(optional_artifacts)
+
+
+class StepCache:
+    MANIFEST_FILE = 'manifest.json'
+    OUTPUT_FILE = 'output.parquet'
+    ARTIFACTS_DIR = 'artifacts'
+
+    def __init__(self, cache_dir: str, enabled: bool = True, max_entries_per_step: int = 3):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.max_entries_per_step = max_entries_per_step
+
+    @staticmethod
+    def file_fingerprint(file_path: str) -> str:
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def code_version(modules: Iterable[ModuleType], files: Iterable[str] = ()) -> str:
+        hasher = hashlib.sha256()
+        for module in sorted(modules, key=lambda module: module.__name__):
+            with open(module.__file__, 'rb') as file:
+                hasher.update(module.__name__.encode())
+                hasher.update(file.read())
+        for file_path in sorted(files):
+            with open(file_path, 'rb') as file:
+                hasher.update(os.path.basename(file_path).encode())
+                hasher.update(file.read())
+        return hasher.hexdigest()
+
+    def step_key(self, step: CachedStep, input_key: str) -> str:
+        # The input key is the previous step's key, so a change anywhere
+        # upstream changes the key of every step after it. The file that
+        # defines the step function is hashed too, since pipeline steps are
+        # closures whose logic lives there rather than in the strategy modules.
+        run_file = getattr(getattr(step.run, '__code__', None), 'co_filename', None)
+        payload = json.dumps({
+            'step': step.name,
+            'input': input_key,
+            'config': step.config,
+            'code': self.code_version(step.modules, [run_file] if run_file and os.path.isfile(run_file) else [])
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def entry_dir(self, step_name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, step_name, key[:16])
+
+    def has(self, step_name: str, key: str) -> bool:
+        manifest_path = os.path.join(self.entry_dir(step_name, key), self.MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return False
+        with open(manifest_path, 'r') as file:
+            return json.load(file).get('key') == key
+
+    def load(self, step_name: str, key: str) -> pd.DataFrame:
+        return pd.read_parquet(os.path.join(self.entry_dir(step_name, key), self.OUTPUT_FILE))
+
+    def restore_artifacts(self, step_name: str, key: str):
+        entry_dir = self.entry_dir(step_name, key)
+        with open(os.path.join(entry_dir, self.MANIFEST_FILE), 'r') as file:
+            artifacts = json.load(file)['artifacts']
+        for target, stored in artifacts.items():
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            shutil.copy2(os.path.join(entry_dir, self.ARTIFACTS_DIR, stored), target)
+        # Pruning keeps the most recently used entries, so hits refresh the mtime
+        os.utime(entry_dir)
+
+    def save(self, step: CachedStep, key: str, df: pd.DataFrame):
+        entry_dir = self.entry_dir(step.name, key)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.makedirs(os.path.join(entry_dir, self.ARTIFACTS_DIR))
+
+        df.to_parquet(os.path.join(entry_dir, self.OUTPUT_FILE), index=False)
+        artifacts = {}
+        optional = [artifact for artifact in step.optional_artifacts if os.path.exists(artifact)]
+        for idx, artifact in enumerate(step.artifacts + optional):
+            stored = f"{idx}_{os.path.basename(artifact)}"
+            shutil.copy2(artifact, os.path.join(entry_dir, self.ARTIFACTS_DIR, stored))
+            artifacts[artifact] = stored
+
+        # The manifest is written last, so an interrupted save is never a hit.
+        with open(os.path.join(entry_dir, self.MANIFEST_FILE), 'w') as file:
+            json.dump({'step': step.name, 'key': key, 'artifacts': artifacts}, file, indent=2)
+        self._prune(step.name)
+
+    def _prune(self, step_name: str):
+        step_dir = os.path.join(self.cache_dir, step_name)
+        entries = sorted(
+            (os.path.join(step_dir, entry) for entry in os.listdir(step_dir)),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for stale in entries[self.max_entries_per_step:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def run_steps(self, steps: Sequence[CachedStep], input_key: str, force: bool = False, profiler = None) -> Tuple[pd.DataFrame, List[str]]:
+        keys = []
+        for step in steps:
+            input_key = self.step_key(step, input_key)
+            keys.append(input_key)
+
+        # Resume after the longest prefix of steps that all have an entry:
+        # only the last cached output is read, earlier ones just restore
+        # their artifacts (fitted statistics, bounds, encoders, scalers).
+        start = 0
+        if self.enabled and not force:
+            while start < len(steps) and self.has(steps[start].name, keys[start]):
+                start += 1
+
+        df = None
+        if start > 0:
+            with self._profile(profiler, 'cache_restore') as record:
+                for step, key in zip(steps[:start], keys[:start]):
+                    self.restore_artifacts(step.name, key)
+                df = record.output(self.load(steps[start - 1].name, keys[start - 1]))
+            logging.info(f"Step cache hit for {[step.name for step in steps[:start]]}; loaded output of '{steps[start - 1].name}'")
+
+        for step, key in zip(steps[start:], keys[start:]):
+            with self._profile(profiler, step.name, df) as record:
+                df = record.output(step.run(df))
+            if self.enabled:
+                self.save(step, key, df)
+                logging.info(f"Cached output of step '{step.name}' under key {key[:16]}")
+        return df, keys
+
+    @staticmethod
+    def _profile(profiler, name: str, data_in=None):
+        if profiler is None:
+            return nullcontext(_NullRecord())
+        return profiler.step(name, data_in)
+
+
+class _NullRecord:
+    def output(self, data):
+        return data
@@ -0,0 +1,97 @@
+import os
+import shutil
+import hashlib
+import logging
+import numpy as np
+import xgboost as xgb
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+class XGBoostMatrixCache:
+    BUFFER_SUFFIX = '.buffer'
+
+    def __init__(self, cache_dir: str, enabled: bool = True, keep_fingerprints: int = 1, max_slices: int = 16):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.keep_fingerprints = max(1, keep_fingerprints)
+        self.max_slices = max_slices
+        self._matrices: Dict[Tuple[str, str], xgb.DMatrix] = {}
+        self._slices: 'OrderedDict[Tuple[str, str, str], xgb.DMatrix]' = OrderedDict()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sent to pool workers without the in-process matrices, which cannot
+        # be pickled; each worker loads the buffer once and reuses it.
+        state = dict(self.__dict__)
+        state['_matrices'] = {}
+        state['_slices'] = OrderedDict()
+        return state
+
+    def buffer_path(self, split_store, split: str) -> str:
+        return os.path.join(self.cache_dir, split_store.fingerprint[:16], f'{split}{self.BUFFER_SUFFIX}')
+
+    def _build(self, split_store, split: str, nthread: int) -> xgb.DMatrix:
+        return xgb.DMatrix(
+            split_store.load_array(f'X_{split}', mmap_mode='r'),
+            label=split_store.load_array(f'y_{split}', mmap_mode='r'),
+            feature_names=split_store.manifest['feature_columns'],
+            nthread=nthread
+        )
+
+    def ensure(self, split_store, split: str = 'train', nthread: int = -1) -> Optional[str]:
+        # Writes the buffer before workers start, so they only ever read it
+        # instead of each converting the same arrays.
+        if not self.enabled:
+            return None
+        path = self.buffer_path(split_store, split)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            self._build(split_store, split, nthread).save_binary(tmp_path, silent=True)
+            os.replace(tmp_path, path)
+            logging.info(f"Cached XGBoost {split} matrix at {path}")
+            self._evict(os.path.dirname(path))
+        return path
+
+    def _evict(self, current_dir: str):
+        # Every append or re-split gives the store a new fingerprint, so older
+        # buffer directories are removed once a new one is written.
+        others = [
+            os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+            if os.path.join(self.cache_dir, name) != current_dir and os.path.isdir(os.path.join(self.cache_dir, name))
+        ]
+        others.sort(key=os.path.getmtime, reverse=True)
+        for stale_dir in others[self.keep_fingerprints - 1:]:
+            shutil.rmtree(stale_dir, ignore_errors=True)
+            logging.info(f"Evicted stale XGBoost matrix cache {stale_dir}")
+
+    def load(self, split_store, split: str = 'train', nthread: int = -1) -> xgb.DMatrix:
+        # The same DMatrix object is handed out for every fit in this process,
+        # so XGBoost's hist index over it is built once and then reused.
+        key = (split_store.fingerprint, split)
+        if key not in self._matrices:
+            if self.enabled:
+                self._matrices[key] = xgb.DMatrix(self.ensure(split_store, split, nthread), nthread=nthread)
+            else:
+                self._matrices[key] = self._build(split_store, split, nthread)
+        return self._matrices[key]
+
+    def load_rows(self, split_store, rows, split: str = 'train', nthread: int = -1) -> xgb.DMatrix:
+        # Sliced matrices are memoised by the row positions, so CV folds and
+        # tuning trials that reuse a fold slice the full matrix only once.
+        rows = np.ascontiguousarray(rows, dtype=np.int32)
+        key = (split_store.fingerprint, split, hashlib.sha1(rows.tobytes()).hexdigest())
+        if key in self._slices:
+            self._slices.move_to_end(key)
+            return self._slices[key]
+        matrix = self.load(split_store, split, nthread).slice(rows)
+        if self.max_slices > 0:
+            self._slices[key] = matrix
+            while len(self._slices) > self.max_slices:
+                self._slices.popitem(last=False)
+        return matrix
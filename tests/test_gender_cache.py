@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from gender_cache import GenderCache
+
+
+def test_stats_count_every_lookup_and_eviction_across_threads(tmp_path):
+    cache = GenderCache(db_path=str(tmp_path / 'gender.sqlite'), max_entries=10, use_firstname_fallback=False)
+    cache.put_many({(f'first{idx}', 'last'): 'Male' for idx in range(20)})
+    names = [(f'first{idx}', 'last') for idx in range(20)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: cache.get_many(names), range(16)))
+
+    assert len(cache) == 10
+    assert cache.stats['evictions'] == 10
+    assert cache.stats['exact_hits'] == 16 * 10
+    assert cache.stats['misses'] == 16 * 10
+    cache.close()
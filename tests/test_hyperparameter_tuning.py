@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import hyperparameter_tuning
+from feature_store import SplitArtifactStore
+from hyperparameter_tuning import HyperparameterTuner, TrialStore
+from model_building import LogisticRegressionModelBuilder
+
+RUN_TRIAL = hyperparameter_tuning.run_trial
+
+
+def crash_on_second_config(builder_class, params, *args, **kwargs):
+    # Stands in for a worker that dies mid-trial; module level so the
+    # process pool can pickle it.
+    if params['C'] == 1.0:
+        raise MemoryError('worker killed')
+    return RUN_TRIAL(builder_class, params, *args, **kwargs)
+
+
+@pytest.fixture
+def split_store(tmp_path):
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({'a': rng.normal(size=60).astype(np.float32), 'b': rng.normal(size=60).astype(np.float32)})
+    y = pd.Series((X['a'] > 0).astype(np.int8), name='Exited')
+    store = SplitArtifactStore(str(tmp_path / 'store'))
+    store.save(X.iloc[:48], X.iloc[48:], y.iloc[:48], y.iloc[48:])
+    return store
+
+
+def test_failed_trials_are_not_finished(tmp_path):
+    trial_store = TrialStore(str(tmp_path / 'trials.db'))
+    for trial_id, status, score in ((0, 'complete', 0.5), (1, 'failed', None)):
+        trial_store.record('search', {
+            'trial_id': trial_id, 'rung': 0, 'params': {}, 'row_count': 10,
+            'status': status, 'score': score, 'fit_seconds': None
+        })
+    assert list(trial_store.finished('search', 0)) == [0]
+
+
+def test_resumed_search_retries_failed_trials(tmp_path, split_store, monkeypatch):
+    tuner = HyperparameterTuner(
+        LogisticRegressionModelBuilder,
+        {'C': [0.1, 1.0]},
+        TrialStore(str(tmp_path / 'trials.db')),
+        search_method='grid',
+        cv_folds=2,
+        min_resource_fraction=1.0,
+        cpu_budget=1
+    )
+    monkeypatch.setattr(hyperparameter_tuning, 'run_trial', crash_on_second_config)
+    tuner.tune(split_store)
+    search_id = tuner.search_id(split_store)
+    assert list(tuner.trial_store.finished(search_id, 0)) == [0]
+
+    monkeypatch.setattr(hyperparameter_tuning, 'run_trial', RUN_TRIAL)
+    tuner.tune(split_store)
+    assert sorted(tuner.trial_store.finished(search_id, 0)) == [0, 1]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_splitter import SimpleDataSplitStrategy, StratifiedDataSplitStrategy
+from feature_store import SplitArtifactStore
+from incremental import IncrementalState, WatermarkMode, complete_lines_offset, split_new_rows
+
+HEADER = b'RowNumber,Age,Exited\n'
+DTYPES = {'RowNumber': 'int64', 'Age': 'int8', 'Exited': 'int8'}
+
+
+def make_state(tmp_path, data_path):
+    state = IncrementalState(str(tmp_path / 'state.json'))
+    state.reset(str(data_path), IncrementalState.scan_source(str(data_path), 'RowNumber'), 2, {})
+    return state
+
+
+def read_new(state, data_path, mode=WatermarkMode.OFFSET):
+    end_offset = complete_lines_offset(str(data_path))
+    chunks = list(state.read_new_rows(str(data_path), 'RowNumber', mode, dtypes=DTYPES, end_offset=end_offset))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(), end_offset
+
+
+@pytest.mark.parametrize('mode', [WatermarkMode.OFFSET, WatermarkMode.ROW_NUMBER])
+def test_partial_trailing_line_is_read_once_completed(tmp_path, mode):
+    data_path = tmp_path / 'data.csv'
+    data_path.write_bytes(HEADER + b'1,30,0\n2,40,1\n')
+    state = make_state(tmp_path, data_path)
+
+    # Row 4 is still being written: its Age is cut off, which would be a NaN
+    # in an int8 column if it were parsed.
+    with open(data_path, 'ab') as file:
+        file.write(b'3,50,0\n4,')
+    df, end_offset = read_new(state, data_path, mode)
+    assert df['RowNumber'].tolist() == [3]
+    state.advance(end_offset, int(df['RowNumber'].max()), len(df))
+
+    with open(data_path, 'ab') as file:
+        file.write(b'60,1\n')
+    df, end_offset = read_new(state, data_path, mode)
+    assert df['RowNumber'].tolist() == [4]
+    assert df['Age'].tolist() == [60]
+    assert end_offset == data_path.stat().st_size
+
+
+def test_complete_lines_offset_without_trailing_newline(tmp_path):
+    data_path = tmp_path / 'data.csv'
+    data_path.write_bytes(HEADER + b'1,30,0\n2,40')
+    assert complete_lines_offset(str(data_path), block_size=4) == len(HEADER) + len(b'1,30,0\n')
+
+
+@pytest.mark.parametrize('strategy', [SimpleDataSplitStrategy(0.2), StratifiedDataSplitStrategy(0.2)])
+def test_one_row_batch_goes_to_train(strategy):
+    df = pd.DataFrame({'Age': [30], 'Exited': [1]})
+    X_train, X_test, y_train, y_test = split_new_rows(df, 'Exited', strategy, min_rows=20)
+    assert len(X_train) == len(y_train) == 1
+    assert len(X_test) == len(y_test) == 0
+    assert list(X_test.columns) == ['Age']
+
+
+def test_stratified_batch_with_a_single_row_class_goes_to_train():
+    df = pd.DataFrame({'Age': range(30), 'Exited': [0] * 29 + [1]})
+    X_train, X_test, _, _ = split_new_rows(df, 'Exited', StratifiedDataSplitStrategy(0.2), min_rows=20)
+    assert len(X_train) == 30 and len(X_test) == 0
+
+
+def test_store_append_extends_arrays_and_chains_fingerprint(tmp_path):
+    def frames(start, rows):
+        X = pd.DataFrame({'Age': np.arange(start, start + rows, dtype=np.float32), 'Tenure': np.arange(rows, dtype=np.int8)})
+        return X, pd.Series(np.arange(rows) % 2, name='Exited', dtype=np.int8)
+
+    X_train, y_train = frames(0, 8)
+    X_test, y_test = frames(100, 2)
+    store = SplitArtifactStore(str(tmp_path / 'store'))
+    first = store.save(X_train, X_test, y_train, y_test)['fingerprint']
+
+    X_new, y_new = frames(50, 1)
+    store.append(X_new, X_test.iloc[:0], y_new, y_test.iloc[:0])
+    X, y = store.load_split('train', mmap_mode=None)
+    assert len(X) == len(y) == 9
+    assert X['Age'].tolist()[-1] == 50
+    assert X.dtypes.tolist() == X_train.dtypes.tolist()
+    assert len(store.load_split('test', mmap_mode=None)[0]) == 2
+    assert store.fingerprint != first
+
+
+def test_scan_source_reads_the_watermark_from_the_parquet_projection(tmp_path):
+    from data_ingestion import DataIngestorParquet, ParquetConversionCache
+
+    data_path = tmp_path / 'data.csv'
+    data_path.write_bytes(HEADER + b'1,30,0\n7,40,1\n')
+    cache = ParquetConversionCache(str(tmp_path / 'parquet'), dtypes=DTYPES)
+    source = IncrementalState.scan_source(str(data_path), 'RowNumber', DataIngestorParquet(columns=['RowNumber'], cache=cache))
+    assert source == {'file_offset': data_path.stat().st_size, 'row_watermark': 7}
+    assert list(pd.read_parquet(cache.cache_path(str(data_path))).columns) == ['RowNumber', 'Age', 'Exited']
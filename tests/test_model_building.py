@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from feature_store import SplitArtifactStore
+from model_building import XGBoostModelBuilder
+
+
+def make_store(tmp_path):
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({'a': rng.normal(size=400).astype(np.float32), 'b': rng.normal(size=400).astype(np.float32)})
+    y = pd.Series(((X['a'] + 0.5 * rng.normal(size=400)) > 0).astype(np.int8), name='Exited')
+    store = SplitArtifactStore(str(tmp_path / 'store'))
+    store.save(X.iloc[:300], X.iloc[300:], y.iloc[:300], y.iloc[300:])
+    return store
+
+
+def test_continue_training_an_early_stopped_model_changes_predictions(tmp_path):
+    store = make_store(tmp_path)
+    builder = XGBoostModelBuilder(n_estimators=200, max_depth=3, n_jobs=1)
+    model = builder.fit_store(store, rows=np.arange(200), eval_rows=np.arange(200, 300), early_stopping_rounds=5)
+    best_iteration = model.get_booster().best_iteration
+    assert best_iteration + 1 < 200
+
+    X_test, _ = store.load_split('test', mmap_mode=None)
+    before = model.predict_proba(X_test)
+    continued = builder.continue_training(model, store, np.arange(200, 300), 10)
+
+    booster = continued.get_booster()
+    assert booster.attr('best_iteration') is None
+    assert booster.num_boosted_rounds() == best_iteration + 1 + 10
+    assert not np.allclose(continued.predict_proba(X_test), before)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from outlier_detection import OutlierDetector, create_outlier_strategy
+
+
+def frame():
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({'Age': rng.normal(40, 5, 200), 'Balance': rng.normal(1000, 50, 200)})
+    df.loc[0, ['Age', 'Balance']] = [400, 10000]
+    return df
+
+
+def test_handle_outliers_applies_loaded_bounds_without_refitting(tmp_path):
+    config = {'detection_method': 'iqr', 'iqr_multiplier': 1.5}
+    detector = OutlierDetector(create_outlier_strategy(config), min_outlier_columns=2)
+    kept = detector.handle_outliers(frame(), ['Age', 'Balance'])
+    assert 0 not in kept.index
+    detector.save_bounds(str(tmp_path / 'bounds.json'))
+
+    loaded = OutlierDetector.load_bounds(str(tmp_path / 'bounds.json'), config)
+    batch = pd.DataFrame({'Age': [40.0, 400.0], 'Balance': [1000.0, 10000.0]})
+    assert loaded.handle_outliers(batch).index.tolist() == [0]
+    assert loaded.bounds == detector.bounds
+
+
+def test_handle_outliers_needs_bounds_or_columns():
+    detector = OutlierDetector(create_outlier_strategy({}))
+    with pytest.raises(ValueError):
+        detector.handle_outliers(frame())
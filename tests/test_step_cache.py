@@ -0,0 +1,42 @@
+import importlib.util
+
+import pandas as pd
+
+from step_cache import CachedStep, StepCache
+
+
+def load_module(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_editing_the_step_function_module_changes_the_key(tmp_path):
+    path = tmp_path / 'pipeline_steps.py'
+    path.write_text("def build():\n    def step(df):\n        return df\n    return step\n")
+    cache = StepCache(str(tmp_path / 'cache'))
+    key = cache.step_key(CachedStep('step', load_module(path, 'pipeline_steps').build()), 'input')
+
+    path.write_text("def build():\n    def step(df):\n        return df.head(1)\n    return step\n")
+    edited = cache.step_key(CachedStep('step', load_module(path, 'pipeline_steps').build()), 'input')
+    assert key != edited
+
+
+def test_optional_artifacts_are_stored_and_restored_when_written(tmp_path):
+    model_path = tmp_path / 'model.bin'
+    missing_path = tmp_path / 'missing.bin'
+
+    def step(_):
+        model_path.write_bytes(b'fitted')
+        return pd.DataFrame({'a': [1]})
+
+    cache = StepCache(str(tmp_path / 'cache'))
+    steps = [CachedStep('fit', step, optional_artifacts=[str(model_path), str(missing_path)])]
+    cache.run_steps(steps, 'input')
+
+    model_path.unlink()
+    df, _ = cache.run_steps(steps, 'input')
+    assert df['a'].tolist() == [1]
+    assert model_path.read_bytes() == b'fitted'
+    assert not missing_path.exists()
@@ -35,6 +35,11 @@ def get_columns():
     return config.get('columns', {})
 
 
+def get_ingestion_config():
+    config = load_config()
+    return config.get('data_ingestion', {})
+
+
 def get_missing_value_config():
     config = load_config()
     return config.get('missing_values', {})
@@ -75,6 +80,11 @@ def get_model_config():
     return config.get('model', {})
 
 
+def get_model_selection_config():
+    config = load_config()
+    return config.get('training', {}).get('model_selection', {})
+
+
 def get_evaluation_config():
     config = load_config()
     return config.get('evaluation', {})
@@ -100,6 +110,16 @@ def get_pipeline_config():
     return config.get('pipeline', {})
 
 
+def get_incremental_config():
+    config = load_config()
+    return config.get('incremental', {})
+
+
+def get_profiling_config():
+    config = load_config()
+    return config.get('profiling', {})
+
+
 def get_inference_config():
     config = load_config()
     return config.get('inference', {})
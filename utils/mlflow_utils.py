@@ -2,7 +2,7 @@ import os
 import logging
 import mlflow
 import mlflow.sklearn
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 import pandas as pd
 import numpy as np
@@ -158,6 +158,106 @@ class MLflowTracker:
             logger.warning(f"⚠️ Failed to log data pipeline metrics to MLflow: {e}")
             logger.debug("Continuing without MLflow data pipeline logging...")
     
+    def log_step_profile(self, profiler) -> Optional[str]:
+        """Log per-step timing, memory and data-size metrics from a StepProfiler"""
+        try:
+            run = mlflow.active_run()
+            if not run:
+                logger.debug("No active MLflow run, skipping step profile logging")
+                return None
+            
+            mlflow.log_metrics(profiler.metrics())
+            logger.info(f"Logged {len(profiler.records)} step profiles to MLflow")
+            return run.info.run_id
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to log step profile to MLflow: {e}")
+            return None
+    
+    def log_model_selection(self, results: List[Dict[str, Any]], metric: str):
+        """Log every model selection candidate's metrics and the winner"""
+        try:
+            if not mlflow.active_run():
+                logger.debug("No active MLflow run, skipping model selection logging")
+                return
+
+            metrics = {}
+            for result in results:
+                prefix = f"candidate.{result['model_type']}"
+                metrics[f"{prefix}.fit_seconds"] = result['fit_seconds']
+                metrics[f"{prefix}.train_score"] = result['train_score']
+                for name, value in result['validation_metrics'].items():
+                    metrics[f"{prefix}.validation_{name}"] = value
+            mlflow.log_metrics(metrics)
+            mlflow.log_params({
+                'selection_metric': metric,
+                'selected_model': results[0]['model_type'],
+                'candidates': ','.join(result['model_type'] for result in results)
+            })
+            logger.info(f"Logged {len(results)} model selection candidates to MLflow")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to log model selection to MLflow: {e}")
+
+    def log_cv_results(self, cv_results: Dict[str, Any]):
+        """Log per-fold timings and metrics plus the cross-validated means"""
+        try:
+            if not mlflow.active_run():
+                logger.debug("No active MLflow run, skipping cross-validation logging")
+                return
+
+            metrics = {f"cv.{name}_mean": value for name, value in cv_results['mean_metrics'].items()}
+            for result in cv_results['folds']:
+                prefix = f"fold.{result['fold']}"
+                metrics[f"{prefix}.fit_seconds"] = result['fit_seconds']
+                if result['best_iteration'] is not None:
+                    metrics[f"{prefix}.best_iteration"] = result['best_iteration']
+                for name, value in result['metrics'].items():
+                    metrics[f"{prefix}.{name}"] = value
+            if cv_results.get('best_iteration') is not None:
+                metrics['cv.best_iteration_median'] = cv_results['best_iteration']
+            if 'refit_seconds' in cv_results:
+                metrics['cv.refit_seconds'] = cv_results['refit_seconds']
+            mlflow.log_metrics(metrics)
+            logger.info(f"Logged {len(cv_results['folds'])} cross-validation folds to MLflow")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to log cross-validation results to MLflow: {e}")
+
+    def log_tuning_trial(self, trial: Dict[str, Any], metric: str):
+        """Log a finished hyperparameter trial as a nested run of the active run"""
+        try:
+            if not mlflow.active_run():
+                logger.debug("No active MLflow run, skipping tuning trial logging")
+                return
+
+            with mlflow.start_run(run_name=f"trial {trial['trial_id']} rung {trial['rung']}", nested=True):
+                mlflow.log_params(trial['params'])
+                mlflow.log_params({'rung': trial['rung'], 'row_count': trial['row_count'], 'status': trial['status']})
+                if trial['score'] is not None:
+                    mlflow.log_metrics({metric: trial['score'], 'fit_seconds': trial['fit_seconds']})
+
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to log tuning trial to MLflow: {e}")
+
+    def log_retraining_guard(self, baseline_metrics: Dict[str, Any], candidate_metrics: Dict[str, Any],
+                             accepted: bool, new_rows: int):
+        """Log the before/after metrics of a warm-start retrain and whether it was kept"""
+        try:
+            if not mlflow.active_run():
+                logger.debug("No active MLflow run, skipping retraining guard logging")
+                return
+
+            metrics = {f"baseline.{name}": value for name, value in baseline_metrics.items()}
+            metrics.update({f"candidate.{name}": value for name, value in candidate_metrics.items()})
+            metrics['new_training_rows'] = new_rows
+            metrics['accepted'] = int(accepted)
+            mlflow.log_metrics(metrics)
+            logger.info(f"Logged retraining guard ({'accepted' if accepted else 'rejected'}) to MLflow")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to log retraining guard to MLflow: {e}")
+
     def log_training_metrics(self, model, training_metrics: Dict[str, Any], model_params: Dict[str, Any]):
         """Log training metrics, parameters, and model artifacts"""
         try:
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import logging
+import resource
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> Optional[int]:
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return None
+
+
+def peak_rss() -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    # Linux >= 4.0 resets the VmHWM high-water mark when "5" is written to
+    # clear_refs, which gives a per-step peak instead of a per-process one.
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _vm_hwm() -> Optional[int]:
+    try:
+        with open('/proc/self/status', 'r') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def data_size(data) -> Tuple[Optional[int], Optional[int]]:
+    # Shallow sizes only: deep object-column sizing costs a pass over every
+    # string, and Spark DataFrames would need a job just to count rows.
+    if data is None:
+        return None, None
+    if isinstance(data, (list, tuple)):
+        sizes = [data_size(item) for item in data]
+        rows = [r for r, _ in sizes if r is not None]
+        nbytes = [b for _, b in sizes if b is not None]
+        return (sum(rows) if rows else None), (sum(nbytes) if nbytes else None)
+    if hasattr(data, 'memory_usage') and hasattr(data, 'shape'):
+        usage = data.memory_usage(index=True, deep=False)
+        return int(data.shape[0]), int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(data, 'nbytes') and hasattr(data, 'shape'):
+        return int(data.shape[0]) if data.shape else 1, int(data.nbytes)
+    return None, None
+
+
+class StepRecord:
+    def __init__(self, name: str, data_in=None):
+        self.name = name
+        self.rows_in, self.bytes_in = data_size(data_in)
+        self.rows_out = None
+        self.bytes_out = None
+        self.metrics: Dict[str, Any] = {}
+
+    def output(self, data):
+        self.rows_out, self.bytes_out = data_size(data)
+        return data
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'step': self.name,
+            'rows_in': self.rows_in,
+            'bytes_in': self.bytes_in,
+            'rows_out': self.rows_out,
+            'bytes_out': self.bytes_out,
+            **self.metrics
+        }
+
+
+class StepProfiler:
+    def __init__(
+        self,
+        pipeline_name: str,
+        enabled: bool = True,
+        timeline_path: Optional[str] = None,
+        trace_python_memory: bool = False
+    ):
+        self.pipeline_name = pipeline_name
+        self.enabled = enabled
+        self.timeline_path = timeline_path
+        self.trace_python_memory = trace_python_memory
+        self.run_started_at = datetime.now().isoformat(timespec='seconds')
+        self.records: List[StepRecord] = []
+        # Peaks seen so far by each open step. A nested step resets the
+        # high-water marks, so it folds the enclosing step's peak into this
+        # stack first and its own peak back into the parent on exit.
+        self._open_peaks: List[Dict[str, int]] = []
+
+    @classmethod
+    def from_config(cls, pipeline_name: str, profiling_config: Dict[str, Any]):
+        return cls(
+            pipeline_name,
+            enabled=profiling_config.get('enabled', True),
+            timeline_path=profiling_config.get('timeline_path', 'artifacts/profiling/timeline.jsonl'),
+            trace_python_memory=profiling_config.get('trace_python_memory', False)
+        )
+
+    @contextmanager
+    def step(self, name: str, data_in=None) -> Iterator[StepRecord]:
+        record = StepRecord(name, data_in if self.enabled else None)
+        if not self.enabled:
+            yield record
+            return
+
+        started_tracing = self.trace_python_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        self._fold_into_parent({'rss': _vm_hwm(), 'traced': self._traced_peak()})
+        self._open_peaks.append({})
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        per_step_peak = reset_peak_rss()
+        rss_start = current_rss()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.metrics['wall_seconds'] = time.perf_counter() - wall_start
+            record.metrics['cpu_seconds'] = time.process_time() - cpu_start
+            rss_end = current_rss()
+            if rss_start is not None and rss_end is not None:
+                record.metrics['rss_delta_bytes'] = rss_end - rss_start
+            children = self._open_peaks.pop()
+            hwm = _vm_hwm() if per_step_peak else None
+            if hwm is not None:
+                hwm = max(hwm, children.get('rss', 0))
+            record.metrics['peak_rss_bytes'] = hwm if hwm is not None else peak_rss()
+            traced = self._traced_peak()
+            if traced is not None:
+                record.metrics['peak_traced_bytes'] = max(traced, children.get('traced', 0))
+            self._fold_into_parent({'rss': hwm, 'traced': record.metrics.get('peak_traced_bytes')})
+            if started_tracing:
+                tracemalloc.stop()
+            self.records.append(record)
+            logger.info(
+                f"[{self.pipeline_name}] {name}: {record.metrics['wall_seconds']:.3f}s wall, "
+                f"{record.metrics['cpu_seconds']:.3f}s CPU, peak RSS {record.metrics['peak_rss_bytes'] / 2**20:.1f} MiB"
+            )
+
+    @staticmethod
+    def _traced_peak() -> Optional[int]:
+        return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+
+    def _fold_into_parent(self, peaks: Dict[str, Optional[int]]):
+        if not self._open_peaks:
+            return
+        parent = self._open_peaks[-1]
+        for key, value in peaks.items():
+            if value is not None:
+                parent[key] = max(parent.get(key, 0), value)
+
+    def metrics(self) -> Dict[str, float]:
+        metrics = {}
+        for record in self.records:
+            for key, value in record.as_dict().items():
+                if key != 'step' and value is not None:
+                    metrics[f"step.{record.name}.{key}"] = float(value)
+        return metrics
+
+    def save_timeline(self, run_id: Optional[str] = None):
+        if not self.enabled or not self.timeline_path or not self.records:
+            return
+        os.makedirs(os.path.dirname(self.timeline_path) or '.', exist_ok=True)
+        with open(self.timeline_path, 'a') as file:
+            for order, record in enumerate(self.records):
+                file.write(json.dumps({
+                    'pipeline': self.pipeline_name,
+                    'run_started_at': self.run_started_at,
+                    'run_id': run_id,
+                    'order': order,
+                    **record.as_dict()
+                }) + '\n')
+        logger.info(f"Appended {len(self.records)} step records to {self.timeline_path}")
+
+    def report(self, tracker=None):
+        run_id = tracker.log_step_profile(self) if tracker is not None else None
+        self.save_timeline(run_id)